@@ -1,75 +1,64 @@
-from vpython import *
-import math
+from scene_api import *
+from rigid import quat_from_axis_angle, quat_to_matrix
+from scene_spec import SceneSpec, SceneBuilder, Cavities, Shape, scene_from_env
+from clock import SimClock
+from recorder import SceneRecording
+from cavity import GlowSpheres
 
-# === Scene setup ===
-scene = canvas(title="MEMS Toroidal Cavity Array", width=900, height=600)
-scene.background = color.black
-scene.lights = []  # remove default light for softer glow
-distant_light(direction=vector(1,1,1), color=color.white)
-
-# === Parameters ===
+# === Scene description (VPY_SCENE=file.toml overrides any of it) ===
 wafer_size = 6
 wafer_thickness = 0.2
-num_rings_x = 6
-num_rings_y = 6
-ring_spacing = 0.8
-ring_radius = 0.3
-tube_radius = 0.08
-ring_color = vector(0.2, 0.7, 1.0)
-
-# === Wafer substrate ===
-wafer = box(
-    pos=vector(0, -wafer_thickness / 2, 0),
-    size=vector(wafer_size, wafer_thickness, wafer_size),
-    color=vector(0.3, 0.3, 0.35),
-    opacity=0.7
-)
 
-# === Transparent dome enclosure ===
-dome = sphere(
-    pos=vector(0, 0, 0),
-    radius=wafer_size * 0.7,
-    color=color.cyan,
-    opacity=0.25
-)
+spec = scene_from_env(SceneSpec(
+    name='MEMS_dome',
+    title="MEMS Toroidal Cavity Array",
+    width=900,
+    height=600,
+    shapes=[
+        # wafer substrate
+        Shape('box', pos=(0, -wafer_thickness / 2, 0), size=(wafer_size, wafer_thickness, wafer_size),
+              color=(0.3, 0.3, 0.35), opacity=0.7),
+        # transparent dome enclosure
+        Shape('sphere', pos=(0, 0, 0), radius=wafer_size * 0.7, color=(0, 1, 1), opacity=0.25),
+    ],
+    # toroidal cavity array, self-lit, with a glow in every cavity (36 native rings in one compound,
+    # 36 transparent glow spheres)
+    cavities=Cavities(cols=6, rows=6, pitch=0.8, radius=0.3, thickness=0.08),
+))
 
-# === Toroidal array ===
-rings = []
-x_offset = -(num_rings_x - 1) * ring_spacing / 2
-z_offset = -(num_rings_y - 1) * ring_spacing / 2
+built = SceneBuilder(spec).build()
+scene = built.canvas
+cavities = built.cavities
 
-for i in range(num_rings_x):
-    for j in range(num_rings_y):
-        x = x_offset + i * ring_spacing
-        z = z_offset + j * ring_spacing
-        y = 0
-        torus = ring(pos=vector(x, y, z),
-                     axis=vector(0, 1, 0),
-                     radius=ring_radius,
-                     thickness=tube_radius,
-                     color=ring_color,
-                     emissive=True)  # makes it look self-lit
-        rings.append(torus)
+# one distant light replaces the default lights for a softer glow
+scene.lights = []
+distant_light(direction=vector(1, 1, 1), color=color.white)
 
-# === Glow effect ===
-glow_spheres = []
-for torus in rings:
-    glow = sphere(pos=torus.pos, radius=0.05, color=color.cyan, emissive=True, opacity=0.5)
-    glow_spheres.append(glow)
+# === Recording (VPY_RECORD=file) / replay (VPY_REPLAY=file) ===
+recording = SceneRecording.from_env('MEMS_dome')
+if cavities.rings is not None:
+    recording.track('array', cavities.rings.objects, ('axis', 'up', 'visible'))
+if cavities.dots is not None:
+    recording.track_points('dies', cavities.dots)
+if isinstance(cavities.glows, GlowSpheres):
+    recording.track('glows', cavities.glows.objects, ('pos', 'color'))
+else:
+    recording.track_points('glows', cavities.glows)
 
 # === Animation ===
-angle = 0
-t = 0
-while True:
-    rate(60)
-    angle += 0.01
-    t += 0.05
+clock = SimClock(dt=1/60)
+for frame in clock.frames(60):
+    clock.catch_up()                 # rotation and pulse are closed-form in time
+    if recording.replaying:
+        recording.show(clock.render_time)
+        continue
+    angle = 0.6 * clock.render_time  # 0.01 rad per 60 Hz frame
+    t = 3.0 * clock.render_time      # pulse phase, 0.05 per frame
+
+    # rotate the array (one transform per ring compound) and pulse every glow in one pass
+    cavities.update(t, rotation=quat_to_matrix(quat_from_axis_angle((0, 1, 0), angle)))
+    built.lod.update(force=True)     # distant ring chunks fall back to dots
 
-    # rotate array
-    for torus, glow in zip(rings, glow_spheres):
-        torus.rotate(angle=0.01, axis=vector(0,1,0), origin=vector(0,0,0))
-        glow.rotate(angle=0.01, axis=vector(0,1,0), origin=vector(0,0,0))
+    recording.capture()
 
-        # subtle pulsation in brightness
-        intensity = 0.5 + 0.5 * math.sin(t + torus.pos.x + torus.pos.z)
-        glow.color = vector(0.1, 0.8 * intensity, 1.0 * intensity)
+recording.close()
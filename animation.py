@@ -0,0 +1,164 @@
+# animation.py
+# Vectorized animation channels. A channel binds one attribute (opacity,
+# color, radius, ...) across a group of objects to a waveform of time; the
+# waveform returns the values for the whole group as one NumPy array, and
+# only objects whose value moved by more than `eps` since the last write are
+# set, so quiet channels cost one array expression per frame.
+#
+#   anim = Animator()
+#   anim.add(coil_turns, 'opacity', Sine(0.6, 0.15, 2, phase=0.3 * np.arange(18)))
+#   anim.add(lights, 'color', Sine((0.5, 0.5, 0), (-0.5, 0.5, 0), 6, phase=np.arange(8)[:, None]))
+#   for frame in clock.frames(60):
+#       anim.update(t)
+#
+# Waveform parameters are scalars or arrays that broadcast against the
+# channel's values: (n,) for a scalar attribute, (n, 3) for a vector one, so
+# per-object parameters of a vector channel are (n, 1) columns and
+# per-component ones are (3,) rows.
+import numpy as np
+
+from scene_api import vector
+
+EPS = 1 / 512                 # half an 8-bit color step: smaller changes aren't visible
+
+
+def _array(value):
+    return np.asarray(value, dtype=float)
+
+
+# === Waveforms ===
+class Sine:
+    """base + amplitude * sin(freq * t + phase)."""
+
+    def __init__(self, base, amplitude, freq, phase=0.0):
+        self.base = _array(base)
+        self.amplitude = _array(amplitude)
+        self.freq = _array(freq)
+        self.phase = _array(phase)
+
+    def at(self, t):
+        return self.base + self.amplitude * np.sin(self.freq * t + self.phase)
+
+
+class Keyframes:
+    """Piecewise-linear curve through (time, value) keys; values (k,) or (k, 3).
+
+    `offset` shifts each object along the curve ((n,) times); with `loop` the
+    curve repeats over its time span, otherwise it holds its end values.
+    """
+
+    def __init__(self, times, values, offset=0.0, loop=False):
+        self.times = _array(times)
+        self.values = _array(values)
+        if len(self.times) != len(self.values) or np.any(np.diff(self.times) <= 0):
+            raise ValueError('keyframes need one value per key and increasing times')
+        self.offset = _array(offset)
+        self.loop = loop
+
+    def at(self, t):
+        u = t + self.offset
+        if self.loop:
+            u = self.times[0] + np.mod(u - self.times[0], self.times[-1] - self.times[0])
+        if self.values.ndim == 1:
+            return np.interp(u, self.times, self.values)
+        return np.stack([np.interp(u, self.times, c) for c in self.values.T], axis=-1)
+
+
+class Noise:
+    """base + amplitude * value noise in [-1, 1), one independent track per object.
+
+    Each track takes a new random value `freq` times per second at its own
+    random offset, so changes are spread over the frames. `smooth` eases
+    between values; otherwise each one is held until the next (twinkles).
+    """
+
+    def __init__(self, count, base, amplitude, freq, rng, smooth=True, period=256):
+        self.base = _array(base)
+        self.amplitude = _array(amplitude)
+        self.freq = float(freq)
+        self.smooth = smooth
+        self.period = period
+        self.table = rng.uniform(-1.0, 1.0, size=(count, period))
+        self.offset = rng.uniform(0.0, period, size=count)
+        self._rows = np.arange(count) * period
+
+    def at(self, t):
+        u = self.freq * t + self.offset
+        k = np.floor(u)
+        flat = self.table.reshape(-1)
+        a = flat.take(self._rows + np.mod(k, self.period).astype(np.int64))
+        if self.smooth:
+            b = flat.take(self._rows + np.mod(k + 1, self.period).astype(np.int64))
+            w = u - k
+            a = a + (b - a) * (w * w * (3 - 2 * w))
+        return self.base + self.amplitude * a
+
+
+# === Channels ===
+def _read(value):
+    return [value.x, value.y, value.z] if hasattr(value, 'x') else float(value)
+
+
+class Channel:
+    """One attribute of a group of objects driven by a waveform.
+
+    Writes go through `sink.set(i, attr, value)` when a sink is given (e.g. a
+    culling.ObjectCull, which holds back writes to objects out of view).
+    """
+
+    def __init__(self, objects, attr, waveform, eps=EPS, sink=None, name=None):
+        self.objects = list(objects)
+        self.attr = attr
+        self.waveform = waveform
+        self.eps = eps
+        self.sink = sink
+        self.name = name or attr
+        # start from what the objects show, so the first update only sends differences
+        self.last = np.array([_read(getattr(o, attr)) for o in self.objects], dtype=float)
+        self.vector = self.last.ndim == 2
+        self.writes = 0
+        self.evaluated = 0
+
+    def __len__(self):
+        return len(self.objects)
+
+    def update(self, t, part=None):
+        """Write the values at time t that changed; `part` (a slice) limits it to some objects."""
+        values = np.broadcast_to(self.waveform.at(t), self.last.shape)
+        last, first = self.last, 0
+        if part is not None:
+            values, last, first = values[part], self.last[part], part.indices(len(self.objects))[0]
+        delta = np.abs(values - last)
+        changed = np.flatnonzero(delta.max(axis=1) > self.eps if self.vector else delta > self.eps)
+        self.evaluated += len(values)
+        if not len(changed):
+            return 0
+        last[changed] = values[changed]
+        make = (lambda v: vector(*v)) if self.vector else (lambda v: v)
+        for i, v in zip((changed + first).tolist(), values[changed].tolist()):
+            if self.sink is not None:
+                self.sink.set(i, self.attr, make(v))
+            else:
+                setattr(self.objects[i], self.attr, make(v))
+        self.writes += len(changed)
+        return len(changed)
+
+
+class Animator:
+    """All of a scene's channels, evaluated together once per frame."""
+
+    def __init__(self):
+        self.channels = []
+
+    def add(self, objects, attr, waveform, **options):
+        channel = Channel(objects, attr, waveform, **options)
+        self.channels.append(channel)
+        return channel
+
+    def update(self, t):
+        """Evaluate every channel at time t; returns the number of attribute writes."""
+        return sum(channel.update(t) for channel in self.channels)
+
+    def stats(self):
+        """(name, objects, writes, evaluated) per channel."""
+        return [(c.name, len(c), c.writes, c.evaluated) for c in self.channels]
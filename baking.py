@@ -0,0 +1,164 @@
+# baking.py
+# Static-geometry baking. Objects that never change are recorded as specs
+# instead of being created one by one; build() creates them as native
+# primitives and compounds each material group (opacity / emissive /
+# shininess, which a compound has one of) into one object, so the static
+# part of a scene is drawn as a handful of render objects:
+#
+#   statics = StaticBatch('xmas_tree3')
+#   statics.box(pos=..., size=..., color=...)
+#   statics.cone(pos=..., axis=..., radius=..., color=...)
+#   statics.build()              # one compound per material group
+#
+# The tessellators below give unit meshes for the glTF exporter.
+import os
+
+import numpy as np
+
+import scene_api
+
+CACHE_DIR = os.environ.get('VPY_GEOMETRY_CACHE',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.geometry_cache'))
+
+
+# === Tessellation (local frame: x along axis, y along up, z = x cross y) ===
+def _circle(n):
+    ang = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    return np.cos(ang), np.sin(ang)
+
+
+def _fan(center, ring, flip=False):
+    n = len(ring)
+    i = np.arange(n)
+    tri = np.stack([np.full(n, center), ring[i], ring[(i + 1) % n]], axis=1)
+    return tri[:, [0, 2, 1]] if flip else tri
+
+
+def _strip(a, b):
+    # quads between two index rings of equal length, as triangle pairs
+    n = len(a)
+    i = np.arange(n)
+    j = (i + 1) % n
+    return np.vstack([np.stack([a[i], b[i], b[j]], axis=1),
+                      np.stack([a[i], b[j], a[j]], axis=1)])
+
+
+def tess_box(size):
+    sx, sy, sz = np.asarray(size, dtype=float) / 2
+    corners = np.array([[x, y, z] for x in (-sx, sx) for y in (-sy, sy) for z in (-sz, sz)])
+    quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    # four vertices per face so every face keeps a flat normal
+    verts = np.vstack([corners[list(q)] for q in quads])
+    base = np.arange(6)[:, None] * 4
+    faces = np.vstack([base + [0, 1, 2], base + [0, 2, 3]])
+    return verts, faces
+
+
+def tess_pyramid(size):
+    # square base centred on the origin, apex at x = length
+    sx, sy, sz = np.asarray(size, dtype=float)
+    base = np.array([[0, -sy, -sz], [0, sy, -sz], [0, sy, sz], [0, -sy, sz]]) * [1, 0.5, 0.5]
+    apex = np.array([sx, 0.0, 0.0])
+    # separate vertices per face so the faces keep flat normals
+    sides = [np.vstack([base[i], base[(i + 1) % 4], apex]) for i in range(4)]
+    verts = np.vstack([base[::-1]] + sides)
+    faces = np.vstack([[0, 1, 2], [0, 2, 3]] + [4 + 3 * i + np.array([0, 1, 2]) for i in range(4)])
+    return verts, faces
+
+
+def tess_sphere(radius, lat=8, lon=12):
+    theta = np.linspace(0, np.pi, lat + 1)[1:-1]
+    cx, sx = _circle(lon)
+    rings = [np.stack([np.cos(t) * np.ones(lon), np.sin(t) * cx, np.sin(t) * sx], axis=1) for t in theta]
+    verts = np.vstack([[[1.0, 0, 0]]] + rings + [[[-1.0, 0, 0]]]) * radius
+    idx = [np.arange(lon) + 1 + k * lon for k in range(len(rings))]
+    south = len(verts) - 1
+    faces = [_fan(0, idx[0])]
+    faces += [_strip(idx[k], idx[k + 1]) for k in range(len(idx) - 1)]
+    faces.append(_fan(south, idx[-1], flip=True))
+    return verts, np.vstack(faces)
+
+
+def tess_cylinder(length, radius, n=24):
+    c, s = _circle(n)
+    base = np.stack([np.zeros(n), radius * c, radius * s], axis=1)
+    top = base + [length, 0, 0]
+    # side and caps use separate vertex rings so the rim stays sharp
+    verts = np.vstack([base, top, base, top, [[0.0, 0, 0]], [[length, 0, 0]]])
+    side = _strip(np.arange(n), np.arange(n) + n)[:, [0, 2, 1]]
+    cap0 = _fan(4 * n, np.arange(n) + 2 * n, flip=True)
+    cap1 = _fan(4 * n + 1, np.arange(n) + 3 * n)
+    return verts, np.vstack([side, cap0, cap1])
+
+
+def tess_cone(length, radius, n=24):
+    c, s = _circle(n)
+    base = np.stack([np.zeros(n), radius * c, radius * s], axis=1)
+    verts = np.vstack([base, [[length, 0, 0]], base, [[0.0, 0, 0]]])
+    side = _fan(n, np.arange(n))
+    cap = _fan(2 * n + 1, np.arange(n) + n + 1, flip=True)
+    return verts, np.vstack([side, cap])
+
+
+def tess_ring(radius, thickness, n_major=32, n_minor=10):
+    cu, su = _circle(n_major)
+    cv, sv = _circle(n_minor)
+    r = np.broadcast_to(radius + thickness * cv[None, :], (n_major, n_minor))
+    verts = np.stack([np.broadcast_to(thickness * sv[None, :], r.shape),
+                      r * cu[:, None], r * su[:, None]], axis=2).reshape(-1, 3)
+    idx = np.arange(n_major * n_minor).reshape(n_major, n_minor)
+    faces = [_strip(idx[i], idx[(i + 1) % n_major]) for i in range(n_major)]
+    return verts, np.vstack(faces)
+
+
+def _material(spec):
+    return (round(float(spec.get('opacity', 1.0)), 3), bool(spec.get('emissive', False)),
+            round(float(spec.get('shininess', 0.6)), 3))
+
+
+# === Static batch ===
+class StaticBatch:
+    """Collects static primitives and draws each material group as one compound."""
+
+    def __init__(self, name):
+        self.name = name
+        self.specs = []
+        self.objects = []
+
+    def add(self, kind, **spec):
+        self.specs.append((kind, spec))
+        return spec
+
+    def box(self, **spec):
+        return self.add('box', **spec)
+
+    def sphere(self, **spec):
+        return self.add('sphere', **spec)
+
+    def cylinder(self, **spec):
+        return self.add('cylinder', **spec)
+
+    def cone(self, **spec):
+        return self.add('cone', **spec)
+
+    def ring(self, **spec):
+        return self.add('ring', **spec)
+
+    def build(self):
+        """Create the batch: one compound per material group (a lone primitive stays as it is)."""
+        groups = {}
+        for kind, spec in self.specs:
+            groups.setdefault(_material(spec), []).append(getattr(scene_api, kind)(**spec))
+        self.objects = []
+        for (opacity, emissive, shininess), parts in groups.items():
+            if len(parts) == 1:
+                self.objects += parts
+                continue
+            # parts keep their world positions and colors; material comes from the compound
+            obj = scene_api.compound(parts, origin=scene_api.vector(0, 0, 0))
+            obj.opacity = opacity
+            obj.shininess = shininess
+            if emissive:
+                obj.emissive = True
+            self.objects.append(obj)
+        return self.objects
@@ -0,0 +1,69 @@
+# bench_boris.py
+# Throughput of the Boris pusher (boris.py) in the coil field of
+# vacuum_chamber_improved.py (18 turns of radius 3.75 from x = -3.7 to 3.7,
+# field solved on the chamber's 48 x 24 x 24 grid, so the cache is shared).
+# Exits with status 1 unless every count reaches TARGET particle-steps per
+# second on one core. The physics checks (energy, gyroradius, E x B drift)
+# are in tests/test_boris.py.
+#
+#   python benchmarks/bench_boris.py [steps]
+import os
+import sys
+import time
+
+os.environ['VPY_BACKEND'] = 'headless'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+from boris import BorisPusher  # noqa: E402
+from magnetics import Loop, solve_grid  # noqa: E402
+
+COUNTS = [1000, 10000, 100000, 1000000]
+TARGET = 1e6                 # particle-steps per second
+QM = 2e4                     # charge / mass used by the chamber scene
+CHAMBER_RADIUS = 3
+CHAMBER_LENGTH = 8
+
+
+def coil_field():
+    xs = np.linspace(-CHAMBER_LENGTH / 2 + 0.3, CHAMBER_LENGTH / 2 - 0.3, 18)
+    loops = [Loop((x, 0, 0), (1, 0, 0), CHAMBER_RADIUS * 1.25) for x in xs]
+    r, half = CHAMBER_RADIUS, CHAMBER_LENGTH / 2
+    return solve_grid(loops, (-half, -r, -r), (half, r, r), (48, 24, 24), current=1.0)
+
+
+def chamber_particles(n, rng):
+    pos = rng.uniform([-3, -2, -2], [3, 2, 2], (n, 3))
+    vel = rng.uniform(-0.02, 0.02, (n, 3))
+    return pos, vel
+
+
+def throughput(grid, steps, rng):
+    ok = True
+    print('{:>9} {:>10} {:>16}'.format('n', 'ms/step', 'particle-steps/s'))
+    for n in COUNTS:
+        pos, vel = chamber_particles(n, rng)
+        pusher = BorisPusher(grid, QM)
+        pusher.step(pos, vel)             # allocate scratch outside the timing
+        k = max(3, min(steps, int(2e7 // n)))
+        start = time.perf_counter()
+        for _ in range(k):
+            pusher.step(pos, vel)
+        elapsed = (time.perf_counter() - start) / k
+        rate = n / elapsed
+        ok &= rate >= TARGET
+        print('{:>9} {:>10.3f} {:>16,.0f} {}'.format(n, 1000 * elapsed, rate,
+                                                    '' if rate >= TARGET else '< target'))
+    return ok
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rng = np.random.default_rng(0)
+    ok = throughput(coil_field(), steps, rng)
+    print('\n' + ('target met' if ok else 'below target'))
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# bench_collisions.py
+# Scaling benchmark for collisions.py: particle-particle contacts through the
+# spatial hash plus the chamber wall and the 3x3 MEMS rings, from the 40
+# particles of the chamber scripts up to 100k.
+#
+# 100k particles of the scripts' radius (0.08) would overfill the chamber, so
+# above 4000 particles the radius shrinks to keep the volume fraction fixed;
+# the per-particle cost should then stay roughly flat.
+#
+#   python benchmarks/bench_collisions.py [steps]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+from collisions import Collider, CylinderWall, RingSet  # noqa: E402
+
+COUNTS = [40, 400, 4000, 10000, 40000, 100000]
+CHAMBER_RADIUS = 3
+CHAMBER_LENGTH = 8
+RADIUS = 0.08
+
+
+def particle_radius(n):
+    return RADIUS * min(1.0, (4000 / n) ** (1 / 3))
+
+
+def chamber_particles(n, r, rng):
+    # uniform in the cylinder volume
+    rho = (CHAMBER_RADIUS - r) * np.sqrt(rng.uniform(0, 1, n))
+    phi = rng.uniform(0, 2 * np.pi, n)
+    x = rng.uniform(-CHAMBER_LENGTH / 2 + r, CHAMBER_LENGTH / 2 - r, n)
+    pos = np.stack([x, rho * np.cos(phi), rho * np.sin(phi)], axis=1)
+    vel = rng.uniform(-0.02, 0.02, (n, 3))
+    return pos, vel
+
+
+def make_collider(r):
+    spacing = 1.2
+    centers = [[(i - 1) * spacing, 0, (j - 1) * spacing] for i in range(3) for j in range(3)]
+    rings = RingSet(centers, axis=(1, 0, 0), radius=0.4, thickness=0.1)
+    return Collider(r, obstacles=[CylinderWall(CHAMBER_RADIUS, CHAMBER_LENGTH), rings])
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = np.random.default_rng(0)
+    print('{:>8} {:>8} {:>12} {:>14} {:>14} {:>10}'.format(
+        'n', 'radius', 'ms/step', 'us/particle', 'candidates', 'contacts'))
+    for n in COUNTS:
+        r = particle_radius(n)
+        pos, vel = chamber_particles(n, r, rng)
+        collider = make_collider(r)
+        collider.resolve(pos, vel)      # settle initial overlaps outside the timing
+        collider.contacts = 0
+        start = time.perf_counter()
+        for _ in range(steps):
+            pos += vel
+            collider.resolve(pos, vel)
+        elapsed = (time.perf_counter() - start) / steps
+        print('{:>8} {:>8.4f} {:>12.3f} {:>14.3f} {:>14} {:>10}'.format(
+            n, r, 1000 * elapsed, 1e6 * elapsed / n, collider.grid.candidates, collider.contacts))
+
+
+if __name__ == '__main__':
+    main()
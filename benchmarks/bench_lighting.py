@@ -0,0 +1,60 @@
+# bench_lighting.py
+# Frame-time comparison: rebuilding the chamber lights every frame (the old
+# vacuum_chamber7.py loop) versus a persistent LightRig driven in place.
+#
+#   python benchmarks/bench_lighting.py [frames]
+#
+# Runs on the headless backend by default; set VPY_BACKEND=vpython to time
+# the real renderer (the browser round trips are where rebuilding hurts most).
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('VPY_BACKEND', 'headless')
+
+from scene_api import canvas, local_light, vector, sin, tracker  # noqa: E402
+from lighting import key_fill_glow, sine  # noqa: E402
+
+
+def run_rebuild(scene, n_frames):
+    created = 0
+    theta = 0
+    for _ in range(n_frames):
+        theta += 0.02
+        glow_intensity = 0.8 + 0.6 * sin(theta * 1.5)
+        scene.lights = []
+        local_light(pos=vector(0, 0, 0), color=vector(0.2, 0.6 + glow_intensity, 1))
+        local_light(pos=vector(5, 3, 5), color=vector(1, 1, 0.8) * 0.6)
+        local_light(pos=vector(-5, -3, -5), color=vector(0.3, 0.6, 1) * 0.7)
+        created += 3
+        tracker.flush()
+    return created
+
+
+def run_rig(scene, n_frames):
+    glow_intensity = sine(0.8, 0.6, 1.5)
+    lights = key_fill_glow(scene, glow_color=lambda t: vector(0.2, 0.6 + glow_intensity(t), 1))
+    theta = 0
+    for _ in range(n_frames):
+        theta += 0.02
+        lights.update(theta)
+        tracker.flush()
+    return len(lights.lights)
+
+
+def main():
+    n_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    scene = canvas(title='lighting benchmark')
+    print('{} frames, backend={}'.format(n_frames, os.environ['VPY_BACKEND']))
+    print('{:<10} {:>12} {:>16}'.format('approach', 'ms/frame', 'lights created'))
+    for name, fn in [('rebuild', run_rebuild), ('rig', run_rig)]:
+        scene.lights = []
+        start = time.perf_counter()
+        created = fn(scene, n_frames)
+        elapsed = time.perf_counter() - start
+        print('{:<10} {:>12.4f} {:>16}'.format(name, 1000 * elapsed / n_frames, created))
+
+
+if __name__ == '__main__':
+    main()
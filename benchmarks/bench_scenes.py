@@ -0,0 +1,273 @@
+# bench_scenes.py
+# Per-frame update cost of every scene, run headlessly.
+#
+# Each run is a fresh subprocess that executes the scene script with its
+# frame loop instrumented: setup time (script start to the first frame), the
+# scene objects created by then and how many of them are drawn (compound
+# parts are not),
+# mean / p50 / p99 frame update time (loop body plus the tracker flush),
+# attribute writes sent / suppressed per frame, points objects rebuilt and
+# points sent per frame (bulk pushes, not attribute writes) and the simulation clock's
+# lag. Headless loops don't sleep, so the clock is paced as rate(60) would
+# pace it: each frame counts as 1/60 s or its real duration if longer, and a
+# scene that can't keep up shows the physics time it dropped as lag. Scaling sweeps re-run a scene
+# with VPY_SCENE overrides (particle count, ring / cavity grid, snowflakes, ornaments).
+#
+#   python benchmarks/bench_scenes.py                       # all scenes, 600 frames
+#   python benchmarks/bench_scenes.py --sweeps --out bench.json
+#   python benchmarks/bench_scenes.py --baseline bench.json # flag regressions
+#   python benchmarks/bench_scenes.py --repeat 5 ...        # median of 5 runs (default 3)
+#
+# Every run has the same VPY_SEED (--seed), so only timings vary between
+# runs. With --baseline the exit status is 1 if any metric got worse than
+# the baseline by more than --threshold (default 15%) and by more than its
+# NOISE_FLOOR.
+import argparse
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+SCENES = ['ufo.py', 'orbitingandbouncing2.py', 'MEMS_dome.py', 'vacuum_chamber7.py',
+          'vacuum_chamber_improved.py', 'xmas_tree3.py']
+
+# scene -> [(sweep name, [(label, VPY_SCENE overrides)])]
+SWEEPS = {
+    'vacuum_chamber_improved.py': [
+        ('particles', [(str(n), {'particles': {'count': n}}) for n in (40, 400, 4000)]),
+        ('ring_grid', [('{0}x{0}'.format(k), {'rings': {'cols': k, 'rows': k, 'spacing': 3.6 / k}})
+                       for k in (3, 5, 8)]),
+    ],
+    'MEMS_dome.py': [
+        ('cavities', [('{0}x{0}'.format(k), {'cavities': {'cols': k, 'rows': k, 'pitch': 4.8 / k,
+                                                          'radius': 1.8 / k, 'thickness': 0.48 / k}})
+                      for k in (6, 20, 100)]),
+    ],
+    'xmas_tree3.py': [
+        ('snowflakes', [(str(n), {'num_snowflakes': n}) for n in (200, 2000, 20000)]),
+        ('ornaments', [(str(n), {'num_ornaments': n}) for n in (180, 720, 2880)]),
+    ],
+}
+
+# metric -> True when bigger is worse
+METRICS = {'setup_s': True, 'objects': True, 'drawn': True, 'mean_ms': True, 'p50_ms': True, 'p99_ms': True,
+           'writes_per_frame': True, 'points_per_frame': True, 'lag_s': True}
+# smallest change that counts as a regression, whatever its percentage (timer noise)
+NOISE_FLOOR = {'setup_s': 0.05, 'objects': 0, 'drawn': 0, 'mean_ms': 0.5, 'p50_ms': 0.5, 'p99_ms': 2.0,
+               'writes_per_frame': 1.0, 'points_per_frame': 1.0, 'lag_s': 0.05}
+SEED = 1                     # VPY_SEED of every run, so runs differ only by timing
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+# === Child: run one scene with an instrumented frame loop ===
+def paced_timer(fps=60):
+    """Clock timer for a loop paced at fps: each call advances by max(1/fps, real time since the last)."""
+    state = {'wall': None, 'virtual': 0.0}
+
+    def timer():
+        now = time.perf_counter()
+        if state['wall'] is not None:
+            state['virtual'] += max(1.0 / fps, now - state['wall'])
+        state['wall'] = now
+        return state['virtual']
+    return timer
+
+
+def run_child(script, out_path):
+    import scene_api
+    import clock
+
+    original = scene_api.frames
+    frame_times, sent, suppressed, pushes, points_sent = [], [], [], [], []
+    marks = {}
+    clocks = []
+
+    class PacedClock(clock.SimClock):
+        def __init__(self, *args, **kw):
+            kw.setdefault('realtime', True)
+            kw.setdefault('timer', paced_timer())
+            super().__init__(*args, **kw)
+            clocks.append(self)
+
+    def timed_frames(fps=60):
+        gen = original(fps)
+        last = scene_api.tracker.stats()
+        while True:
+            try:
+                n = next(gen)         # flushes the previous frame's writes
+            except StopIteration:
+                return
+            now = time.perf_counter()
+            stats = scene_api.tracker.stats()
+            if 'setup' not in marks:
+                marks['setup'] = now - marks['start']
+                objects = scene_api.canvas.selected.objects
+                marks['objects'] = len(objects)
+                # compound parts are hidden and drawn through their compound
+                marks['drawn'] = sum(1 for o in objects if getattr(o, 'visible', True))
+            else:
+                frame_times.append(now - marks['frame'])
+                sent.append(stats['sent'] - last['sent'])
+                suppressed.append(stats['suppressed'] - last['suppressed'])
+                pushes.append(stats['points_pushes'] - last['points_pushes'])
+                points_sent.append(stats['points_sent'] - last['points_sent'])
+            last = stats
+            marks['frame'] = time.perf_counter()
+            yield n
+
+    scene_api.frames = timed_frames
+    clock.SimClock = PacedClock
+    sys.argv = [script]
+    marks['start'] = time.perf_counter()
+    runpy.run_path(os.path.join(ROOT, script), run_name='__main__')
+
+    ms = sorted(1000 * t for t in frame_times)
+    n = len(ms)
+    result = {'frames': n,
+              'setup_s': marks.get('setup', 0.0),
+              'objects': marks.get('objects', 0),
+              'drawn': marks.get('drawn', 0),
+              'mean_ms': sum(ms) / n if n else 0.0,
+              'p50_ms': _percentile(ms, 0.5),
+              'p99_ms': _percentile(ms, 0.99),
+              'max_ms': ms[-1] if n else 0.0,
+              'writes_per_frame': sum(sent) / n if n else 0.0,
+              'suppressed_per_frame': sum(suppressed) / n if n else 0.0,
+              'pushes_per_frame': sum(pushes) / n if n else 0.0,
+              'points_per_frame': sum(points_sent) / n if n else 0.0,
+              'lag_s': sum(c.lag for c in clocks),
+              'dropped_steps': sum(c.dropped for c in clocks)}
+    with open(out_path, 'w') as f:
+        json.dump(result, f)
+
+
+# === Parent: spawn runs, collect, compare ===
+def run_scene(script, frames, overrides=None, cache_dir=None, seed=SEED):
+    env = dict(os.environ, VPY_BACKEND='headless', VPY_FRAMES=str(frames), VPY_SEED=str(seed))
+    env.pop('VPY_RECORD', None)
+    env.pop('VPY_REPLAY', None)
+    env.pop('VPY_GLTF', None)
+    env.pop('VPY_SCENE', None)
+    if cache_dir:
+        env['VPY_GEOMETRY_CACHE'] = cache_dir
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'result.json')
+        if overrides:
+            env['VPY_SCENE'] = os.path.join(tmp, 'overrides.json')
+            with open(env['VPY_SCENE'], 'w') as f:
+                json.dump(overrides, f)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', script, out],
+                       env=env, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        with open(out) as f:
+            return json.load(f)
+
+
+def median_run(runs):
+    # per-metric median of repeated runs, to damp scheduler noise
+    return {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in runs[0]}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    import numpy
+    return {'python': platform.python_version(), 'numpy': numpy.__version__,
+            'machine': platform.machine(), 'system': platform.system(),
+            'commit': commit, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline, threshold):
+    """Rows of (key, metric, base, new, change, regressed) for runs in both files."""
+    rows = []
+    for key, new in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric, worse_if_bigger in METRICS.items():
+            b, n = base.get(metric), new.get(metric)
+            if b is None or n is None:
+                continue
+            change = (n - b) / b if b else (0.0 if n == b else float('inf'))
+            regressed = change > threshold if worse_if_bigger else change < -threshold
+            regressed = regressed and abs(n - b) > NOISE_FLOOR.get(metric, 0.0)
+            rows.append((key, metric, b, n, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-frame update cost of every scene.')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--scenes', default=','.join(SCENES), help='comma-separated scene scripts')
+    parser.add_argument('--sweeps', action='store_true', help='also run the scaling sweeps')
+    parser.add_argument('--cold', action='store_true', help='empty geometry cache (setup includes field solves)')
+    parser.add_argument('--out', help='write results as JSON')
+    parser.add_argument('--baseline', help='JSON from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scene; metrics are the median')
+    parser.add_argument('--seed', type=int, default=SEED, help='VPY_SEED for every run')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    cache_dir = tempfile.mkdtemp(prefix='vpy-bench-cache-') if args.cold else None
+    runs = [(script, None, None) for script in args.scenes.split(',')]
+    if args.sweeps:
+        for script in args.scenes.split(','):
+            for sweep, points in SWEEPS.get(script, []):
+                runs += [(script, '{}={}'.format(sweep, label), overrides) for label, overrides in points]
+
+    print('{:<46} {:>8} {:>8} {:>6} {:>9} {:>9} {:>9} {:>10} {:>10} {:>9} {:>10} {:>8}'.format(
+        'run', 'setup s', 'objects', 'drawn', 'mean ms', 'p50 ms', 'p99 ms', 'writes/f', 'suppr/f', 'pushes/f',
+        'points/f', 'lag s'))
+    results = {}
+    for script, variant, overrides in runs:
+        key = script if variant is None else '{} [{}]'.format(script, variant)
+        r = median_run([run_scene(script, args.frames, overrides, cache_dir, args.seed)
+                        for _ in range(args.repeat)])
+        results[key] = r
+        print(('{:<46} {:>8.3f} {:>8d} {:>6d} {:>9.3f} {:>9.3f} {:>9.3f} '
+               '{:>10.1f} {:>10.1f} {:>9.1f} {:>10.1f} {:>8.3f}').format(
+            key, r['setup_s'], r['objects'], r['drawn'], r['mean_ms'], r['p50_ms'], r['p99_ms'], r['writes_per_frame'],
+            r['suppressed_per_frame'], r['pushes_per_frame'], r['points_per_frame'], r['lag_s']))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'environment': environment(), 'frames': args.frames, 'repeat': args.repeat,
+                       'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        rows = compare(results, baseline, args.threshold)
+        regressions = [r for r in rows if r[5]]
+        print('\n{} regression(s) over {:.0%} against {}'.format(
+            len(regressions), args.threshold, args.baseline))
+        for key, metric, b, n, change, _ in regressions:
+            print('  {:<46} {:<18} {:>10.3f} -> {:>10.3f} ({:+.0%})'.format(key, metric, b, n, change))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
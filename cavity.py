@@ -0,0 +1,222 @@
+# cavity.py
+# Wafer-scale MEMS cavity arrays. The layout (cols x rows on an x / z pitch,
+# minus dies masked out by the wafer edge or a missing-die list) and the
+# per-cavity phase are NumPy arrays, and the glow pulse for the whole array
+# is one animation.Sine evaluated as a batch per frame.
+#
+# The cavity bodies are native rings, compounded RING_CHUNK at a time so
+# turning the array is one transform per chunk (`draw`):
+#   - 'rings': always tori.
+#   - 'points': one points object of dots in the ring color, with the glows
+#     sitting on top; startup creates two objects however many cavities.
+#   - 'auto' (default): tori, with a LodSet (see lod.py) that swaps a chunk
+#     for its dots once its rings are under DOT_PIXELS on screen. Without a
+#     LodManager it is the same as 'rings'.
+#
+# The glows are transparent spheres up to GLOW_LIMIT cavities, recolored
+# every frame. Beyond that they are one `points` object rebuilt in one call
+# per frame; points are opaque, so their colors are mixed with the
+# background as the spheres' opacity would.
+#
+#   lod = LodManager(scene)
+#   array = CavityArray(100, 100, pitch=0.05, radius=0.018, thickness=0.005,
+#                       wafer_radius=2.5, missing=[(3, 7), (50, 50)], lod=lod)
+#   for frame in clock.frames(60):
+#       array.update(t, rotation=quat_to_matrix(q))
+#       lod.update(force=True)       # the chunks moved
+import numpy as np
+
+from scene_api import points, ring, sphere, compound, vector
+from particles import push_points
+from animation import Sine
+from lod import LodSet, ObjectLevel
+
+RING_CHUNK = 1000            # rings per compound
+GLOW_LIMIT = 1000            # above this many cavities the glows are one points object
+DOT_PIXELS = 2.0             # 'auto': chunks whose rings are smaller than this (radius) are dots
+
+
+def grid_layout(cols, rows, pitch, pitch_z=None, y=0.0):
+    """Centres (rows, cols, 3) of a grid centred on the y axis; x over cols, z over rows."""
+    pitch_z = pitch if pitch_z is None else pitch_z
+    x = (np.arange(cols) - (cols - 1) / 2) * pitch
+    z = (np.arange(rows) - (rows - 1) / 2) * pitch_z
+    xx, zz = np.meshgrid(x, z)
+    return np.stack([xx, np.full_like(xx, y), zz], axis=-1)
+
+
+def die_mask(centers, wafer_radius=None, missing=()):
+    """Present dies (rows, cols): inside the wafer circle and not listed as (col, row)."""
+    mask = np.ones(centers.shape[:2], dtype=bool)
+    if wafer_radius is not None:
+        mask &= np.hypot(centers[..., 0], centers[..., 2]) <= wafer_radius
+    for col, row in missing:
+        mask[int(row), int(col)] = False
+    return mask
+
+
+class CavityRings:
+    """One native ring per cavity (axis y), compounded RING_CHUNK at a time."""
+
+    def __init__(self, centers, radius, thickness, color, emissive):
+        self.chunks = [(start, min(start + RING_CHUNK, len(centers)))
+                       for start in range(0, len(centers), RING_CHUNK)]
+        self.objects = []
+        for start, stop in self.chunks:
+            rings = [ring(pos=vector(*c), axis=vector(0, 1, 0), radius=radius, thickness=thickness,
+                          color=vector(*color), emissive=emissive) for c in centers[start:stop].tolist()]
+            obj = compound(rings, origin=vector(0, 0, 0))
+            if emissive:
+                obj.emissive = True
+            self.objects.append(obj)
+        # a compound's axis length is its size along x; keep it when re-orienting
+        self._axis_length = [obj.axis.mag for obj in self.objects]
+
+    def turn(self, rotation, pos):
+        axis = vector(*rotation[:, 0].tolist())
+        up = vector(*rotation[:, 1].tolist())
+        for obj, length in zip(self.objects, self._axis_length):
+            obj.axis = axis * length
+            obj.up = up
+
+
+class CavityDots:
+    """Cavities as dots the ring's outer size, in one points object.
+
+    Only the cavities in `alive` are drawn. Given chunks, it is a LOD level
+    that starts empty and shows and hides whole chunks of them.
+    """
+
+    def __init__(self, centers, radius, thickness, color, emissive, chunks=None):
+        self.lift = radius + thickness           # glows sit on top of the dots
+        self.pos = centers
+        self.alive = np.full(len(centers), chunks is None)
+        self.chunks = chunks
+        self.visual = points(radius=radius + thickness, size_units='world',
+                             color=vector(*color), emissive=emissive)
+        self.push()
+
+    def push(self):
+        push_points(self.visual, self.pos[self.alive])
+
+    def turn(self, rotation, pos):
+        self.pos = pos
+        if self.alive.any():
+            self.push()
+
+    # === LOD level over chunks ===
+    def show(self, indices):
+        for i in indices:
+            self.alive[slice(*self.chunks[i])] = True
+        self.push()
+
+    def hide(self, indices):
+        for i in indices:
+            self.alive[slice(*self.chunks[i])] = False
+        self.push()
+
+    def set(self, i, name, value):
+        pass
+
+
+class GlowSpheres:
+    """One transparent emissive sphere per cavity."""
+
+    def __init__(self, n, radius, opacity, background):
+        self.objects = [sphere(radius=radius, emissive=True, opacity=opacity) for _ in range(n)]
+
+    def push(self, pos, color):
+        for obj, p, c in zip(self.objects, pos.tolist(), color.tolist()):
+            obj.pos = vector(*p)
+            obj.color = vector(*c)
+
+
+class GlowDots:
+    """Every glow as a dot of one points object, colored as if at `opacity` over the background."""
+
+    def __init__(self, n, radius, opacity, background):
+        self.opacity = opacity
+        self.background = np.asarray(background, dtype=float)
+        self.visual = points(radius=radius, size_units='world')
+        self.pos = np.zeros((n, 3))
+        self.color = np.zeros((n, 3))
+
+    def push(self, pos, color):
+        self.pos = pos
+        self.color = self.background + (color - self.background) * self.opacity
+        push_points(self.visual, self.pos, self.color)
+
+
+class CavityArray:
+    """Toroidal cavities with pulsing glows, stored and updated as arrays."""
+
+    def __init__(self, cols, rows, pitch, pitch_z=None, radius=0.3, thickness=0.08, y=0.0,
+                 wafer_radius=None, missing=(), mask=None, phase=None,
+                 color=(0.2, 0.7, 1.0), emissive=True, draw='auto', lod=None,
+                 glow_radius=0.05, glow_color=(0.1, 0.8, 1.0), glow_dim=(0.1, 0.0, 0.0),
+                 glow_opacity=0.5, background=(0.0, 0.0, 0.0)):
+        grid = grid_layout(cols, rows, pitch, pitch_z, y)
+        if mask is None:
+            mask = die_mask(grid, wafer_radius, missing)
+        self.mask = np.asarray(mask, dtype=bool)
+        if self.mask.shape != grid.shape[:2]:
+            raise ValueError('mask must be (rows, cols) = {}'.format(grid.shape[:2]))
+
+        # === Per-cavity arrays (present dies only, row-major) ===
+        self.local = grid[self.mask]                         # (n, 3) centres in the array frame
+        self.cells = np.argwhere(self.mask)[:, ::-1]         # (n, 2) (col, row)
+        self.phase = np.zeros(len(self.local)) if phase is None else np.asarray(phase, dtype=float)
+        self.rotation = np.eye(3)
+        self.pos = self.local.copy()                         # world centres
+        self.intensity = np.zeros(len(self.local))
+        self.glow_color = np.asarray(glow_color, dtype=float)
+        self.glow_dim = np.asarray(glow_dim, dtype=float)
+        self.color = np.tile(self.glow_dim, (len(self.local), 1))
+        # brightness wave across the wafer, in world x / z so it stays put as the array turns
+        self.pulse = Sine(0.5, 0.5, 1.0, phase=self.pos[:, 0] + self.pos[:, 2] + self.phase)
+
+        # === Renderer: ring compounds and / or dots for the bodies, spheres or points for the glows ===
+        if draw not in ('auto', 'rings', 'points'):
+            raise ValueError("draw must be 'auto', 'rings' or 'points', not {!r}".format(draw))
+        if draw == 'auto' and lod is None:
+            draw = 'rings'
+        self.draw = draw
+        self.rings = self.dots = self.lod_set = None
+        if draw != 'points':
+            self.rings = CavityRings(self.local, radius, thickness, color, emissive)
+        if draw == 'points':
+            self.dots = CavityDots(self.local, radius, thickness, color, emissive)
+        if draw == 'auto':
+            # one LOD object per chunk, sized by its rings; its dots stand in from afar
+            self.dots = CavityDots(self.local, radius, thickness, color, emissive, self.rings.chunks)
+            self._chunk_local = np.array([self.local[slice(*c)].mean(axis=0) for c in self.rings.chunks])
+            self.lod_set = lod.add(LodSet(self._chunk_local, radius + thickness, thresholds=(DOT_PIXELS,),
+                                          levels=[ObjectLevel(self.rings.objects), self.dots],
+                                          name='cavities'))
+        glows = GlowSpheres if len(self.local) <= GLOW_LIMIT else GlowDots
+        self.glows = glows(len(self.local), glow_radius, glow_opacity, background)
+        self.push()
+
+    def __len__(self):
+        return len(self.local)
+
+    def update(self, t, rotation=None):
+        """Turn the array (3x3 matrix) and recompute every glow for pulse phase t."""
+        if rotation is not None:
+            self.rotation = np.asarray(rotation, dtype=float)
+            self.pos = self.local @ self.rotation.T
+            if self.rings is not None:
+                self.rings.turn(self.rotation, self.pos)
+            if self.dots is not None:
+                self.dots.turn(self.rotation, self.pos)
+            if self.lod_set is not None:
+                self.lod_set.centers = self._chunk_local @ self.rotation.T
+            self.pulse.phase = self.pos[:, 0] + self.pos[:, 2] + self.phase
+        self.intensity = self.pulse.at(t)
+        self.color = self.glow_dim + (self.glow_color - self.glow_dim) * self.intensity[:, None]
+        self.push()
+
+    def push(self):
+        lift = 0.0 if self.dots is None else self.dots.lift * self.dots.alive[:, None]
+        self.shown = self.pos + lift * self.rotation[:, 1]
+        self.glows.push(self.shown, self.color)
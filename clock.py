@@ -0,0 +1,98 @@
+# clock.py
+# Fixed-timestep simulation clock. Physics advances in steps of exactly `dt`
+# driven by real elapsed time: a slow frame runs several substeps to catch
+# up, capped at `max_steps` so the loop can't spiral, and any time beyond the
+# cap is dropped and reported as lag. Rendering uses `alpha`, the fraction of
+# a step left over, to interpolate between the last two physics states.
+#
+#   clock = SimClock(dt=1/60)
+#   for frame in clock.frames(60):
+#       for t in clock.steps():
+#           ...physics at time t...
+#       ...render at clock.render_time / with clock.alpha...
+#
+# Headless runs use virtual time (one frame = 1/fps), so they stay
+# deterministic no matter how fast the CPU steps them. With VPY_PROFILE=1
+# the lag and dropped steps are printed when the loop ends.
+import time
+
+import scene_api
+from profiler import profiler
+
+
+class SimClock:
+    """Fixed-dt physics clock with capped catch-up and render interpolation."""
+
+    def __init__(self, dt=1 / 60, max_steps=5, realtime=None, timer=time.perf_counter):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.realtime = not scene_api.is_headless() if realtime is None else realtime
+        self.timer = timer
+        self.t = 0.0             # simulation time of the latest physics state
+        self.alpha = 0.0         # render position between the last two states
+        self.lag = 0.0           # wall-clock time dropped by the catch-up cap
+        self.dropped = 0         # whole steps dropped with it
+        self.frame_count = 0
+        self.step_count = 0
+        self.max_substeps = 0
+        self._acc = 0.0
+
+    @property
+    def render_time(self):
+        # interpolate between the previous state (t - dt) and the latest (t)
+        return max(0.0, self.t - (1.0 - self.alpha) * self.dt)
+
+    def frames(self, fps=60):
+        last = None
+        try:
+            for n in scene_api.frames(fps):
+                now = self.timer()
+                if self.realtime and last is not None:
+                    self._acc += now - last
+                else:
+                    self._acc += 1.0 / fps
+                last = now
+                self.frame_count += 1
+                yield n
+        finally:
+            if profiler.enabled and self.frame_count:
+                print(self.report())
+
+    def steps(self):
+        n = 0
+        while self._acc >= self.dt - 1e-12 and n < self.max_steps:
+            self._acc -= self.dt
+            self.step_count += 1
+            self.t = self.step_count * self.dt     # no float accumulation
+            n += 1
+            yield self.t
+        if self._acc >= self.dt:
+            # too far behind: drop whole steps instead of spiralling
+            dropped = self._acc - self._acc % self.dt
+            self.lag += dropped
+            self.dropped += int(round(dropped / self.dt))
+            self._acc -= dropped
+        self._acc = max(self._acc, 0.0)
+        self.alpha = min(self._acc / self.dt, 1.0)
+        self.max_substeps = max(self.max_substeps, n)
+
+    def catch_up(self):
+        """Run the pending steps for scenes whose motion is all closed-form."""
+        return sum(1 for _ in self.steps())
+
+    def stats(self):
+        return {'frames': self.frame_count,
+                'steps': self.step_count,
+                'sim_time': self.t,
+                'substeps_per_frame': self.step_count / self.frame_count if self.frame_count else 0.0,
+                'max_substeps': self.max_substeps,
+                'lag': self.lag,
+                'dropped_steps': self.dropped,
+                'backlog': self._acc}
+
+    def report(self):
+        s = self.stats()
+        return ('clock: {} frames, {} steps ({:.2f} per frame, max {}), '
+                'lag {:.3f} s ({} steps dropped)').format(
+            s['frames'], s['steps'], s['substeps_per_frame'], s['max_substeps'], s['lag'],
+            s['dropped_steps'])
@@ -0,0 +1,165 @@
+# collisions.py
+# Collision handling for the chamber particles. Particle-particle contacts use
+# a uniform spatial hash grid (cell size = particle diameter), so only pairs
+# in the same or neighbouring cells are tested and the work grows roughly
+# linearly with particle count. Particles also bounce exactly off the
+# cylindrical chamber wall and the ring tori of the MEMS array.
+# All responses are elastic and act in place on (n, 3) pos/vel arrays.
+import itertools
+
+import numpy as np
+
+# the 13 neighbour cells "after" a cell; with the cell itself each pair is visited once
+HALF_SHELL = [o for o in itertools.product((-1, 0, 1), repeat=3) if o > (0, 0, 0)]
+
+
+def _accumulate(target, index, values):
+    # scatter-add rows of values into target[index] (faster than np.add.at)
+    n = len(target)
+    for k in range(target.shape[1]):
+        target[:, k] += np.bincount(index, weights=values[:, k], minlength=n)
+
+
+class SpatialHash:
+    """Uniform grid over particle positions; yields candidate pairs (i, j)."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.candidates = 0
+
+    def pairs(self, pos):
+        # integer cell coordinates, padded by one cell so neighbour keys stay in range
+        ijk = np.floor(pos / self.cell_size).astype(np.int64)
+        ijk -= ijk.min(axis=0) - 1
+        dims = ijk.max(axis=0) + 2
+        keys = ijk[:, 0] + dims[0] * (ijk[:, 1] + dims[1] * ijk[:, 2])
+
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        cells, start, count = np.unique(sorted_keys, return_index=True, return_counts=True)
+
+        pi, pj = [], []
+        for offset in [(0, 0, 0)] + HALF_SHELL:
+            dx, dy, dz = offset
+            neighbour = sorted_keys + (dx + dims[0] * (dy + dims[1] * dz))
+            loc = np.minimum(np.searchsorted(cells, neighbour), len(cells) - 1)
+            a = np.flatnonzero(cells[loc] == neighbour)
+            s, c = start[loc[a]], count[loc[a]]
+            # every particle in a against every member of its neighbour cell
+            ii = np.repeat(a, c)
+            jj = np.repeat(s - np.cumsum(c) + c, c) + np.arange(c.sum())
+            if offset == (0, 0, 0):
+                keep = jj > ii
+                ii, jj = ii[keep], jj[keep]
+            pi.append(ii)
+            pj.append(jj)
+        i = order[np.concatenate(pi)]
+        j = order[np.concatenate(pj)]
+        self.candidates = len(i)
+        return i, j
+
+
+class CylinderWall:
+    """Inside of a closed cylinder centred on the origin with its axis along x."""
+
+    def __init__(self, radius, length):
+        self.radius = radius
+        self.length = length
+        self.hits = 0
+
+    def resolve(self, pos, vel, r):
+        # curved wall: reflect the outward radial velocity component
+        rho = np.hypot(pos[:, 1], pos[:, 2])
+        out = np.flatnonzero(rho > self.radius - r)
+        if len(out):
+            n = np.zeros((len(out), 3))
+            n[:, 1] = pos[out, 1] / rho[out]
+            n[:, 2] = pos[out, 2] / rho[out]
+            vn = np.einsum('ij,ij->i', vel[out], n)
+            moving_out = vn > 0
+            vel[out] -= (2 * np.where(moving_out, vn, 0.0))[:, None] * n
+            pos[out, 1:] = n[:, 1:] * (self.radius - r)
+            self.hits += int(moving_out.sum())
+
+        # flat ends
+        half = self.length / 2 - r
+        over = np.abs(pos[:, 0]) > half
+        hitting = over & (np.sign(vel[:, 0]) == np.sign(pos[:, 0]))
+        vel[hitting, 0] *= -1
+        pos[over, 0] = np.clip(pos[over, 0], -half, half)
+        self.hits += int(hitting.sum())
+
+
+class RingSet:
+    """Solid tori (VPython `ring`s): centres (k, 3), shared axis, radius and thickness."""
+
+    def __init__(self, centers, axis, radius, thickness):
+        self.centers = np.asarray(centers, dtype=float)
+        axis = np.asarray(axis, dtype=float)
+        self.axis = axis / np.linalg.norm(axis)
+        self.radius = radius
+        self.thickness = thickness
+        self.hits = 0
+
+    def resolve(self, pos, vel, r):
+        reach = self.radius + self.thickness + r
+        for c in self.centers:
+            rel = pos - c
+            # cheap bounding-sphere reject before the exact torus test
+            near = np.flatnonzero(np.einsum('ij,ij->i', rel, rel) < reach * reach)
+            if not len(near):
+                continue
+            rel = rel[near]
+            axial = rel @ self.axis
+            radial = rel - axial[:, None] * self.axis
+            rho = np.linalg.norm(radial, axis=1)
+            safe = np.where(rho > 1e-12, rho, 1.0)
+            # vector from the nearest point on the tube's core circle
+            w = rel - radial * (self.radius / safe)[:, None]
+            dist = np.linalg.norm(w, axis=1)
+            hit = dist < self.thickness + r
+            if not hit.any():
+                continue
+            idx = near[hit]
+            n = w[hit] / np.maximum(dist[hit], 1e-12)[:, None]
+            vn = np.einsum('ij,ij->i', vel[idx], n)
+            vel[idx] -= (2 * np.minimum(vn, 0.0))[:, None] * n
+            pos[idx] += n * (self.thickness + r - dist[hit])[:, None]
+            self.hits += int((vn < 0).sum())
+
+
+class Collider:
+    """Particle-particle contacts plus any number of static obstacles."""
+
+    def __init__(self, radius, obstacles=(), particle_contacts=True):
+        self.radius = radius
+        self.obstacles = list(obstacles)
+        self.grid = SpatialHash(2 * radius) if particle_contacts else None
+        self.contacts = 0
+
+    def resolve(self, pos, vel):
+        if self.grid is not None:
+            self._particle_contacts(pos, vel)
+        for obstacle in self.obstacles:
+            obstacle.resolve(pos, vel, self.radius)
+
+    def _particle_contacts(self, pos, vel):
+        i, j = self.grid.pairs(pos)
+        d = pos[j] - pos[i]
+        dist2 = np.einsum('ij,ij->i', d, d)
+        touching = (dist2 < (2 * self.radius) ** 2) & (dist2 > 0)
+        i, j, d = i[touching], j[touching], d[touching]
+        dist = np.sqrt(dist2[touching])
+        n = d / dist[:, None]
+
+        # equal-mass elastic exchange of the normal velocity, approaching pairs only
+        vn = np.einsum('ij,ij->i', vel[j] - vel[i], n)
+        impulse = np.minimum(vn, 0.0)[:, None] * n
+        _accumulate(vel, i, impulse)
+        _accumulate(vel, j, -impulse)
+
+        # split the overlap so contacts don't stick together
+        push = (0.5 * (2 * self.radius - dist))[:, None] * n
+        _accumulate(pos, i, -push)
+        _accumulate(pos, j, push)
+        self.contacts += int((vn < 0).sum())
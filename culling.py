@@ -0,0 +1,231 @@
+# culling.py
+# Visibility-aware update culling. Once per camera view the UpdateCuller
+# builds the view frustum (four side planes plus a near plane through the
+# camera); bounds are then tested against it as whole arrays, optionally
+# also against opaque discs (the chamber end caps). Updates for objects that
+# can't be seen are skipped:
+#
+#   culler = UpdateCuller(scene)
+#   snow.cull = culler.points(radius=0.05, name='snow')      # points objects
+#   sky = culler.objects(sky_stars, name='sky stars')         # separate objects
+#   sky.set(i, 'radius', r)          # written now if visible, else held back
+#   sky.refresh()                    # once per frame: held writes of objects
+#                                    # back in view are sent
+#
+# Points objects are rebuilt from their arrays on every push, so leaving the
+# culled points out is enough and they come back with their current state.
+# Set VPY_CULL=0 to disable culling (every test passes; counts still kept).
+import math
+import os
+
+import numpy as np
+
+
+def _xyz(v):
+    return np.array([v.x, v.y, v.z], dtype=float)
+
+
+def _unit(v):
+    return v / max(np.linalg.norm(v), 1e-12)
+
+
+class Frustum:
+    """Camera frustum as inward-facing planes through the eye (plus a near plane)."""
+
+    def __init__(self, eye, forward, up, tan_x, tan_y, near=0.0):
+        self.eye = np.asarray(eye, dtype=float)
+        f = _unit(np.asarray(forward, dtype=float))
+        r = _unit(np.cross(f, up))
+        u = np.cross(r, f)
+        # a point d (relative to the eye) is inside when |d.r| <= tan_x d.f, |d.u| <= tan_y d.f
+        normals = [_unit(tan_x * f - r), _unit(tan_x * f + r),
+                   _unit(tan_y * f - u), _unit(tan_y * f + u), f]
+        self.normals = np.array(normals)                 # (5, 3)
+        self.offsets = np.array([0, 0, 0, 0, near], dtype=float)
+        self.forward = f
+
+    @classmethod
+    def from_canvas(cls, scene, near=0.0):
+        cam = scene.camera
+        up = getattr(cam, 'up', None)
+        if up is None:
+            up = getattr(scene, 'up', None)
+        up = _xyz(up) if up is not None else np.array([0.0, 1.0, 0.0])
+        # the field of view applies to the smaller canvas dimension
+        t = math.tan(getattr(scene, 'fov', math.pi / 3) / 2)
+        short = min(scene.width, scene.height)
+        return cls(_xyz(cam.pos), _xyz(cam.axis), up,
+                   t * scene.width / short, t * scene.height / short, near)
+
+    def contains(self, centers, radii=0.0):
+        """Mask of spheres at least partly inside the frustum."""
+        d = np.asarray(centers, dtype=float).reshape(-1, 3) - self.eye
+        dist = d @ self.normals.T - self.offsets          # (n, 5) signed distances
+        return np.all(dist >= -np.asarray(radii, dtype=float).reshape(-1, 1), axis=1)
+
+
+class Disc:
+    """Opaque disc (e.g. a chamber end cap) that hides what is fully behind it."""
+
+    def __init__(self, center, normal, radius):
+        self.center = np.asarray(center, dtype=float)
+        self.normal = _unit(np.asarray(normal, dtype=float))
+        self.radius = radius
+
+    def occludes(self, eye, centers, radii=0.0):
+        """Mask of spheres whose whole silhouette from `eye` falls on the disc."""
+        p = np.asarray(centers, dtype=float).reshape(-1, 3)
+        radii = np.broadcast_to(np.asarray(radii, dtype=float), len(p))
+        s_eye = float(np.dot(eye - self.center, self.normal))
+        s_p = (p - self.center) @ self.normal
+        # the sphere must lie entirely on the far side of the disc plane
+        behind = (s_eye * s_p < 0) & (np.abs(s_p) > radii)
+        if not behind.any():
+            return behind
+        d = p - eye
+        t = s_eye / np.where(behind, s_eye - s_p, 1.0)    # where eye->p crosses the plane
+        hit = eye + t[:, None] * d
+        # sphere's footprint on the plane, widened for oblique views
+        cos = np.abs(d @ self.normal) / np.maximum(np.linalg.norm(d, axis=1), 1e-12)
+        spread = radii * t / np.maximum(cos, 1e-3)
+        return behind & (np.linalg.norm(hit - self.center, axis=1) + spread < self.radius)
+
+
+class _Group:
+    def __init__(self, culler, name):
+        self.culler = culler
+        self.name = name
+        self.updates = 0
+        self.culled = 0
+
+    def _count(self, mask):
+        self.updates += len(mask)
+        self.culled += len(mask) - int(np.count_nonzero(mask))
+        return mask
+
+
+class PointCull(_Group):
+    """Callable mask for a points object's positions (see ParticleCloud.cull)."""
+
+    def __init__(self, culler, radius, occluders, name):
+        super().__init__(culler, name)
+        self.radius = radius
+        self.occluders = occluders
+
+    def __call__(self, pos):
+        return self._count(self.culler.visible(pos, self.radius, self.occluders))
+
+
+class ObjectCull(_Group):
+    """Attribute writes for separate objects, held back while they are out of view."""
+
+    def __init__(self, culler, objects, radii, occluders, name):
+        super().__init__(culler, name)
+        self.objects = list(objects)
+        self.centers = np.array([[o.pos.x, o.pos.y, o.pos.z] for o in self.objects]).reshape(-1, 3)
+        if radii is None:
+            radii = [getattr(o, 'radius', 0.0) for o in self.objects]
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=float), len(self.objects))
+        self.occluders = occluders
+        self.stale = {}                   # index -> {attribute: latest value}
+        self.caught_up = 0
+        self._view = None
+        self.mask = np.ones(len(self.objects), dtype=bool)
+        self.refresh()
+
+    def refresh(self):
+        """Re-test against the current view; send held writes of objects back in view."""
+        view = self.culler.view()
+        if view == self._view:
+            return
+        self._view = view
+        self.mask = self.culler.visible(self.centers, self.radii, self.occluders)
+        for i in [i for i in self.stale if self.mask[i]]:
+            for name, value in self.stale.pop(i).items():
+                setattr(self.objects[i], name, value)
+            self.caught_up += 1
+
+    def set(self, i, name, value):
+        self._count(self.mask[i:i + 1])
+        if self.mask[i]:
+            setattr(self.objects[i], name, value)
+        else:
+            self.stale.setdefault(i, {})[name] = value
+
+
+class UpdateCuller:
+    """Frustum (and occluder) tests against one canvas's camera."""
+
+    def __init__(self, scene, enabled=True, near=0.0):
+        self.scene = scene
+        self.enabled = enabled
+        self.near = near
+        self.groups = []
+        self._view = None
+        self._frustum = None
+
+    @classmethod
+    def from_env(cls, scene, **kw):
+        return cls(scene, enabled=os.environ.get('VPY_CULL', '1') != '0', **kw)
+
+    def view(self):
+        s = self.scene
+        cam = s.camera
+        return (cam.pos.x, cam.pos.y, cam.pos.z, cam.axis.x, cam.axis.y, cam.axis.z,
+                s.width, s.height, getattr(s, 'fov', None))
+
+    @property
+    def frustum(self):
+        view = self.view()
+        if view != self._view:
+            # rebuilt only when the camera or canvas changed
+            self._view = view
+            self._frustum = Frustum.from_canvas(self.scene, self.near)
+        return self._frustum
+
+    def visible(self, centers, radii=0.0, occluders=()):
+        """Mask of bounding spheres that may be visible from the camera."""
+        n = len(centers)
+        if not self.enabled or not n:
+            return np.ones(n, dtype=bool)
+        frustum = self.frustum
+        mask = frustum.contains(centers, radii)
+        for disc in occluders:
+            mask &= ~disc.occludes(frustum.eye, centers, radii)
+        return mask
+
+    def points(self, radius=0.0, occluders=(), name='points'):
+        group = PointCull(self, radius, occluders, name)
+        self.groups.append(group)
+        return group
+
+    def objects(self, objects, radii=None, occluders=(), name='objects'):
+        group = ObjectCull(self, objects, radii, occluders, name)
+        self.groups.append(group)
+        return group
+
+    def stats(self):
+        updates = sum(g.updates for g in self.groups)
+        culled = sum(g.culled for g in self.groups)
+        return {'updates': updates,
+                'culled': culled,
+                'culled_fraction': culled / updates if updates else 0.0,
+                'groups': {g.name: {'updates': g.updates, 'culled': g.culled,
+                                    'culled_fraction': g.culled / g.updates if g.updates else 0.0}
+                           for g in self.groups}}
+
+    def report(self):
+        stats = self.stats()
+        lines = ['{:<14} {:>10} {:>10} {:>8}'.format('culled', 'updates', 'skipped', 'frac')]
+        for name, g in stats['groups'].items():
+            lines.append('{:<14} {:>10} {:>10} {:>8.1%}'.format(
+                name, g['updates'], g['culled'], g['culled_fraction']))
+        lines.append('{:<14} {:>10} {:>10} {:>8.1%}'.format(
+            'total', stats['updates'], stats['culled'], stats['culled_fraction']))
+        return '\n'.join(lines)
+
+    def close(self):
+        # the culled fraction is reported next to the profiler's summary
+        from profiler import profiler
+        if profiler.enabled and self.groups:
+            print(self.report())
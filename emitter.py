@@ -0,0 +1,102 @@
+# emitter.py
+# Particle emitters for large effects such as snowfall. Flakes live in NumPy
+# arrays; falling, wind drift and ground respawn are vectorized (dead or
+# landed flakes are recycled in place from the spawn volume), and the whole
+# emitter renders through a single `points` object.
+from scene_api import points, color
+from particles import push_points
+from rng import stream_for
+import numpy as np
+
+
+class SpawnBox:
+    """Axis-aligned spawn volume between two corners."""
+
+    def __init__(self, lo, hi):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+
+    def sample(self, rng, n):
+        return rng.uniform(self.lo, self.hi, size=(n, 3))
+
+
+class ParticleEmitter:
+    """Fixed-capacity pool of falling particles recycled at a ground plane.
+
+    rate is the emission rate in particles per second; None fills the pool
+    at once (from `initial`, or the spawn volume if not given). Spawns draw
+    from `rng` (a stream from rng.py), or a stream seeded with `seed`.
+    """
+
+    def __init__(self, capacity, spawn, ground_y, fall_speed=3.0, wind=(0, 0, 0),
+                 gust=0.0, gust_freq=0.5, rate=None, initial=None,
+                 radius=0.05, color=color.white, seed=None, rng=None):
+        self.rng = rng if rng is not None else stream_for('emitter', seed)
+        self.spawn = spawn
+        self.ground_y = ground_y
+        self.fall = np.array([0.0, -fall_speed, 0.0])
+        self.wind = np.asarray(wind, dtype=float)
+        self.gust = gust
+        self.gust_freq = gust_freq
+        self.rate = rate
+
+        # === Pool state ===
+        self.pos = np.zeros((capacity, 3))
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.phase = self.rng.uniform(0, 2 * np.pi, capacity)   # per-flake sway
+        self._carry = 0.0
+        self.respawned = 0
+        if rate is None:
+            self.pos[:] = (initial or spawn).sample(self.rng, capacity)
+            self.alive[:] = True
+        self.prev = self.pos.copy()       # previous physics state, for interpolation
+        self.cull = None                  # optional visibility mask, see culling.py
+
+        self.visual = points(radius=radius, color=color, size_units='world')
+        self.push()
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def emit(self, n):
+        dead = np.flatnonzero(~self.alive)[:n]
+        self.pos[dead] = self.spawn.sample(self.rng, len(dead))
+        self.prev[dead] = self.pos[dead]
+        self.alive[dead] = True
+        return len(dead)
+
+    def step(self, dt, t=0.0):
+        self.prev[:] = self.pos
+        if self.rate is not None:
+            self._carry += self.rate * dt
+            n = int(self._carry)
+            self._carry -= n
+            self.emit(n)
+
+        # fall + steady wind for the whole pool, plus a per-flake sway in x/z
+        self.pos += (self.fall + self.wind) * dt
+        if self.gust:
+            sway = self.gust * dt * np.sin(self.gust_freq * t + self.phase)
+            self.pos[:, 0] += sway
+            self.pos[:, 2] += 0.5 * sway
+
+        # recycle everything that reached the ground
+        landed = np.flatnonzero(self.alive & (self.pos[:, 1] < self.ground_y))
+        if len(landed):
+            self.pos[landed] = self.spawn.sample(self.rng, len(landed))
+            self.prev[landed] = self.pos[landed]      # no streak back to the ground
+            self.respawned += len(landed)
+
+    def push(self, alpha=1.0, part=None):
+        pos = self.pos if alpha >= 1.0 else self.prev + alpha * (self.pos - self.prev)
+        if part is not None:
+            # spread over frames (see scheduler.py): only this slice of the pool
+            # moves, the rest stays where it was last shown
+            shown = self.shown.copy()
+            shown[part] = pos[part]
+            pos = shown
+        self.shown = pos
+        pos = pos[self.alive]
+        if self.cull is not None:
+            pos = pos[self.cull(pos)]
+        push_points(self.visual, pos)
@@ -0,0 +1,594 @@
+# gltf_export.py
+# Export a simulated run to glTF 2.0 binary (.glb) for offline rendering.
+#
+# Every frame the exporter samples each primitive on the canvas (transform,
+# color, opacity, visibility), picking up objects as they are created.
+# Geometry comes from the baking tessellators: one unit mesh per primitive
+# type is shared by all nodes of that type and sized through the node scale.
+# Every point of a points object is a node of its own (a small sphere), so
+# moving particles, snow and glows animate like any other primitive. Curves
+# keep the points of the first frame they had any; labels and lights are
+# skipped with a warning (see SceneExporter). Transforms become node
+# animation channels, and colors/opacity become material channels via
+# KHR_animation_pointer.
+#
+# Samples are reduced to keyframes one chunk at a time: channels that never
+# change are dropped, and keys that linear interpolation can reproduce
+# (within a tolerance) are removed, so memory stays flat and a long run
+# exports only the keys it needs. Everything is packed into the GLB binary
+# chunk as float32 arrays.
+#
+# Set VPY_GLTF=run.glb to export any scene on the headless backend; the file
+# is written when the frame loop ends (see scene_api.frames).
+import json
+import struct
+import warnings
+
+import numpy as np
+
+from baking import tess_box, tess_pyramid, tess_sphere, tess_cylinder, tess_cone, tess_ring
+from mesh import vertex_normals
+
+CHUNK_FRAMES = 600
+# max interpolation error kept per channel (scene units, quaternion, scale, color)
+TOLERANCE = {'translation': 1e-3, 'rotation': 1e-4, 'scale': 1e-4, 'color': 2e-3}
+
+FLOAT, UINT16, UINT32 = 5126, 5123, 5125
+ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER = 34962, 34963
+TYPES = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4'}
+
+# unit geometry in the local frame (x along axis), sized by the node scale
+UNIT_MESHES = {
+    'box': lambda o: tess_box((1, 1, 1)),
+    'pyramid': lambda o: tess_pyramid((1, 1, 1)),
+    'ellipsoid': lambda o: tess_sphere(0.5, lat=12, lon=18),
+    'sphere': lambda o: tess_sphere(1.0, lat=12, lon=18),
+    'simple_sphere': lambda o: tess_sphere(1.0, lat=6, lon=8),
+    'cylinder': lambda o: tess_cylinder(1.0, 1.0),
+    'cone': lambda o: tess_cone(1.0, 1.0),
+    # a torus can't be scaled into another tube thickness: one mesh per shape
+    'ring': lambda o: tess_ring(o.radius, o.thickness),
+    # one point of a points object
+    'point': lambda o: tess_sphere(1.0, lat=4, lon=6),
+}
+
+
+def _scale(obj, kind):
+    if kind in ('box', 'pyramid', 'ellipsoid'):
+        s = obj.size
+        return s.x, s.y, s.z
+    if kind in ('sphere', 'simple_sphere'):
+        return obj.radius, obj.radius, obj.radius
+    if kind in ('cylinder', 'cone'):
+        return obj.axis.mag, obj.radius, obj.radius
+    return 1.0, 1.0, 1.0
+
+
+def _kind(obj):
+    kind = type(obj).__name__
+    if (kind in UNIT_MESHES and kind != 'point') or kind in ('points', 'curve'):
+        return kind
+    if kind == 'compound' and hasattr(obj, 'parts'):
+        return kind
+    return None
+
+
+def _point_list(obj, relative=True):
+    """Positions (relative to pos) and RGBA colors of a points object's or curve's points."""
+    pts = obj._pts if hasattr(obj, '_pts') else [obj.point(i) for i in range(obj.npoints)]
+    verts = np.array([[p['pos'].x, p['pos'].y, p['pos'].z] for p in pts]).reshape(-1, 3)
+    colors = np.array([[p['color'].x, p['color'].y, p['color'].z, obj.opacity] for p in pts]).reshape(-1, 4)
+    if relative:
+        verts = verts - [obj.pos.x, obj.pos.y, obj.pos.z]
+    return verts, colors
+
+
+def _point_radius(obj, canvas):
+    """World radius of a points object's dots; pixel sizes are converted at the canvas range."""
+    if getattr(obj, 'size_units', 'pixels') == 'world':
+        return obj.radius
+    pixels = obj.radius or 2.5          # VPython draws radius 0 as a 5 pixel dot
+    return pixels * getattr(canvas, 'range', 1.0) / (getattr(canvas, 'height', 400) / 2)
+
+
+def _hold(values, shown):
+    """Carry each slot's last shown value (first shown, before that) over frames it is hidden."""
+    values = values.copy()
+    for f in range(1, len(values)):
+        hidden = ~shown[f]
+        values[f, hidden] = values[f - 1, hidden]
+    seen = np.logical_or.accumulate(shown, axis=0)
+    for f in range(len(values) - 2, -1, -1):
+        values[f, ~seen[f]] = values[f + 1, ~seen[f]]
+    return values
+
+
+# === Math (vectorized over any leading dimensions) ===
+def frames_from(axis, up):
+    """Rotation matrices whose columns are axis, up and axis x up."""
+    a = axis / np.maximum(np.linalg.norm(axis, axis=-1, keepdims=True), 1e-12)
+    u = up - a * np.sum(up * a, axis=-1, keepdims=True)
+    n = np.linalg.norm(u, axis=-1, keepdims=True)
+    # up parallel to axis: fall back to any perpendicular, like VPython
+    alt = np.where(np.abs(a[..., 1:2]) > 0.9, [0.0, 0.0, 1.0], [0.0, 1.0, 0.0])
+    alt = alt - a * np.sum(alt * a, axis=-1, keepdims=True)
+    u = np.where(n > 1e-9, u, alt)
+    u = u / np.linalg.norm(u, axis=-1, keepdims=True)
+    return np.stack([a, u, np.cross(a, u)], axis=-1)
+
+
+def matrix_to_quat(m):
+    """Rotation matrices (..., 3, 3) -> unit quaternions (..., 4) as glTF x, y, z, w."""
+    m00, m01, m02 = m[..., 0, 0], m[..., 0, 1], m[..., 0, 2]
+    m10, m11, m12 = m[..., 1, 0], m[..., 1, 1], m[..., 1, 2]
+    m20, m21, m22 = m[..., 2, 0], m[..., 2, 1], m[..., 2, 2]
+    trace = np.stack([1 + m00 + m11 + m22, 1 + m00 - m11 - m22,
+                      1 - m00 + m11 - m22, 1 - m00 - m11 + m22], axis=-1)
+    # Shepperd: build from the largest diagonal term for stability
+    s = 2 * np.sqrt(np.maximum(trace, 1e-12))
+    cand = np.stack([
+        np.stack([(m21 - m12) / s[..., 0], (m02 - m20) / s[..., 0], (m10 - m01) / s[..., 0], s[..., 0] / 4], -1),
+        np.stack([s[..., 1] / 4, (m01 + m10) / s[..., 1], (m02 + m20) / s[..., 1], (m21 - m12) / s[..., 1]], -1),
+        np.stack([(m01 + m10) / s[..., 2], s[..., 2] / 4, (m12 + m21) / s[..., 2], (m02 - m20) / s[..., 2]], -1),
+        np.stack([(m02 + m20) / s[..., 3], (m12 + m21) / s[..., 3], s[..., 3] / 4, (m10 - m01) / s[..., 3]], -1),
+    ], axis=-2)
+    k = trace.argmax(axis=-1)[..., None, None]
+    return np.take_along_axis(cand, k, axis=-2)[..., 0, :]
+
+
+def continuous(quats, previous=None):
+    """Flip signs along the time axis (0) so consecutive quaternions stay close."""
+    ref = np.concatenate([quats[:1] if previous is None else previous[None], quats[:-1]])
+    flips = np.sum(quats * ref, axis=-1) < 0
+    # a flip changes the sign of everything after it
+    sign = np.where(np.cumsum(flips, axis=0) % 2 == 1, -1.0, 1.0)
+    return quats * sign[..., None]
+
+
+def reduce_keys(times, values, tol):
+    """Indices of the keyframes to keep so linear interpolation stays within tol."""
+    m = len(times)
+    if m <= 2:
+        return np.arange(m)
+    keep = np.zeros(m, dtype=bool)
+    keep[[0, -1]] = True
+    samples = np.arange(m)
+    while True:
+        idx = np.flatnonzero(keep)
+        seg = np.minimum(np.searchsorted(idx, samples, side='right') - 1, len(idx) - 2)
+        a, b = idx[seg], idx[seg + 1]
+        w = ((times - times[a]) / (times[b] - times[a]))[:, None]
+        err = np.abs(values[a] + w * (values[b] - values[a]) - values).max(axis=1)
+        err[keep] = 0.0
+        if err.max() <= tol:
+            return idx
+        # split every out-of-tolerance segment at its worst sample
+        order = np.lexsort((-err, seg))
+        first = order[np.r_[True, seg[order][1:] != seg[order][:-1]]]
+        keep[first[err[first] > tol]] = True
+
+
+# === Sampling ===
+class _Channel:
+    """Keyframes of one animated property, reduced chunk by chunk."""
+
+    def __init__(self, tol):
+        self.tol = tol
+        self.times = []
+        self.values = []
+        self.tail = None         # last raw sample (time, value) of the previous chunk
+
+    def add(self, times, values):
+        if self.tail is None:
+            self.times.append(times[:1])
+            self.values.append(values[:1])
+            if len(times) == 1:
+                self.tail = (times[0], values[0])
+                return
+        else:
+            times = np.concatenate([[self.tail[0]], times])
+            values = np.concatenate([self.tail[1][None], values])
+        self.tail = (times[-1], values[-1])
+        if np.abs(values - values[0]).max() <= self.tol:
+            keep = [len(times) - 1]          # held value: only the chunk's last key
+        else:
+            keep = reduce_keys(times, values, self.tol)[1:]
+        self.times.append(times[keep])
+        self.values.append(values[keep])
+
+    def keys(self):
+        t = np.concatenate(self.times)
+        v = np.concatenate(self.values)
+        keep = reduce_keys(t, v, self.tol)     # drop leftover chunk-boundary keys
+        return t[keep], v[keep]
+
+    @property
+    def constant(self):
+        v = np.concatenate(self.values)
+        return np.abs(v - v[0]).max() <= self.tol
+
+
+class SceneExporter:
+    """Samples every primitive of a canvas each frame and writes a .glb file.
+
+    Objects are picked up in the frame they are created; before that their
+    node is scaled to nothing. Point i of a points object is node i of its
+    slots, with its own position and color channels; it is scaled to
+    nothing in frames where the object has fewer than i + 1 points or is
+    hidden. Curves are exported as they are in the first frame they have
+    points, as line strips without their tube radius. Labels, loose
+    triangles and lights are not exported; each skipped type is warned about
+    once.
+    """
+
+    def __init__(self, path, canvas, chunk_frames=CHUNK_FRAMES):
+        self.path = path
+        self.canvas = canvas
+        self.chunk_frames = chunk_frames
+        self.nodes = []
+        self.frames = 0              # frames sampled so far
+        self._scanned = 0            # canvas objects already looked at
+        self._parts = set()          # ids of compound parts, drawn through their compound
+        self._skipped = set()
+        self._first_time = None      # time of the first sample
+        self._last_time = None       # time of the previous chunk's last sample
+        self._times = []
+        self._rows = []
+
+    def _skip(self, what):
+        if what not in self._skipped:
+            self._skipped.add(what)
+            warnings.warn('gltf_export: {} not exported'.format(what))
+
+    def _register(self):
+        """Add nodes for the canvas objects created since the last sample."""
+        new = self.canvas.objects[self._scanned:]
+        self._scanned += len(new)
+        for obj in new:
+            if _kind(obj) == 'compound':
+                self._parts.update(id(p) for p in obj.parts)
+        for obj in new:
+            if id(obj) in self._parts:
+                continue
+            kind = _kind(obj)
+            if kind is None:
+                self._skip('{} objects'.format(type(obj).__name__))
+                continue
+            node = {'obj': obj, 'kind': kind, 'since': self.frames, 'points': None,
+                    'emissive': bool(getattr(obj, 'emissive', False))}
+            if kind == 'compound':
+                node['axis_length'] = obj.axis.mag
+            if kind == 'points':
+                node['slots'], node['samples'] = [], []
+            node['channels'] = {name: _Channel(tol) for name, tol in TOLERANCE.items()}
+            self.nodes.append(node)
+
+    def sample(self, t):
+        self._register()
+        row = np.empty((len(self.nodes), 16))
+        for i, node in enumerate(self.nodes):
+            o, kind = node['obj'], node['kind']
+            if kind == 'points':
+                verts, colors = _point_list(o, relative=False)
+                node['samples'].append((verts, colors, bool(o.visible)))
+            elif kind == 'curve' and node['points'] is None and o.npoints:
+                node['points'] = _point_list(o)
+            p, a, u, c = o.pos, o.axis, o.up, o.color
+            if not o.visible:
+                scale = (0.0, 0.0, 0.0)
+            elif kind == 'compound':
+                k = a.mag / node['axis_length']
+                scale = (k, k, k)
+            else:
+                scale = _scale(o, kind)
+            row[i] = (p.x, p.y, p.z, a.x, a.y, a.z, u.x, u.y, u.z,
+                      scale[0], scale[1], scale[2], c.x, c.y, c.z, o.opacity)
+        if self._first_time is None:
+            self._first_time = t
+        self.frames += 1
+        self._times.append(t)
+        self._rows.append(row)
+        if len(self._rows) >= self.chunk_frames:
+            self._reduce_chunk()
+
+    def _reduce_chunk(self):
+        if not self._rows:
+            return
+        times = np.array(self._times)
+        first = self.frames - len(self._rows)           # index of the chunk's first frame
+        data = np.empty((len(self._rows), len(self.nodes), 16))
+        for f, row in enumerate(self._rows):
+            data[f, :len(row)] = row
+        for i, node in enumerate(self.nodes):
+            k = node['since'] - first
+            if k > 0:
+                # frames before the object existed: its first sample, scaled to nothing
+                data[:k, i] = data[k, i]
+                data[:k, i, 9:12] = 0.0
+        quats = matrix_to_quat(frames_from(data[..., 3:6], data[..., 6:9]))
+        for i, node in enumerate(self.nodes):
+            if node['kind'] == 'points':
+                self._reduce_points(node, times, first)
+                continue
+            ch = node['channels']
+            t, d, q = times, data[:, i], quats[:, i]
+            if ch['translation'].tail is None and first > 0:
+                # created in a later chunk: hidden from the start of the run until then
+                head = np.unique([self._first_time, self._last_time])
+                hidden = np.repeat(d[:1], len(head), axis=0)
+                hidden[:, 9:12] = 0.0
+                t = np.concatenate([head, t])
+                d = np.concatenate([hidden, d])
+                q = np.concatenate([np.repeat(q[:1], len(head), axis=0), q])
+            prev = ch['rotation'].tail[1] if ch['rotation'].tail is not None else None
+            ch['translation'].add(t, d[:, 0:3])
+            ch['rotation'].add(t, continuous(q, prev))
+            ch['scale'].add(t, d[:, 9:12])
+            ch['color'].add(t, d[:, 12:16])
+        self._last_time = times[-1]
+        self._times, self._rows = [], []
+
+    def _reduce_points(self, node, times, first):
+        """Per-point channels of a points object for the chunk's frames."""
+        samples, node['samples'] = node['samples'], []
+        k = len(times) - len(samples)                   # frames before the object existed
+        n = max([len(v) for v, _, _ in samples] + [len(node['slots'])])
+        if not n:
+            return
+        pos = np.zeros((len(times), n, 3))
+        col = np.zeros((len(times), n, 4))
+        shown = np.zeros((len(times), n), dtype=bool)
+        for f, (verts, colors, visible) in enumerate(samples, k):
+            pos[f, :len(verts)] = verts
+            col[f, :len(colors)] = colors
+            shown[f, :len(verts)] = visible
+        pos, col = _hold(pos, shown), _hold(col, shown)
+        radius = _point_radius(node['obj'], self.canvas)
+        scale = np.repeat(np.where(shown, radius, 0.0)[..., None], 3, axis=2)
+        identity = np.tile([0.0, 0.0, 0.0, 1.0], (len(times), 1))
+        while len(node['slots']) < n:
+            node['slots'].append({'obj': node['obj'], 'kind': 'point', 'emissive': node['emissive'],
+                                  'channels': {name: _Channel(tol) for name, tol in TOLERANCE.items()}})
+        for j, slot in enumerate(node['slots']):
+            ch = slot['channels']
+            t, p, c, s, q = times, pos[:, j], col[:, j], scale[:, j], identity
+            if ch['translation'].tail is None and first > 0:
+                # a slot first filled in a later chunk: hidden from the start of the run until then
+                head = np.unique([self._first_time, self._last_time])
+                t = np.concatenate([head, t])
+                p, c, q = (np.concatenate([np.repeat(a[:1], len(head), axis=0), a]) for a in (p, c, q))
+                s = np.concatenate([np.zeros((len(head), 3)), s])
+            ch['translation'].add(t, p)
+            ch['rotation'].add(t, q)
+            ch['scale'].add(t, s)
+            ch['color'].add(t, c)
+
+    # === Writing ===
+    def save(self):
+        if not self.frames:
+            self.sample(0.0)             # a still export of the scene as it is
+        self._reduce_chunk()
+        if getattr(self.canvas, 'lights', None):
+            self._skip('lights')
+        gltf = _GltfBuilder()
+        for node in self.nodes:
+            if node['kind'] == 'points':
+                for slot in node['slots']:
+                    gltf.add_node(slot)
+                continue             # no slots: never had points (e.g. an unused LOD level)
+            if node['kind'] == 'curve' and node['points'] is None:
+                continue
+            gltf.add_node(node)
+        gltf.write(self.path)
+        return self.path
+
+
+class _GltfBuilder:
+    def __init__(self):
+        self.doc = {'asset': {'version': '2.0', 'generator': 'vpython-practice-projects gltf_export'},
+                    'scene': 0, 'scenes': [{'nodes': []}], 'nodes': [], 'meshes': [],
+                    'materials': [], 'accessors': [], 'bufferViews': [], 'buffers': [],
+                    'animations': [{'name': 'run', 'channels': [], 'samplers': []}]}
+        self.blob = bytearray()
+        self.anim = bytearray()            # animation keys, one packed buffer view
+        self.anim_accessors = []
+        self.geometry = {}                 # geometry key -> primitive attributes
+        self.translucent = set()           # geometry keys with per-vertex alpha < 1
+        self.meshes = {}                   # (geometry key, material) -> mesh index
+        self.materials = {}                # static material key -> material index
+        self.uses_pointer = False
+
+    def _view(self, data, target=None):
+        offset = len(self.blob)
+        self.blob += data.tobytes()
+        self.blob += b'\0' * (-len(self.blob) % 4)
+        view = {'buffer': 0, 'byteOffset': offset, 'byteLength': data.nbytes}
+        if target:
+            view['target'] = target
+        self.doc['bufferViews'].append(view)
+        return len(self.doc['bufferViews']) - 1
+
+    def _accessor(self, data, component=FLOAT, target=None, bounds=False):
+        acc = {'bufferView': self._view(data, target), 'componentType': component,
+               'count': len(data), 'type': TYPES[1 if data.ndim == 1 else data.shape[1]]}
+        if bounds:
+            acc['min'] = np.atleast_1d(data.min(axis=0)).tolist()
+            acc['max'] = np.atleast_1d(data.max(axis=0)).tolist()
+        self.doc['accessors'].append(acc)
+        return len(self.doc['accessors']) - 1
+
+    def _anim_accessor(self, data, bounds=False):
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        acc = {'byteOffset': len(self.anim), 'componentType': FLOAT, 'count': len(data),
+               'type': TYPES[1 if data.ndim == 1 else data.shape[1]]}
+        if bounds:
+            acc['min'] = [float(data.min())]
+            acc['max'] = [float(data.max())]
+        self.anim += data.tobytes()
+        self.doc['accessors'].append(acc)
+        self.anim_accessors.append(acc)
+        return len(self.doc['accessors']) - 1
+
+    def _geometry(self, node):
+        o, kind = node['obj'], node['kind']
+        if kind == 'ring':
+            key = ('ring', round(o.radius, 6), round(o.thickness, 6))
+        elif kind in ('compound', 'curve'):
+            key = (kind, id(o))
+        else:
+            key = (kind,)
+        if key in self.geometry:
+            return key
+        colors, mode = None, 4          # TRIANGLES
+        if kind == 'compound':
+            verts, faces, colors = _compound_geometry(o)
+        elif kind == 'curve':
+            verts, colors = node['points']
+            faces, mode = None, 3           # LINE_STRIP
+        else:
+            verts, faces = UNIT_MESHES[kind](o)
+        attrs = {'POSITION': self._accessor(np.asarray(verts, np.float32), target=ARRAY_BUFFER, bounds=True)}
+        if faces is not None:
+            attrs['NORMAL'] = self._accessor(vertex_normals(verts, faces).astype(np.float32),
+                                             target=ARRAY_BUFFER)
+        if colors is not None:
+            if (np.asarray(colors)[:, 3] < 1.0).any():
+                self.translucent.add(key)
+            attrs['COLOR_0'] = self._accessor(np.asarray(colors, np.float32), target=ARRAY_BUFFER)
+        prim = {'attributes': attrs, 'mode': mode}
+        if faces is not None:
+            dtype, component = (np.uint16, UINT16) if len(verts) < 65536 else (np.uint32, UINT32)
+            prim['indices'] = self._accessor(np.asarray(faces, dtype).ravel(), component,
+                                             target=ELEMENT_ARRAY_BUFFER)
+        self.geometry[key] = prim
+        return key
+
+    def _material(self, rgba, emissive, opaque):
+        mat = {'pbrMetallicRoughness': {'baseColorFactor': [float(v) for v in rgba],
+                                        'metallicFactor': 0.0, 'roughnessFactor': 0.5}}
+        if emissive:
+            mat['emissiveFactor'] = [float(v) for v in rgba[:3]]
+        if not opaque:
+            mat['alphaMode'] = 'BLEND'
+            mat['doubleSided'] = True
+        self.doc['materials'].append(mat)
+        return len(self.doc['materials']) - 1
+
+    def add_node(self, node):
+        ch = node['channels']
+        geometry = self._geometry(node)
+        t_col, v_col = ch['color'].keys()
+        animated_color = not ch['color'].constant
+        opaque = bool((v_col[:, 3] >= 1.0).all()) and geometry not in self.translucent
+        if animated_color:
+            material = self._material(v_col[0], node['emissive'], opaque)
+        else:
+            key = (tuple(np.round(v_col[0], 4)), node['emissive'], opaque)
+            if key not in self.materials:
+                self.materials[key] = self._material(v_col[0], node['emissive'], opaque)
+            material = self.materials[key]
+
+        if (geometry, material) not in self.meshes:
+            prim = dict(self.geometry[geometry], material=material)
+            self.doc['meshes'].append({'primitives': [prim]})
+            self.meshes[(geometry, material)] = len(self.doc['meshes']) - 1
+
+        index = len(self.doc['nodes'])
+        gnode = {'name': '{}_{}'.format(node['kind'], index), 'mesh': self.meshes[(geometry, material)]}
+        for path in ('translation', 'rotation', 'scale'):
+            times, values = ch[path].keys()
+            gnode[path] = [float(v) for v in values[0]]
+            if not ch[path].constant:
+                self._channel(times, values, {'node': index, 'path': path})
+        self.doc['nodes'].append(gnode)
+        self.doc['scenes'][0]['nodes'].append(index)
+
+        if animated_color:
+            base = '/materials/{}/'.format(material)
+            self._pointer(t_col, v_col, base + 'pbrMetallicRoughness/baseColorFactor')
+            if node['emissive']:
+                self._pointer(t_col, v_col[:, :3], base + 'emissiveFactor')
+
+    def _channel(self, times, values, target):
+        anim = self.doc['animations'][0]
+        anim['samplers'].append({'input': self._anim_accessor(times, bounds=True),
+                                 'output': self._anim_accessor(values),
+                                 'interpolation': 'LINEAR'})
+        anim['channels'].append({'sampler': len(anim['samplers']) - 1, 'target': target})
+
+    def _pointer(self, times, values, pointer):
+        self.uses_pointer = True
+        self._channel(times, values, {'path': 'pointer',
+                                      'extensions': {'KHR_animation_pointer': {'pointer': pointer}}})
+
+    def write(self, path):
+        # animation keys go last as one packed view
+        if self.anim_accessors:
+            self.blob += b'\0' * (-len(self.blob) % 4)
+            offset = len(self.blob)
+            self.blob += self.anim
+            self.doc['bufferViews'].append({'buffer': 0, 'byteOffset': offset, 'byteLength': len(self.anim)})
+            view = len(self.doc['bufferViews']) - 1
+            for acc in self.anim_accessors:
+                acc['bufferView'] = view
+        else:
+            del self.doc['animations']
+        if self.uses_pointer:
+            self.doc['extensionsUsed'] = ['KHR_animation_pointer']
+        for key in [k for k, v in self.doc.items() if v == []]:
+            del self.doc[key]
+        self.blob += b'\0' * (-len(self.blob) % 4)
+        self.doc['buffers'] = [{'byteLength': len(self.blob)}]
+
+        js = json.dumps(self.doc, separators=(',', ':')).encode()
+        js += b' ' * (-len(js) % 4)
+        total = 12 + 8 + len(js) + 8 + len(self.blob)
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sII', b'glTF', 2, total))
+            f.write(struct.pack('<I4s', len(js), b'JSON') + js)
+            f.write(struct.pack('<I4s', len(self.blob), b'BIN\0') + bytes(self.blob))
+
+
+def _part_geometry(part, kind, origin):
+    """A native part of a compound as triangles in the compound's frame."""
+    verts, faces = UNIT_MESHES[kind](part)
+    p, c = part.pos, part.color
+    rot = frames_from(np.array([part.axis.x, part.axis.y, part.axis.z]),
+                      np.array([part.up.x, part.up.y, part.up.z]))
+    offset = [p.x - origin.x, p.y - origin.y, p.z - origin.z]
+    verts = (np.asarray(verts) * _scale(part, kind)) @ rot.T + offset
+    colors = np.tile([c.x, c.y, c.z, part.opacity], (len(verts), 1))
+    return verts, np.asarray(faces, dtype=int), colors
+
+
+def _compound_geometry(obj):
+    """Triangles of a compound, with shared vertex objects merged back into one index.
+
+    Native parts (rings, boxes, ...) are tessellated like standalone nodes and
+    appended after the triangles.
+    """
+    ids, verts, colors, faces = {}, [], [], []
+    o = obj.origin
+    native = []
+    for tri in obj.parts:
+        kind = type(tri).__name__
+        if kind in UNIT_MESHES:
+            native.append(_part_geometry(tri, kind, o))
+            continue
+        face = []
+        for v in getattr(tri, 'vs', ()):
+            if id(v) not in ids:
+                ids[id(v)] = len(verts)
+                verts.append((v.pos.x - o.x, v.pos.y - o.y, v.pos.z - o.z))
+                colors.append((v.color.x, v.color.y, v.color.z, v.opacity))
+            face.append(ids[id(v)])
+        if len(face) == 3:
+            faces.append(face)
+    verts = np.array(verts, dtype=float).reshape(-1, 3)
+    faces = np.array(faces, dtype=int).reshape(-1, 3)
+    colors = np.array(colors, dtype=float).reshape(-1, 4)
+    for v, f, c in native:
+        faces = np.concatenate([faces, f + len(verts)])
+        verts = np.concatenate([verts, v])
+        colors = np.concatenate([colors, c])
+    return verts, faces, colors
@@ -0,0 +1,328 @@
+# headless.py
+# In-memory stand-in for the parts of VPython the scenes use. Objects are
+# plain attribute holders registered on their canvas, so a scene can be built
+# and stepped with no server, no browser and no `vpython` import.
+import math
+
+
+# === Vectors & colors ===
+class vector:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, vector):
+            x, y, z = x.x, x.y, x.z
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __add__(self, o):
+        return vector(self.x + o.x, self.y + o.y, self.z + o.z)
+
+    def __sub__(self, o):
+        return vector(self.x - o.x, self.y - o.y, self.z - o.z)
+
+    def __mul__(self, k):
+        return vector(self.x * k, self.y * k, self.z * k)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, k):
+        return vector(self.x / k, self.y / k, self.z / k)
+
+    def __neg__(self):
+        return vector(-self.x, -self.y, -self.z)
+
+    def __pos__(self):
+        return vector(self)
+
+    def __eq__(self, o):
+        return isinstance(o, vector) and (self.x, self.y, self.z) == (o.x, o.y, o.z)
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return '<{:.6g}, {:.6g}, {:.6g}>'.format(self.x, self.y, self.z)
+
+    @property
+    def mag(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    @property
+    def mag2(self):
+        return self.x * self.x + self.y * self.y + self.z * self.z
+
+    @property
+    def hat(self):
+        m = self.mag
+        return self / m if m else vector(0, 0, 0)
+
+    def norm(self):
+        return self.hat
+
+    def dot(self, o):
+        return self.x * o.x + self.y * o.y + self.z * o.z
+
+    def cross(self, o):
+        return vector(self.y * o.z - self.z * o.y,
+                      self.z * o.x - self.x * o.z,
+                      self.x * o.y - self.y * o.x)
+
+    def rotate(self, angle=0.0, axis=None):
+        # Rodrigues' rotation formula
+        k = (axis if axis is not None else vector(0, 0, 1)).hat
+        c, s = math.cos(angle), math.sin(angle)
+        return self * c + k.cross(self) * s + k * (k.dot(self) * (1 - c))
+
+
+vec = vector
+
+
+class color:
+    red = vector(1, 0, 0)
+    green = vector(0, 1, 0)
+    blue = vector(0, 0, 1)
+    yellow = vector(1, 1, 0)
+    cyan = vector(0, 1, 1)
+    magenta = vector(1, 0, 1)
+    orange = vector(1, 0.6, 0)
+    white = vector(1, 1, 1)
+    black = vector(0, 0, 0)
+
+    @staticmethod
+    def gray(luminance):
+        return vector(luminance, luminance, luminance)
+
+
+# === Canvas ===
+class _Camera:
+    def __init__(self):
+        self.pos = vector(0, 0, 1.7320508)
+        self.axis = vector(0, 0, -1.7320508)
+        self.up = vector(0, 1, 0)
+
+
+class canvas:
+    selected = None
+
+    def __init__(self, title='', width=640, height=400, background=None, **kw):
+        self.title = title
+        self.width = width
+        self.height = height
+        self.background = background if background is not None else color.black
+        self.fov = math.pi / 3
+        self.range = 1.0
+        self.center = vector(0, 0, 0)
+        self.camera = _Camera()
+        self.objects = []
+        self.lights = []
+        for k, v in kw.items():
+            setattr(self, k, v)
+        canvas.selected = self
+
+    def select(self):
+        canvas.selected = self
+
+
+def _current_canvas():
+    if canvas.selected is None:
+        canvas()
+    return canvas.selected
+
+
+# === Primitives ===
+class _Primitive:
+    _defaults = {}
+
+    def __init__(self, **kw):
+        self.canvas = kw.pop('canvas', None) or _current_canvas()
+        self.pos = vector(0, 0, 0)
+        self.axis = vector(1, 0, 0)
+        self.up = vector(0, 1, 0)
+        self.color = vector(1, 1, 1)
+        self.opacity = 1.0
+        self.shininess = 0.6
+        self.emissive = False
+        self.visible = True
+        for k, v in self._defaults.items():
+            setattr(self, k, v)
+        for k, v in kw.items():
+            setattr(self, k, v)
+        self.canvas.objects.append(self)
+
+    def rotate(self, angle=0.0, axis=None, origin=None):
+        axis = axis if axis is not None else self.axis
+        origin = origin if origin is not None else self.pos
+        self.pos = origin + (self.pos - origin).rotate(angle, axis)
+        self.axis = self.axis.rotate(angle, axis)
+        self.up = self.up.rotate(angle, axis)
+
+    def clone(self, **kw):
+        attrs = {k: v for k, v in vars(self).items() if k != 'canvas'}
+        attrs.update(kw)
+        return type(self)(**attrs)
+
+
+class _Sized(_Primitive):
+    # length follows axis; height/width are the other two extents
+    _defaults = {'size': vector(1, 1, 1)}
+
+    @property
+    def length(self):
+        return self.size.x
+
+    @length.setter
+    def length(self, v):
+        self.size = vector(v, self.size.y, self.size.z)
+
+    @property
+    def height(self):
+        return self.size.y
+
+    @height.setter
+    def height(self, v):
+        self.size = vector(self.size.x, v, self.size.z)
+
+    @property
+    def width(self):
+        return self.size.z
+
+    @width.setter
+    def width(self, v):
+        self.size = vector(self.size.x, self.size.y, v)
+
+
+class box(_Sized):
+    pass
+
+
+class pyramid(_Sized):
+    pass
+
+
+class ellipsoid(_Sized):
+    pass
+
+
+class sphere(_Primitive):
+    _defaults = {'radius': 1.0}
+
+
+class simple_sphere(sphere):
+    pass
+
+
+class cylinder(_Primitive):
+    _defaults = {'radius': 1.0}
+
+
+class cone(cylinder):
+    pass
+
+
+class ring(_Primitive):
+    _defaults = {'radius': 1.0, 'thickness': 0.1}
+
+
+class label(_Primitive):
+    _defaults = {'text': '', 'height': 15, 'xoffset': 0, 'yoffset': 0, 'box': True}
+
+
+class vertex:
+    def __init__(self, pos=None, color=None, opacity=1.0, normal=None):
+        self.pos = pos if pos is not None else vector(0, 0, 0)
+        self.color = color if color is not None else vector(1, 1, 1)
+        self.opacity = opacity
+        self.normal = normal if normal is not None else vector(0, 0, 1)
+
+
+class triangle:
+    def __init__(self, vs=None, v0=None, v1=None, v2=None, canvas=None):
+        self.vs = list(vs) if vs is not None else [v0, v1, v2]
+        self.visible = True
+        self.canvas = canvas or _current_canvas()
+        self.canvas.objects.append(self)
+
+    @property
+    def v0(self):
+        return self.vs[0]
+
+    @property
+    def v1(self):
+        return self.vs[1]
+
+    @property
+    def v2(self):
+        return self.vs[2]
+
+
+class compound(_Primitive):
+    def __init__(self, objs, origin=None, **kw):
+        self.parts = list(objs)
+        for o in self.parts:
+            o.visible = False
+        # part coordinates are relative to origin; pos starts there
+        self.origin = origin if origin is not None else vector(0, 0, 0)
+        kw.setdefault('pos', self.origin)
+        super().__init__(**kw)
+
+
+class curve(_Primitive):
+    # a polyline of {'pos', 'color', 'radius'} dicts
+    _defaults = {'radius': 0.0, 'size_units': 'world'}
+
+    def __init__(self, pos=None, **kw):
+        self._pts = []
+        super().__init__(**kw)
+        if pos is not None:
+            self.append(pos)
+
+    def append(self, *args, **kw):
+        items = list(args[0]) if len(args) == 1 and isinstance(args[0], list) else list(args)
+        if kw:
+            items.append(kw)
+        for it in items:
+            pt = dict(it) if isinstance(it, dict) else {'pos': it}
+            pt.setdefault('color', self.color)
+            self._pts.append(pt)
+
+    def clear(self):
+        self._pts = []
+
+    def modify(self, n, **kw):
+        self._pts[n].update(kw)
+
+    def point(self, n):
+        return self._pts[n]
+
+    @property
+    def npoints(self):
+        return len(self._pts)
+
+
+class points(curve):
+    pass
+
+
+# === Lights ===
+class distant_light:
+    def __init__(self, direction=None, color=None, canvas=None):
+        self.direction = direction if direction is not None else vector(0, 0, 1)
+        self.color = color if color is not None else vector(1, 1, 1)
+        self.visible = True
+        self.canvas = canvas or _current_canvas()
+        self.canvas.lights.append(self)
+
+
+class local_light:
+    def __init__(self, pos=None, color=None, canvas=None):
+        self.pos = pos if pos is not None else vector(0, 0, 0)
+        self.color = color if color is not None else vector(1, 1, 1)
+        self.visible = True
+        self.canvas = canvas or _current_canvas()
+        self.canvas.lights.append(self)
+
+
+# === Timing ===
+def rate(fps):
+    # headless runs as fast as the CPU allows
+    pass
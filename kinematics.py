@@ -0,0 +1,109 @@
+# kinematics.py
+# Closed-form, time-parameterized motions. Every motion is a pure function of
+# absolute time t (seconds), so there is no per-frame accumulation to drift,
+# any time can be seeked to directly, and `at()` accepts an array of times to
+# evaluate many frames at once (or hand disjoint time ranges to workers).
+import numpy as np
+
+Y_AXIS = (0.0, 1.0, 0.0)
+
+
+def rotation_matrices(axis, angles):
+    """Rodrigues rotation matrices for an array of angles: (..., 3, 3)."""
+    k = np.asarray(axis, dtype=float)
+    k = k / np.linalg.norm(k)
+    angles = np.asarray(angles, dtype=float)[..., None, None]
+    kx = np.array([[0.0, -k[2], k[1]],
+                   [k[2], 0.0, -k[0]],
+                   [-k[1], k[0], 0.0]])
+    return np.eye(3) + np.sin(angles) * kx + (1 - np.cos(angles)) * (kx @ kx)
+
+
+class Motion:
+    """Base class: at(t) returns positions with shape t.shape + (..., 3)."""
+
+    def at(self, t):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return Sum(self, other)
+
+
+class Sum(Motion):
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def at(self, t):
+        return sum(p.at(t) for p in self.parts)
+
+
+class Static(Motion):
+    def __init__(self, pos):
+        self.pos = np.asarray(pos, dtype=float)
+
+    def at(self, t):
+        return np.broadcast_to(self.pos, np.shape(t) + self.pos.shape).copy()
+
+
+class Orbit(Motion):
+    """Circle in the xz-plane: center + radius * (sin(wt + phase), 0, cos(wt + phase))."""
+
+    def __init__(self, radius, omega, center=(0, 0, 0), phase=0.0):
+        self.radius = radius
+        self.omega = omega
+        self.center = np.asarray(center, dtype=float)
+        self.phase = phase
+
+    def at(self, t):
+        a = self.omega * np.asarray(t, dtype=float) + self.phase
+        return self.center + self.radius * np.stack([np.sin(a), np.zeros_like(a), np.cos(a)], axis=-1)
+
+
+class Bounce(Motion):
+    """Sinusoidal oscillation along a direction: amplitude * sin(wt + phase) * direction."""
+
+    def __init__(self, amplitude, omega, direction=Y_AXIS, phase=0.0):
+        self.amplitude = amplitude
+        self.omega = omega
+        self.direction = np.asarray(direction, dtype=float)
+        self.phase = phase
+
+    def at(self, t):
+        s = self.amplitude * np.sin(self.omega * np.asarray(t, dtype=float) + self.phase)
+        return s[..., None] * self.direction
+
+
+class Spin:
+    """Rotation about a fixed axis at constant angular speed."""
+
+    def __init__(self, axis, omega, phase=0.0):
+        self.axis = np.asarray(axis, dtype=float)
+        self.omega = omega
+        self.phase = phase
+
+    def angle_at(self, t):
+        return self.omega * np.asarray(t, dtype=float) + self.phase
+
+    def matrix_at(self, t):
+        return rotation_matrices(self.axis, self.angle_at(t))
+
+    def quat_at(self, t):
+        half = 0.5 * self.angle_at(t)
+        k = self.axis / np.linalg.norm(self.axis)
+        return np.concatenate([np.cos(half)[..., None], np.sin(half)[..., None] * k], axis=-1)
+
+    def apply(self, vectors, t):
+        # rotate local vectors (n, 3) into their orientation at time t
+        return np.asarray(vectors, dtype=float) @ np.swapaxes(self.matrix_at(t), -1, -2)
+
+
+class PivotRotation(Motion):
+    """A set of points (n, 3) turning rigidly about a pivot and axis."""
+
+    def __init__(self, points, omega, pivot=(0, 0, 0), axis=Y_AXIS, phase=0.0):
+        self.pivot = np.asarray(pivot, dtype=float)
+        self.local = np.asarray(points, dtype=float) - self.pivot
+        self.spin = Spin(axis, omega, phase)
+
+    def at(self, t):
+        return self.pivot + self.spin.apply(self.local, t)
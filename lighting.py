@@ -0,0 +1,75 @@
+# lighting.py
+# Persistent, animated lighting. Lights are created once and their color is
+# driven in place by functions of time, instead of clearing scene.lights and
+# creating new light objects every frame.
+from scene_api import local_light, distant_light, vector, sin
+
+
+def sine(base, amplitude, freq, phase=0.0):
+    """Time function base + amplitude * sin(freq * t + phase)."""
+    return lambda t: base + amplitude * sin(freq * t + phase)
+
+
+class LightRig:
+    """Named lights whose color and/or intensity follow functions of time."""
+
+    def __init__(self, name=''):
+        self.name = name
+        self.lights = {}
+        self._base = {}
+        self._color_fns = {}
+        self._intensity_fns = {}
+
+    def local(self, name, pos, color, intensity=None):
+        return self._add(name, local_light, {'pos': pos}, color, intensity)
+
+    def distant(self, name, direction, color, intensity=None):
+        return self._add(name, distant_light, {'direction': direction}, color, intensity)
+
+    def _add(self, name, factory, placement, color, intensity):
+        if name in self.lights:
+            raise ValueError('light {!r} already in rig {!r}'.format(name, self.name))
+        self.drive(name, color, intensity, register=False)
+        light = factory(color=self._color_at(name, 0.0), **placement)
+        self.lights[name] = light
+        return light
+
+    def drive(self, name, color=None, intensity=None, register=True):
+        # color: vector or t -> vector; intensity: t -> scale factor
+        if register and name not in self.lights:
+            raise KeyError(name)
+        if callable(color):
+            self._color_fns[name] = color
+        elif color is not None:
+            self._base[name] = color
+            self._color_fns.pop(name, None)
+        if intensity is not None:
+            self._intensity_fns[name] = intensity
+
+    def __getitem__(self, name):
+        return self.lights[name]
+
+    def _color_at(self, name, t):
+        fn = self._color_fns.get(name)
+        c = fn(t) if fn is not None else self._base[name]
+        scale = self._intensity_fns.get(name)
+        return c * scale(t) if scale is not None else c
+
+    def update(self, t):
+        # only animated lights are touched; static ones cost nothing per frame
+        for name in self._color_fns.keys() | self._intensity_fns.keys():
+            self.lights[name].color = self._color_at(name, t)
+
+
+# === Named rig ===
+def key_fill_glow(scene, glow_color, glow_pos=vector(0, 0, 0),
+                  key_pos=vector(5, 3, 5), key_color=vector(1, 1, 0.8) * 0.6,
+                  fill_pos=vector(-5, -3, -5), fill_color=vector(0.3, 0.6, 1) * 0.7,
+                  glow_intensity=None):
+    """Key + fill + pulsing glow, replacing whatever lights the scene had."""
+    scene.lights = []
+    rig = LightRig('key/fill/glow')
+    rig.local('key', key_pos, key_color)
+    rig.local('fill', fill_pos, fill_color)
+    rig.local('glow', glow_pos, glow_color, intensity=glow_intensity)
+    return rig
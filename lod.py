@@ -0,0 +1,237 @@
+# lod.py
+# Camera-distance level of detail. Every LodSet holds n objects (centres and
+# bounding radii as arrays) and a list of representations, finest first:
+# e.g. full sphere -> low-poly stand-in -> single point -> hidden. Once per
+# frame LodManager.update() computes the projected size in pixels of every
+# object in one vectorized pass and switches only the objects whose level
+# changed. An object only leaves its level once its size is `hysteresis`
+# beyond the threshold, so one sitting on a boundary doesn't flicker.
+#
+#   lod = LodManager(scene)
+#   lod.add(LodSet(centers, radii, thresholds=(6, 2, 0.25),
+#                  levels=[ObjectLevel(spheres), LazyLevel(make_low, n), PointLevel(...), HIDDEN]))
+#   for frame in clock.frames(60):
+#       lod.update()
+#
+# Attribute writes meant for the objects (an animation channel's) go through
+# the set, lod_set.set(i, 'radius', r), or its handles(): they reach
+# whatever represents the object now, and the latest values are copied to a
+# representation when objects switch to it.
+import math
+
+import numpy as np
+
+from particles import push_points
+from scene_api import points
+
+
+def _xyz(v):
+    return np.array([v.x, v.y, v.z], dtype=float)
+
+
+def _parts(item):
+    return item if isinstance(item, (list, tuple)) else [item]
+
+
+# === Representations ===
+class ObjectLevel:
+    """Existing scene objects (one per LOD object, or a list of parts) shown when at this level."""
+
+    def __init__(self, objects):
+        self.objects = list(objects)
+
+    def show(self, indices):
+        for i in indices:
+            for o in _parts(self.objects[i]):
+                o.visible = True
+
+    def hide(self, indices):
+        for i in indices:
+            for o in _parts(self.objects[i]):
+                o.visible = False
+
+    def set(self, i, name, value):
+        if self.objects[i] is not None:
+            for o in _parts(self.objects[i]):
+                setattr(o, name, value)
+
+
+class LazyLevel(ObjectLevel):
+    """Stand-ins created with make(i) the first time an object needs them."""
+
+    def __init__(self, make, n):
+        super().__init__([None] * n)
+        self.make = make
+        self.created = 0
+
+    def show(self, indices):
+        for i in indices:
+            if self.objects[i] is None:
+                self.objects[i] = self.make(i)
+                self.created += 1
+        super().show(indices)
+
+    def hide(self, indices):
+        super().hide([i for i in indices if self.objects[i] is not None])
+
+
+class PointLevel:
+    """All objects at this level drawn as dots of one shared points object."""
+
+    def __init__(self, centers, colors, radius=1.5):
+        self.centers = np.asarray(centers, dtype=float)
+        self.colors = np.asarray(colors, dtype=float)
+        self.members = np.zeros(len(self.centers), dtype=bool)
+        self.visual = points(radius=radius)      # radius in pixels
+
+    def _push(self):
+        push_points(self.visual, self.centers[self.members], self.colors[self.members])
+
+    def show(self, indices):
+        self.members[indices] = True
+        self._push()
+
+    def hide(self, indices):
+        self.members[indices] = False
+        self._push()
+
+    def set(self, i, name, value):
+        pass                         # dots have a fixed pixel size and no per-object attributes
+
+
+class _Hidden:
+    def show(self, indices):
+        pass
+
+    def hide(self, indices):
+        pass
+
+    def set(self, i, name, value):
+        pass
+
+
+HIDDEN = _Hidden()
+
+
+class LodHandle:
+    """Object i of a LodSet, read and written by attribute like a scene object."""
+
+    def __init__(self, lod_set, i):
+        object.__setattr__(self, '_lod', lod_set)
+        object.__setattr__(self, '_i', i)
+
+    def __getattr__(self, name):
+        return self._lod.get(self._i, name)
+
+    def __setattr__(self, name, value):
+        self._lod.set(self._i, name, value)
+
+
+# === Level selection ===
+class LodSet:
+    """n objects with len(thresholds) + 1 levels; thresholds in pixels, descending."""
+
+    def __init__(self, centers, radii, thresholds, levels, hysteresis=0.15, shown=0, name=''):
+        # shown: the level the objects are displayed at now, or None when nothing
+        # has been created yet (every level lazy, the first update decides)
+        self.centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=float), len(self.centers))
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        if len(levels) != len(self.thresholds) + 1:
+            raise ValueError('{} levels need {} thresholds'.format(len(levels), len(levels) - 1))
+        if np.any(np.diff(self.thresholds) >= 0):
+            raise ValueError('LOD thresholds must be descending')
+        self.levels = levels
+        self.hysteresis = hysteresis
+        self.name = name
+        self.level = np.full(len(self.centers), -1 if shown is None else shown)
+        self.switches = 0
+        self.latest = {}             # attribute -> {index: last value written through set()}
+        # band of each level in pixels: [lower, upper); finest has no upper bound
+        self._lower = np.append(self.thresholds, 0.0)
+        self._upper = np.insert(self.thresholds, 0, np.inf)
+
+    def select(self, pixel_size):
+        """New level per object from projected sizes, with hysteresis."""
+        raw = np.searchsorted(-self.thresholds, -pixel_size, side='left')
+        c = np.maximum(self.level, 0)
+        h = self.hysteresis
+        leave = (pixel_size < self._lower[c] * (1 - h)) | (pixel_size > self._upper[c] * (1 + h))
+        return np.where(leave | (self.level < 0), raw, self.level)
+
+    def set(self, i, name, value):
+        """Write an attribute of object i to its current representation."""
+        self.latest.setdefault(name, {})[i] = value
+        if self.level[i] >= 0:
+            self.levels[self.level[i]].set(i, name, value)
+
+    def get(self, i, name):
+        """Last value written through set(), else the value of an object representing i."""
+        if i in self.latest.get(name, ()):
+            return self.latest[name][i]
+        for rep in self.levels:
+            objects = getattr(rep, 'objects', None)
+            if objects is not None and objects[i] is not None:
+                return getattr(_parts(objects[i])[0], name)
+        raise AttributeError(name)
+
+    def handles(self):
+        return [LodHandle(self, i) for i in range(len(self.centers))]
+
+    def apply(self, new):
+        changed = np.flatnonzero(new != self.level)
+        if not len(changed):
+            return 0
+        old = self.level[changed]
+        for k, rep in enumerate(self.levels):
+            leaving = changed[(old == k)]
+            if len(leaving):
+                rep.hide(leaving)
+        for k, rep in enumerate(self.levels):
+            entering = changed[new[changed] == k]
+            if len(entering):
+                rep.show(entering)
+                for name, values in self.latest.items():
+                    for i in entering.tolist():
+                        if i in values:
+                            rep.set(i, name, values[i])
+        self.level = new
+        self.switches += len(changed)
+        return len(changed)
+
+    def counts(self):
+        return np.bincount(self.level[self.level >= 0], minlength=len(self.levels))
+
+
+class LodManager:
+    """Updates every LodSet of a canvas once per frame from its camera."""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.sets = []
+        self._view = None
+
+    def add(self, lod_set):
+        self.sets.append(lod_set)
+        self._view = None
+        return lod_set
+
+    def pixels_per_unit(self):
+        # pixels covered by one world unit at distance 1 (vertical field of view)
+        fov = getattr(self.scene, 'fov', math.pi / 3)
+        return (self.scene.height / 2) / math.tan(fov / 2)
+
+    def update(self, force=False):
+        # force: re-select although the camera hasn't moved (the objects have)
+        cam = self.scene.camera.pos
+        view = (cam.x, cam.y, cam.z, self.scene.height, getattr(self.scene, 'fov', None))
+        if view == self._view and not force:
+            return 0                 # camera hasn't moved: nothing can change
+        self._view = view
+        eye = _xyz(cam)
+        scale = self.pixels_per_unit()
+        switched = 0
+        for s in self.sets:
+            dist = np.maximum(np.linalg.norm(s.centers - eye, axis=1), 1e-9)
+            switched += s.apply(s.select(s.radii / dist * scale))
+        return switched
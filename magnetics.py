@@ -0,0 +1,258 @@
+# magnetics.py
+# Magnetostatics for the chamber's drive coils. Each coil turn (a ring's
+# pos / axis / radius) is discretized into straight segments and the field
+# on a regular 3D grid comes from the Biot-Savart sum over every segment,
+# evaluated as array operations in chunks of grid points:
+#
+#   B(p) = mu0 I / 4 pi  sum  dl x r / |r|^3,   r = p - segment midpoint
+#
+# Large grids are split across a process pool where that is safe: with the
+# fork start method, or when the caller passes `workers` (and so vouches
+# that its script has an `if __name__ == '__main__'` guard). Under spawn
+# (Windows, macOS) the scene scripts, which have no guard, would be re-run
+# by every worker, so their solves stay in-process. Solved grids are cached in
+# the geometry cache keyed by coil geometry, current, grid and segment
+# count, so a scene only pays for the solve once. FieldGrid.sample()
+# interpolates B trilinearly at any points (vectorized), which is what the
+# field-strength slices and field lines below are drawn from.
+#
+#   grid = solve_grid(loops_from_rings(coil_turns), lo, hi, shape=(48, 24, 24), current=1.0)
+#   b = grid.sample(points)                 # (n, 3) tesla
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+from scene_api import curve, vector
+from baking import CACHE_DIR
+from mesh import IndexedMesh
+
+MU0 = 4e-7 * np.pi
+FIELD_VERSION = 1
+POOL_THRESHOLD = 5e7          # point-segment pairs above which the solve uses a process pool
+CHUNK_PAIRS = 4e6             # point-segment pairs per vectorized chunk (bounds memory)
+
+
+# === Coil geometry ===
+class Loop:
+    """One circular current loop: centre, unit axis (right-hand rule for +current), radius."""
+
+    def __init__(self, center, axis, radius):
+        self.center = np.asarray(center, dtype=float)
+        axis = np.asarray(axis, dtype=float)
+        self.axis = axis / np.linalg.norm(axis)
+        self.radius = float(radius)
+
+    def key(self):
+        return [np.round(self.center, 6).tolist(), np.round(self.axis, 6).tolist(), round(self.radius, 6)]
+
+
+def loops_from_rings(rings):
+    """Loops with the geometry of ring objects (e.g. the chamber's coil turns)."""
+    return [Loop((r.pos.x, r.pos.y, r.pos.z), (r.axis.x, r.axis.y, r.axis.z), r.radius) for r in rings]
+
+
+def discretize(loops, segments=64):
+    """Segment midpoints (m, 3) and length vectors dl (m, 3) for all loops."""
+    phi = np.linspace(0, 2 * np.pi, segments + 1)
+    mids, dls = [], []
+    for loop in loops:
+        # orthonormal frame (u, v) spanning the loop plane, u x v = axis
+        helper = np.array([0.0, 1.0, 0.0]) if abs(loop.axis[1]) < 0.9 else np.array([1.0, 0.0, 0.0])
+        u = np.cross(helper, loop.axis)
+        u /= np.linalg.norm(u)
+        v = np.cross(loop.axis, u)
+        pts = loop.center + loop.radius * (np.cos(phi)[:, None] * u + np.sin(phi)[:, None] * v)
+        mids.append(0.5 * (pts[1:] + pts[:-1]))
+        dls.append(pts[1:] - pts[:-1])
+    return np.vstack(mids), np.vstack(dls)
+
+
+# === Biot-Savart ===
+def biot_savart(points, mids, dls, current=1.0, core=1e-3):
+    """B (n, 3) at points from straight segments; `core` softens the field at the wire."""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    out = np.empty_like(points)
+    step = max(1, int(CHUNK_PAIRS // max(len(mids), 1)))
+    for s in range(0, len(points), step):
+        r = points[s:s + step, None, :] - mids[None, :, :]                  # (k, m, 3)
+        inv = (np.einsum('kmi,kmi->km', r, r) + core * core) ** -1.5
+        out[s:s + step] = np.einsum('kmi,km->ki', np.cross(dls[None, :, :], r), inv)
+    return out * (MU0 * current / (4 * np.pi))
+
+
+def _solve_chunk(args):
+    points, mids, dls, current, core = args
+    return biot_savart(points, mids, dls, current, core)
+
+
+# === Fields ===
+class UniformField:
+    """The same B everywhere (same sample() interface as FieldGrid)."""
+
+    def __init__(self, b):
+        self.b = np.asarray(b, dtype=float)
+
+    def sample(self, points):
+        return np.broadcast_to(self.b, (len(points), 3))
+
+
+class FieldGrid:
+    """B sampled on a regular grid from lo to hi (inclusive), shape (nx, ny, nz)."""
+
+    def __init__(self, lo, hi, b):
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = np.asarray(hi, dtype=float)
+        self.b = np.asarray(b, dtype=float)                  # (nx, ny, nz, 3)
+        self.shape = np.array(self.b.shape[:3])
+        self.step = (self.hi - self.lo) / np.maximum(self.shape - 1, 1)
+        # flat (N, 3) view and strides, so sampling gathers rows with take()
+        self._flat = self.b.reshape(-1, 3)
+        self._strides = (self.shape[1] * self.shape[2], self.shape[2], 1)
+
+    @staticmethod
+    def points(lo, hi, shape):
+        axes = [np.linspace(lo[k], hi[k], shape[k]) for k in range(3)]
+        return np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1)
+
+    def inside(self, points):
+        p = np.asarray(points, dtype=float).reshape(-1, 3)
+        return np.all((p >= self.lo) & (p <= self.hi), axis=1)
+
+    def sample(self, points):
+        """Trilinear B at points (n, 3); points outside take the nearest boundary value."""
+        p = np.asarray(points, dtype=float).reshape(-1, 3)
+        f = (p - self.lo) / self.step
+        np.clip(f, 0, self.shape - 1, out=f)
+        i = f.astype(np.int64)
+        np.minimum(i, self.shape - 2, out=i)
+        t = f - i
+        sx, sy, sz = self._strides
+        base = i @ np.array(self._strides)
+        tx, ty, tz = t[:, 0:1], t[:, 1:2], t[:, 2:3]
+        b = self._flat
+
+        def lerp_x(k):
+            lo = b.take(k, axis=0)
+            return lo + (b.take(k + sx, axis=0) - lo) * tx
+
+        c00, c10 = lerp_x(base), lerp_x(base + sy)
+        c01, c11 = lerp_x(base + sz), lerp_x(base + sy + sz)
+        c0 = c00 + (c10 - c00) * ty
+        c1 = c01 + (c11 - c01) * ty
+        return c0 + (c1 - c0) * tz
+
+    def magnitude(self, points):
+        return np.linalg.norm(self.sample(points), axis=1)
+
+
+def _cache_path(loops, lo, hi, shape, current, segments, core, cache_dir):
+    key = json.dumps({'loops': [loop.key() for loop in loops], 'lo': list(map(float, lo)),
+                      'hi': list(map(float, hi)), 'shape': list(map(int, shape)),
+                      'current': float(current), 'segments': segments, 'core': core,
+                      'version': FIELD_VERSION}, sort_keys=True)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, 'field-{}.npz'.format(digest))
+
+
+def solve_grid(loops, lo, hi, shape, current=1.0, segments=64, core=1e-3,
+               workers=None, cache_dir=CACHE_DIR):
+    """B on a grid from the loops, loaded from the cache when solved before.
+
+    `workers` > 1 allows a process pool for heavy grids even under spawn; only
+    pass it from a script guarded by `if __name__ == '__main__'`.
+    """
+    path = _cache_path(loops, lo, hi, shape, current, segments, core, cache_dir)
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return FieldGrid(lo, hi, data['b'])
+    mids, dls = discretize(loops, segments)
+    pts = FieldGrid.points(lo, hi, shape).reshape(-1, 3)
+    if workers is None:
+        # forked workers don't re-import the (unguarded) scene script; spawned ones do
+        workers = os.cpu_count() if multiprocessing.get_start_method() == 'fork' else 1
+    if len(pts) * len(mids) > POOL_THRESHOLD and workers > 1:
+        # heavy grid: one slab of points per task across a process pool
+        slabs = np.array_split(pts, 4 * workers)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_solve_chunk, [(s, mids, dls, current, core) for s in slabs])
+            b = np.vstack(list(parts))
+    else:
+        b = biot_savart(pts, mids, dls, current, core)
+    b = b.reshape(tuple(shape) + (3,))
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = path + '.tmp.npz'
+    np.savez_compressed(tmp, b=b)
+    os.replace(tmp, path)
+    return FieldGrid(lo, hi, b)
+
+
+# === Drawing ===
+def heat(values, vmax=None):
+    """Blue -> cyan -> yellow -> red colors (n, 3) for values scaled to [0, vmax]."""
+    v = np.clip(values / (vmax or values.max() or 1.0), 0, 1)
+    stops = np.array([[0.05, 0.1, 0.6], [0.1, 0.8, 1.0], [1.0, 0.9, 0.2], [1.0, 0.15, 0.1]])
+    pos = v * (len(stops) - 1)
+    k = np.minimum(pos.astype(int), len(stops) - 2)
+    w = (pos - k)[:, None]
+    return stops[k] * (1 - w) + stops[k + 1] * w
+
+
+def field_slice(grid, normal_axis=2, at=0.0, resolution=(48, 20), clip_radius=None,
+                clip_center=(0.0, 0.0), opacity=0.35, vmax=None):
+    """|B| on a plane through the grid as one vertex-colored mesh (normal along x, y or z).
+
+    With clip_radius, only the part within that distance of the chamber axis
+    (along x, through clip_center = (y, z)) is kept.
+    """
+    a, b = [k for k in range(3) if k != normal_axis]
+    u = np.linspace(grid.lo[a], grid.hi[a], resolution[0])
+    v = np.linspace(grid.lo[b], grid.hi[b], resolution[1])
+    uu, vv = np.meshgrid(u, v, indexing='ij')
+    verts = np.zeros(uu.shape + (3,))
+    verts[..., a], verts[..., b], verts[..., normal_axis] = uu, vv, at
+    verts = verts.reshape(-1, 3)
+    idx = np.arange(len(verts)).reshape(uu.shape)
+    quads = np.stack([idx[:-1, :-1], idx[1:, :-1], idx[1:, 1:], idx[:-1, 1:]], axis=-1).reshape(-1, 4)
+    if clip_radius is not None:
+        # keep quads whose corners are all inside the chamber cross-section
+        rho = np.hypot(verts[:, 1] - clip_center[0], verts[:, 2] - clip_center[1])
+        quads = quads[np.all(rho[quads] <= clip_radius, axis=1)]
+    faces = np.vstack([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]])
+    return IndexedMesh(verts, faces, vertex_colors=heat(grid.magnitude(verts), vmax),
+                       opacity=opacity, emissive=True)
+
+
+def trace_lines(grid, seeds, step=0.05, max_steps=400):
+    """Field lines from seed points (RK4 along B / |B|, all seeds at once) until they leave the grid."""
+    p = np.asarray(seeds, dtype=float).reshape(-1, 3).copy()
+    alive = grid.inside(p)
+    paths = [p.copy()]
+    live = [alive.copy()]
+
+    def direction(q):
+        b = grid.sample(q)
+        return b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-30)
+
+    for _ in range(max_steps):
+        if not alive.any():
+            break
+        k1 = direction(p)
+        k2 = direction(p + 0.5 * step * k1)
+        k3 = direction(p + 0.5 * step * k2)
+        k4 = direction(p + step * k3)
+        p = np.where(alive[:, None], p + step / 6 * (k1 + 2 * k2 + 2 * k3 + k4), p)
+        alive &= grid.inside(p)
+        paths.append(p.copy())
+        live.append(alive.copy())
+    paths, live = np.stack(paths, axis=1), np.stack(live, axis=1)     # (n, steps, 3)
+    return [path[mask] for path, mask in zip(paths, live)]
+
+
+def field_lines(grid, seeds, color=vector(1, 0.85, 0.3), radius=0.012, **trace):
+    """One curve per traced field line."""
+    return [curve(pos=[vector(*q) for q in line.tolist()], color=color, radius=radius)
+            for line in trace_lines(grid, seeds, **trace) if len(line) > 1]
@@ -0,0 +1,107 @@
+# mesh.py
+# Indexed meshes: unique vertices stored once plus an (m, 3) face index array.
+# Triangles share their vertex objects and are compounded into one scene
+# object, so the whole mesh has a single model transform (pos/axis/up) and a
+# single material color: rotating or recoloring it is one update.
+#
+# Building one is not cheap: every vertex is a vertex object and every face a
+# triangle object, all created before the compound. A mesh is only worth it
+# for small custom shapes (the xmas star, the field slice); many copies of a
+# primitive are cheaper as native objects or a points object, and meshes over
+# MAX_OBJECTS are rejected.
+from scene_api import vertex, triangle, compound, vector, color
+import numpy as np
+
+MAX_OBJECTS = 10000          # vertex + triangle objects one mesh may create
+
+
+def vertex_normals(vertices, faces):
+    """Area-weighted per-vertex normals."""
+    v = np.asarray(vertices, dtype=float)
+    f = np.asarray(faces, dtype=int)
+    face_n = np.cross(v[f[:, 1]] - v[f[:, 0]], v[f[:, 2]] - v[f[:, 0]])
+    normals = np.zeros_like(v)
+    for k in range(3):
+        np.add.at(normals, f[:, k], face_n)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(length > 0, length, 1.0)
+
+
+class IndexedMesh:
+    """Shared-vertex triangle mesh drawn as one compound object.
+
+    Creates len(vertices) vertex objects and len(faces) triangle objects at
+    build time; raises ValueError if that is over MAX_OBJECTS.
+    """
+
+    def __init__(self, vertices, faces, pos=vector(0, 0, 0), color=color.white, opacity=1.0,
+                 vertex_colors=None, emissive=False):
+        self.vertices = np.asarray(vertices, dtype=float)
+        self.faces = np.asarray(faces, dtype=int)
+        if len(self.vertices) + len(self.faces) > MAX_OBJECTS:
+            raise ValueError('mesh of {} vertices and {} faces is over MAX_OBJECTS ({}); draw it as '
+                             'native primitives or points, or split it'.format(
+                                 len(self.vertices), len(self.faces), MAX_OBJECTS))
+        normals = vertex_normals(self.vertices, self.faces)
+        if vertex_colors is None:
+            vertex_colors = np.ones_like(self.vertices)
+        self.vertex_colors = np.asarray(vertex_colors, dtype=float)
+
+        # one vertex object per unique vertex, referenced by index from every face
+        shared = [vertex(pos=vector(*p), normal=vector(*n), color=vector(*c), opacity=opacity)
+                  for p, n, c in zip(self.vertices.tolist(), normals.tolist(),
+                                     self.vertex_colors.tolist())]
+        tris = [triangle(v0=shared[a], v1=shared[b], v2=shared[c])
+                for a, b, c in self.faces.tolist()]
+        # the compound color multiplies the vertex colors and acts as the material color
+        self.obj = compound(tris, origin=vector(0, 0, 0))
+        self.obj.pos = pos
+        self.obj.color = color
+        if emissive:
+            self.obj.emissive = True
+        # a compound's axis length is its size along x; keep it when re-orienting
+        self._axis_length = self.obj.axis.mag
+
+    @property
+    def pos(self):
+        return self.obj.pos
+
+    @pos.setter
+    def pos(self, value):
+        self.obj.pos = value
+
+    @property
+    def color(self):
+        return self.obj.color
+
+    @color.setter
+    def color(self, value):
+        self.obj.color = value
+
+    def set_orientation(self, matrix):
+        # model transform from a 3x3 rotation: axis is the model x, up the model y
+        m = np.asarray(matrix, dtype=float)
+        self.obj.axis = vector(*m[:, 0].tolist()) * self._axis_length
+        self.obj.up = vector(*m[:, 1].tolist())
+
+
+# === Procedural builders (NumPy in, vertices + faces out) ===
+def star_outline(size=1.0, points=5, inner_ratio=0.4):
+    """Zig-zag outline of a flat star in the xy-plane, first tip pointing up."""
+    i = np.arange(2 * points)
+    angle = np.pi / 2 + i * np.pi / points
+    radius = np.where(i % 2 == 0, size, size * inner_ratio)
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle), np.zeros_like(angle)], axis=1)
+
+
+def bipyramid(outline, depth):
+    """Close a planar outline (n, 3) with a front and a back tip on the z-axis."""
+    outline = np.asarray(outline, dtype=float)
+    n = len(outline)
+    tips = np.array([[0.0, 0.0, depth / 2], [0.0, 0.0, -depth / 2]])
+    vertices = np.vstack([outline, tips])
+    i = np.arange(n)
+    j = (i + 1) % n
+    front = np.stack([i, j, np.full(n, n)], axis=1)
+    back = np.stack([j, i, np.full(n, n + 1)], axis=1)
+    return vertices, np.vstack([front, back])
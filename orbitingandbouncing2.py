@@ -1,5 +1,6 @@
-from vpython import *
-import math
+from scene_api import *
+from kinematics import Orbit, Bounce, Spin
+from clock import SimClock
 
 # Create the 3D scene
 scene = canvas(title='Cone inside Box (orbit + bounce)', width=800, height=600)
@@ -10,24 +11,20 @@ box(pos=vector(0,0,0), size=vector(4,4,4), color=color.cyan, opacity=0.3)
 # Red cone
 cone_obj = cone(pos=vector(1,0,0), axis=vector(0,1,0), radius=0.5, color=color.red)
 
-# Animation variables
-angle = 0
-t = 0
+# Motions as functions of absolute time (rates are per second at 60 Hz):
+# smaller orbit to stay within cube boundaries (max ~1.5 from center),
+# gentle bounce within top/bottom faces, spin around its own axis
+path = Orbit(radius=1.2, omega=1.8) + Bounce(amplitude=0.8, omega=3.0)
+spin = Spin(axis=(0, 1, 0), omega=3.0)
+cone_up = [[cone_obj.up.x, cone_obj.up.y, cone_obj.up.z]]
 
-while True:
-    rate(60)
-    angle += 0.03
-    t += 0.05
-
-    # Smaller orbit to stay within cube boundaries (max ~1.5 from center)
-    x = 1.2 * math.sin(angle)
-    z = 1.2 * math.cos(angle)
-
-    # Gentle bounce within top/bottom faces
-    y = 0.8 * math.sin(t)
+clock = SimClock(dt=1/60)
+for frame in clock.frames(60):
+    clock.catch_up()          # all motion is closed-form; nothing to integrate
+    t = clock.render_time
 
     # Update position
-    cone_obj.pos = vector(x, y, z)
+    cone_obj.pos = vector(*path.at(t).tolist())
 
     # Spin around its own axis
-    cone_obj.rotate(angle=0.05, axis=vector(0,1,0))
+    cone_obj.up = vector(*spin.apply(cone_up, t)[0].tolist())
@@ -0,0 +1,80 @@
+# particles.py
+# Struct-of-arrays particle engine for the vacuum chamber scenes.
+# Positions, velocities and colors live in NumPy arrays, the bounce and
+# shimmer updates run as whole-array operations, and the result is pushed
+# to the renderer through a single `points` object once per frame.
+from scene_api import points, vector, tracker
+from rng import stream_for
+import numpy as np
+
+
+def push_points(visual, pos, color=None):
+    """Replace the contents of a points object in one call."""
+    tracker.count_points(len(pos))
+    visual.clear()
+    if color is None:
+        visual.append([vector(*p) for p in pos.tolist()])
+    else:
+        visual.append([{'pos': vector(*p), 'color': vector(*c)}
+                       for p, c in zip(pos.tolist(), color.tolist())])
+
+
+class ParticleCloud:
+    """A cloud of particles stored as (n, 3) NumPy arrays.
+
+    Particles start inside the box given by half_extent. Without a collider
+    they bounce off that box; with one (see collisions.py) the collider
+    handles contacts and walls instead. Without a pusher they fly straight;
+    with one (see boris.py) they move as charges in its fields.
+    """
+
+    def __init__(self, n, half_extent, speed=0.02, radius=0.08, seed=None, collider=None, rng=None,
+                 pusher=None):
+        rng = rng if rng is not None else stream_for('particles', seed)
+        self.half_extent = np.asarray(half_extent, dtype=float)
+        self.collider = collider
+        self.pusher = pusher
+
+        # === State arrays (one row per particle) ===
+        self.pos = rng.uniform(-self.half_extent, self.half_extent, size=(n, 3))
+        self.prev = self.pos.copy()       # previous physics state, for interpolation
+        self.vel = rng.uniform(-speed, speed, size=(n, 3))
+        self.color = np.tile([0.5, 0.8, 1.0], (n, 1))
+        self.cull = None                  # optional visibility mask, see culling.py
+
+        # === Renderer: one primitive for the whole cloud (self-lit like the old
+        # spheres; points have no per-object opacity, so the spheres' 0.8 is gone) ===
+        self.visual = points(radius=radius, size_units='world', emissive=True)
+        self.push()
+
+    def __len__(self):
+        return len(self.pos)
+
+    def step(self, theta):
+        # move, then reflect every component that left the box
+        self.prev[:] = self.pos
+        if self.pusher is not None:
+            self.pusher.step(self.pos, self.vel)      # Lorentz force, then drift
+        else:
+            self.pos += self.vel
+        if self.collider is not None:
+            self.collider.resolve(self.pos, self.vel)
+        else:
+            outside = np.abs(self.pos) > self.half_extent
+            self.vel[outside] *= -1
+
+        # shimmer: same formula as the per-sphere loop, for all particles at once
+        self.color[:, 0] = 0.4 + 0.4 * np.sin(theta + self.pos[:, 0])
+        self.color[:, 1] = 0.7 + 0.3 * np.sin(theta * 1.5 + self.pos[:, 2])
+
+    def push(self, alpha=1.0):
+        # rebuild the point list in one call instead of one write per particle;
+        # alpha interpolates between the previous and the latest physics state
+        pos = self.pos if alpha >= 1.0 else self.prev + alpha * (self.pos - self.prev)
+        self.shown = pos
+        if self.cull is not None:
+            # particles out of view are left out; they return with their current state
+            keep = self.cull(pos)
+            push_points(self.visual, pos[keep], self.color[keep])
+        else:
+            push_points(self.visual, pos, self.color)
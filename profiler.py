@@ -0,0 +1,168 @@
+# profiler.py
+# Per-section frame profiler.
+#
+#   from profiler import profiler
+#   with profiler.section('particles'):
+#       ...
+#
+# Sections are named timing scopes around parts of a frame's update. The
+# frame loop (scene_api.frames) marks frame boundaries and times the tracker
+# flush, so scenes only wrap their own sections. Each section keeps rolling
+# stats over the last `window` frames; the whole session can be written as
+# a Chrome trace_event file (open it in chrome://tracing or Perfetto).
+#
+# Disabled by default: section() then returns one shared no-op context, so
+# instrumented code costs a method call per scope. Environment:
+#   VPY_PROFILE=1            collect stats, print a summary when the loop ends
+#   VPY_PROFILE_OVERLAY=1    also show ms per section in a label on the canvas
+#   VPY_TRACE=session.json   also write a Chrome trace when the loop ends
+import collections
+import contextlib
+import json
+import os
+import time
+
+_NULL = contextlib.nullcontext()
+
+
+class _Scope:
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append(time.perf_counter())
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler._record(self.name, self.profiler._stack.pop(), end)
+
+
+class Profiler:
+    """Named timing scopes with rolling per-section stats and trace export."""
+
+    def __init__(self, enabled=False, window=120, overlay=False, trace_path=None,
+                 overlay_every=15):
+        self.enabled = enabled or overlay or bool(trace_path)
+        self.window = window
+        self.overlay = overlay
+        self.overlay_every = overlay_every
+        self.trace_path = trace_path
+        self.t0 = time.perf_counter()
+        self.frames = 0
+        self.samples = {}                      # name -> deque of ms, last `window` frames
+        self.totals = collections.Counter()    # name -> ms over the session
+        self.events = []                       # (name, start s, duration s, depth) for the trace
+        self._frame_ms = collections.Counter()
+        self._scopes = {}
+        self._stack = []
+        self._frame_start = None
+        self._label = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.environ.get('VPY_PROFILE', '0') != '0',
+                   overlay=os.environ.get('VPY_PROFILE_OVERLAY', '0') != '0',
+                   trace_path=os.environ.get('VPY_TRACE') or None)
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self, name)
+        return scope
+
+    def _record(self, name, start, end):
+        self._frame_ms[name] += 1000 * (end - start)
+        if self.trace_path:
+            self.events.append((name, start, end - start, len(self._stack)))
+
+    # === Frame boundaries (called by scene_api.frames) ===
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        end = time.perf_counter()
+        self._record('frame', self._frame_start, end)
+        # a section that didn't run this frame counts as 0 ms
+        for name in set(self.samples) | set(self._frame_ms):
+            ms = self._frame_ms.get(name, 0.0)
+            if name not in self.samples:
+                self.samples[name] = collections.deque(maxlen=self.window)
+            self.samples[name].append(ms)
+            self.totals[name] += ms
+        self._frame_ms.clear()
+        self.frames += 1
+        self._frame_start = None
+        if self.overlay and self.frames % self.overlay_every == 0:
+            self._update_overlay()
+
+    # === Results ===
+    def stats(self):
+        """Rolling stats per section over the last `window` frames, in ms."""
+        out = {}
+        for name, values in self.samples.items():
+            ordered = sorted(values)
+            n = len(ordered)
+            out[name] = {'mean': sum(ordered) / n,
+                         'p50': ordered[n // 2],
+                         'max': ordered[-1],
+                         'last': values[-1],
+                         'total': self.totals[name]}
+        return out
+
+    def report(self):
+        stats = self.stats()
+        lines = ['{:<14} {:>8} {:>8} {:>8} {:>10}'.format('section', 'mean ms', 'p50 ms', 'max ms', 'total s')]
+        frame = stats.pop('frame', None)
+        for name, s in sorted(stats.items(), key=lambda kv: -kv[1]['mean']):
+            lines.append('{:<14} {:>8.3f} {:>8.3f} {:>8.3f} {:>10.3f}'.format(
+                name, s['mean'], s['p50'], s['max'], s['total'] / 1000))
+        if frame is not None:
+            lines.append('{:<14} {:>8.3f} {:>8.3f} {:>8.3f} {:>10.3f}'.format(
+                'frame', frame['mean'], frame['p50'], frame['max'], frame['total'] / 1000))
+        return '\n'.join(lines)
+
+    def _update_overlay(self):
+        stats = self.stats()
+        frame = stats.pop('frame', {'mean': 0.0})
+        text = 'frame {:.2f} ms\n'.format(frame['mean']) + '\n'.join(
+            '{} {:.2f}'.format(name, s['mean'])
+            for name, s in sorted(stats.items(), key=lambda kv: -kv[1]['mean']))
+        if self._label is None:
+            from scene_api import label, vector
+            self._label = label(pos=vector(10, 10, 0), pixel_pos=True, align='left', box=False,
+                                height=11, text=text)
+        else:
+            self._label.text = text
+
+    def write_trace(self, path=None):
+        """Write the session as Chrome trace_event JSON (complete 'X' events, us)."""
+        path = path or self.trace_path
+        events = [{'name': name, 'cat': 'frame' if name == 'frame' else 'section', 'ph': 'X',
+                   'ts': round(1e6 * (start - self.t0), 3), 'dur': round(1e6 * dur, 3),
+                   'pid': 1, 'tid': 1, 'args': {'depth': depth}}
+                  for name, start, dur, depth in self.events]
+        events.insert(0, {'name': 'process_name', 'ph': 'M', 'pid': 1, 'tid': 1,
+                          'args': {'name': 'vpython scene'}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+    def close(self):
+        if not self.enabled:
+            return
+        if self.frames:
+            print(self.report())
+        if self.trace_path:
+            self.write_trace()
+
+
+# the process-wide profiler used by scene_api.frames and the scenes
+profiler = Profiler.from_env()
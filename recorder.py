@@ -0,0 +1,245 @@
+# recorder.py
+# Binary trajectory recording and replay.
+#
+# A recording is one file: a small fixed-size JSON header followed by chunks
+# of `chunk_frames` frames. Inside a chunk the data is columnar (all frames of
+# column 0, then all frames of column 1, ...), so every column of the whole
+# file is a strided view into one memory map. The writer only ever holds one
+# chunk in memory and appends it when full, so long runs stay flat in memory;
+# the header's frame count is rewritten after every chunk, so a killed run
+# still leaves a readable file.
+#
+# SceneRecording wires this into a scene: set VPY_RECORD=path to capture a
+# run, VPY_REPLAY=path to push recorded frames straight to the scene instead
+# of running the update loop (VPY_REPLAY_SPEED scales playback).
+import json
+import os
+
+import numpy as np
+
+from scene_api import vector
+from particles import push_points
+from rng import streams
+
+MAGIC = b'VREC0001'
+HEADER_SIZE = 4096
+
+
+# === File format ===
+class TrajectoryWriter:
+    """Appends frames of fixed-shape columns to a chunked columnar file."""
+
+    def __init__(self, path, columns, fps=60, chunk_frames=256, meta=None):
+        # columns: list of (name, dtype, shape)
+        self.path = path
+        self.columns = [(name, np.dtype(dtype), tuple(shape)) for name, dtype, shape in columns]
+        self.fps = fps
+        self.chunk_frames = chunk_frames
+        self.meta = meta or {}
+        self.frames = 0
+        self._buffers = {name: np.zeros((chunk_frames,) + shape, dtype)
+                         for name, dtype, shape in self.columns}
+        self._row = 0
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        header = {'columns': [[name, dtype.str, list(shape)] for name, dtype, shape in self.columns],
+                  'fps': self.fps,
+                  'chunk_frames': self.chunk_frames,
+                  'frames': self.frames,
+                  'meta': self.meta}
+        raw = json.dumps(header).encode()
+        if len(raw) + len(MAGIC) + 4 > HEADER_SIZE:
+            raise ValueError('recording header too large ({} columns)'.format(len(self.columns)))
+        self._file.seek(0)
+        self._file.write(MAGIC + len(raw).to_bytes(4, 'little') + raw)
+        self._file.write(b'\0' * (HEADER_SIZE - len(MAGIC) - 4 - len(raw)))
+
+    def append(self, frame):
+        for name, _, _ in self.columns:
+            self._buffers[name][self._row] = frame[name]
+        self._row += 1
+        self.frames += 1
+        if self._row == self.chunk_frames:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        self._file.seek(0, os.SEEK_END)
+        for name, _, _ in self.columns:
+            self._file.write(self._buffers[name].tobytes())
+        self._row = 0
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._row:
+            # pad the last chunk; the header's frame count marks where data ends
+            for buf in self._buffers.values():
+                buf[self._row:] = 0
+            self._flush_chunk()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Trajectory:
+    """Memory-mapped reader: random access to any frame of any column."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_SIZE)
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a trajectory recording'.format(path))
+        n = int.from_bytes(head[len(MAGIC):len(MAGIC) + 4], 'little')
+        header = json.loads(head[len(MAGIC) + 4:len(MAGIC) + 4 + n])
+        self.fps = header['fps']
+        self.chunk_frames = k = header['chunk_frames']
+        self.meta = header['meta']
+        self.frames = header['frames']
+
+        columns = [(name, np.dtype(dtype), tuple(shape)) for name, dtype, shape in header['columns']]
+        frame_bytes = [dtype.itemsize * int(np.prod(shape)) for _, dtype, shape in columns]
+        chunk_bytes = k * sum(frame_bytes)
+        n_chunks = -(-self.frames // k)
+        if n_chunks == 0:
+            # closed before the first frame: nothing to map, every column empty
+            self._mm = None
+            self.columns = {name: np.zeros((0, k) + shape, dtype) for name, dtype, shape in columns}
+            return
+        self._mm = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER_SIZE,
+                             shape=(n_chunks, chunk_bytes))
+
+        # per column: (n_chunks, k, *shape) strided view, no copy
+        self.columns = {}
+        offset = 0
+        for (name, dtype, shape), fb in zip(columns, frame_bytes):
+            block = self._mm[:, offset:offset + k * fb]
+            self.columns[name] = block.view(dtype).reshape((n_chunks, k) + shape)
+            offset += k * fb
+
+    def __len__(self):
+        return self.frames
+
+    def frame(self, i):
+        if not 0 <= i < self.frames:
+            raise IndexError(i)
+        chunk, row = divmod(i, self.chunk_frames)
+        return {name: col[chunk, row] for name, col in self.columns.items()}
+
+
+# === Scene wiring ===
+VECTOR_ATTRS = ('pos', 'axis', 'up', 'color')
+BOOL_ATTRS = ('visible', 'emissive')
+
+
+class SceneRecording:
+    """Captures named object groups and point sources each frame, or replays them."""
+
+    def __init__(self, name, record_path=None, replay_path=None, speed=1.0, fps=60):
+        self.name = name
+        self.record_path = record_path
+        self.fps = fps
+        self.speed = speed
+        self.groups = []        # (name, objects, attrs)
+        self.sources = []       # (name, source)
+        self.writer = None
+        self.trajectory = Trajectory(replay_path) if replay_path else None
+        self.position = 0
+
+    @classmethod
+    def from_env(cls, name):
+        return cls(name,
+                   record_path=os.environ.get('VPY_RECORD') or None,
+                   replay_path=os.environ.get('VPY_REPLAY') or None,
+                   speed=float(os.environ.get('VPY_REPLAY_SPEED', '1')))
+
+    @property
+    def replaying(self):
+        return self.trajectory is not None
+
+    def track(self, name, objects, attrs):
+        self.groups.append((name, list(objects), tuple(attrs)))
+
+    def track_points(self, name, source):
+        # source: ParticleCloud / ParticleEmitter (pos, optional color / alive, visual)
+        self.sources.append((name, source))
+
+    def _columns(self):
+        cols = []
+        for name, objects, attrs in self.groups:
+            for attr in attrs:
+                shape = (len(objects), 3) if attr in VECTOR_ATTRS else (len(objects),)
+                dtype = 'u1' if attr in BOOL_ATTRS else 'f4'
+                cols.append(('{}.{}'.format(name, attr), dtype, shape))
+        for name, src in self.sources:
+            cols.append((name + '.pos', 'f4', src.pos.shape))
+            if getattr(src, 'color', None) is not None and hasattr(src.color, 'shape'):
+                cols.append((name + '.color', 'f4', src.color.shape))
+            if hasattr(src, 'alive'):
+                cols.append((name + '.alive', 'u1', src.alive.shape))
+        return cols
+
+    def capture(self):
+        if self.record_path is None:
+            return
+        if self.writer is None:
+            self.writer = TrajectoryWriter(self.record_path, self._columns(), fps=self.fps,
+                                           meta={'scene': self.name, 'seed': streams.seed})
+        frame = {}
+        for name, objects, attrs in self.groups:
+            for attr in attrs:
+                values = [getattr(o, attr) for o in objects]
+                if attr in VECTOR_ATTRS:
+                    values = [(v.x, v.y, v.z) for v in values]
+                frame['{}.{}'.format(name, attr)] = values
+        for name, src in self.sources:
+            # what was last pushed (interpolated), not the raw physics state
+            frame[name + '.pos'] = getattr(src, 'shown', src.pos)
+            if name + '.color' in self.writer._buffers:
+                frame[name + '.color'] = src.color
+            if hasattr(src, 'alive'):
+                frame[name + '.alive'] = src.alive
+        self.writer.append(frame)
+
+    def seek(self, i):
+        if not len(self.trajectory):
+            return                   # empty recording: nothing to show
+        self.position = int(i) % len(self.trajectory)
+        self.apply(self.trajectory.frame(self.position))
+
+    def show(self, t):
+        """Replay: push the recorded frame for scene time t (scaled by speed)."""
+        self.seek(round(t * self.trajectory.fps * self.speed))
+
+    def apply(self, frame):
+        for name, objects, attrs in self.groups:
+            for attr in attrs:
+                values = frame['{}.{}'.format(name, attr)].tolist()
+                if attr in VECTOR_ATTRS:
+                    for o, v in zip(objects, values):
+                        setattr(o, attr, vector(*v))
+                elif attr in BOOL_ATTRS:
+                    for o, v in zip(objects, values):
+                        setattr(o, attr, bool(v))
+                else:
+                    for o, v in zip(objects, values):
+                        setattr(o, attr, v)
+        for name, src in self.sources:
+            pos = frame[name + '.pos']
+            col = frame.get(name + '.color')
+            if name + '.alive' in frame:
+                alive = frame[name + '.alive'].astype(bool)
+                pos = pos[alive]
+                col = col[alive] if col is not None else None
+            push_points(src.visual, pos, col)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
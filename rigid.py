@@ -0,0 +1,79 @@
+# rigid.py
+# Rigid-body groups: child objects keep fixed local offsets from a parent
+# frame, and one parent transform (position + quaternion) per frame places
+# all of them. Child world positions come from a single batched matrix
+# product instead of a hand-written rotation per part.
+from scene_api import vector
+import numpy as np
+
+
+# === Quaternions (w, x, y, z) ===
+def quat_from_axis_angle(axis, angle):
+    axis = np.asarray(axis, dtype=float)
+    axis = axis / np.linalg.norm(axis)
+    half = 0.5 * angle
+    return np.concatenate(([np.cos(half)], np.sin(half) * axis))
+
+
+def quat_to_matrix(q):
+    w, x, y, z = np.asarray(q, dtype=float) / np.linalg.norm(q)
+    return np.array([[1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+                     [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+                     [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)]])
+
+
+IDENTITY = np.array([1.0, 0.0, 0.0, 0.0])
+
+
+def as_array(v):
+    return np.array([v.x, v.y, v.z], dtype=float)
+
+
+class RigidGroup:
+    """Objects moved together by one parent transform per frame."""
+
+    def __init__(self, origin=vector(0, 0, 0)):
+        self.origin = as_array(origin)
+        self.children = []
+        self._offsets = []
+        self._axes = []          # local axis/up for children that re-orient
+        self._oriented = []      # indices of those children
+        self.pos = self.origin.copy()
+        self.quat = IDENTITY.copy()
+        self.world = np.empty((0, 3))
+        self._offset_array = np.empty((0, 3))
+        self._rot = np.eye(3)
+
+    def add(self, obj, offset=None, orient=False):
+        # offset defaults to where the object sits relative to the group origin
+        offset = as_array(obj.pos) - self.origin if offset is None else as_array(offset)
+        if orient:
+            self._oriented.append(len(self.children))
+            self._axes.append((as_array(obj.axis), as_array(obj.up)))
+        self.children.append(obj)
+        self._offsets.append(offset)
+        self._offset_array = None
+        return obj
+
+    def __len__(self):
+        return len(self.children)
+
+    def set_transform(self, pos=None, quat=None):
+        if pos is not None:
+            self.pos = as_array(pos) if hasattr(pos, 'x') else np.asarray(pos, dtype=float)
+        if quat is not None:
+            self.quat = np.asarray(quat, dtype=float)
+        if self._offset_array is None:
+            self._offset_array = np.array(self._offsets).reshape(-1, 3)
+        rot = quat_to_matrix(self.quat)
+        # all child positions in one product: (n, 3) @ (3, 3)
+        self.world = self.pos + self._offset_array @ rot.T
+        self._rot = rot
+
+    def push(self):
+        for obj, p in zip(self.children, self.world.tolist()):
+            obj.pos = vector(*p)
+        for i, (axis, up) in zip(self._oriented, self._axes):
+            obj = self.children[i]
+            obj.axis = vector(*(self._rot @ axis).tolist())
+            obj.up = vector(*(self._rot @ up).tolist())
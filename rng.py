@@ -0,0 +1,106 @@
+# rng.py
+# Seeded random streams. Every subsystem (snowfall, twinkle, particles, ...)
+# draws from its own NumPy Generator, spawned from one root seed by name, so
+# a subsystem's numbers don't depend on which others exist or in what order
+# they were created, on which process runs it or on the backend.
+#
+#   from rng import streams
+#   twinkle = streams.stream('xmas_tree3.twinkle')
+#   twinkle.sample(200, 8)             # 8 distinct indices
+#   twinkle.uniform(3, 6, size=8)      # array slice of a pre-drawn block
+#
+# A stream hands out values from a block of uniforms drawn in bulk and only
+# goes back to the Generator when the block runs out. Values come off the
+# Generator in the same order whatever the block size, so the same seed
+# reproduces a run exactly.
+#
+# The root seed comes from VPY_SEED; without it a fresh one is drawn and kept
+# in streams.seed (recordings store it, see recorder.py).
+import os
+import zlib
+
+import numpy as np
+
+BLOCK = 4096
+
+
+class BlockStream:
+    """Generator-like draws served from pre-drawn blocks of uniforms in [0, 1)."""
+
+    def __init__(self, generator, block=BLOCK):
+        self.generator = generator
+        self.block = block
+        self._buf = np.empty(0)
+        self._next = 0
+        self.refills = 0
+
+    def random(self, size=None):
+        n = 1 if size is None else int(np.prod(size))
+        if self._next + n > len(self._buf):
+            # keep the unused tail, then one bulk draw covers this request and the next ones
+            tail = self._buf[self._next:]
+            self._buf = np.concatenate([tail, self.generator.random(max(self.block, n - len(tail)))])
+            self._next = 0
+            self.refills += 1
+        out = self._buf[self._next:self._next + n]
+        self._next += n
+        return float(out[0]) if size is None else out.reshape(size)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        if size is None:
+            size = np.broadcast(np.asarray(low), np.asarray(high)).shape or None
+        u = self.random(size)
+        return low + np.subtract(high, low) * u
+
+    def integers(self, low, high=None, size=None):
+        if high is None:
+            low, high = 0, low
+        u = self.random(size)
+        if size is None:
+            return low + int(u * (high - low))
+        return low + np.floor(u * (high - low)).astype(np.int64)
+
+    def choice(self, seq):
+        return seq[self.integers(len(seq))]
+
+    def sample(self, n, k):
+        """k distinct indices from range(n) (sparse Fisher-Yates on k draws)."""
+        picks = np.floor(self.random(k) * (n - np.arange(k))).astype(np.int64).tolist()
+        swapped, out = {}, []
+        for j, p in enumerate(picks):
+            last = n - 1 - j
+            out.append(swapped.get(p, p))
+            swapped[p] = swapped.get(last, last)
+        return out
+
+
+class RandomStreams:
+    """Named, independent streams spawned from one root seed."""
+
+    def __init__(self, seed=None):
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**63)
+        self._streams = {}
+
+    @classmethod
+    def from_env(cls):
+        seed = os.environ.get('VPY_SEED')
+        return cls(int(seed) if seed else None)
+
+    def generator(self, name):
+        # keyed by name, so a stream is the same whatever else was created before it
+        key = zlib.crc32(name.encode())
+        return np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=(key,))))
+
+    def stream(self, name, block=BLOCK):
+        if name not in self._streams:
+            self._streams[name] = BlockStream(self.generator(name), block)
+        return self._streams[name]
+
+
+def stream_for(name, seed=None):
+    """A subsystem's stream: its own root when given a seed, else the process-wide one."""
+    return RandomStreams(seed).stream(name) if seed is not None else streams.stream(name)
+
+
+# the process-wide streams, seeded from VPY_SEED
+streams = RandomStreams.from_env()
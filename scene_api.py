@@ -0,0 +1,96 @@
+# scene_api.py
+# Backend-neutral scene API. Scripts import from here instead of `vpython`;
+# the backend is picked with the VPY_BACKEND environment variable:
+#   VPY_BACKEND=vpython   (default) real VPython canvas in the browser
+#   VPY_BACKEND=headless  in-memory scene, no server, ignores rate()
+# VPython is only imported when the visual backend is chosen.
+#
+# Scene objects are wrapped in change-tracking proxies (see tracking.py) so
+# no-op writes are dropped and each frame's changes go out in one flush.
+# VPY_TRACK=0 disables this; VPY_EPSILON sets the float tolerance.
+import math
+import os
+
+from tracking import ChangeTracker, unwrap
+from profiler import profiler
+
+BACKEND = os.environ.get('VPY_BACKEND', 'vpython').lower()
+
+if BACKEND == 'headless':
+    import headless as _backend
+elif BACKEND == 'vpython':
+    import vpython as _backend
+else:
+    raise ValueError("unknown VPY_BACKEND {!r} (expected 'vpython' or 'headless')".format(BACKEND))
+
+# === Scene API surface ===
+API = ['canvas', 'vector', 'vec', 'color', 'rate',
+       'box', 'sphere', 'simple_sphere', 'cylinder', 'cone', 'pyramid', 'ellipsoid', 'ring',
+       'label', 'curve', 'points', 'triangle', 'vertex', 'compound',
+       'local_light', 'distant_light']
+
+# everything except these is a scene object and comes back as a tracked proxy
+UNTRACKED = ['canvas', 'vector', 'vec', 'color', 'rate']
+
+TRACKING = os.environ.get('VPY_TRACK', '1') != '0'
+tracker = ChangeTracker(epsilon=float(os.environ.get('VPY_EPSILON', '1e-6')))
+
+
+def _tracked(factory):
+    def make(*args, **kw):
+        return tracker.track(factory(*unwrap(args), **{k: unwrap(v) for k, v in kw.items()}))
+    make.__name__ = factory.__name__
+    return make
+
+
+for _name in API:
+    _factory = getattr(_backend, _name)
+    globals()[_name] = _tracked(_factory) if TRACKING and _name not in UNTRACKED else _factory
+
+sin, cos, tan, sqrt, pi = math.sin, math.cos, math.tan, math.sqrt, math.pi
+
+# Headless runs stop after VPY_FRAMES frames (default 600); the visual
+# backend runs until the window is closed unless VPY_FRAMES is set.
+_frames_env = os.environ.get('VPY_FRAMES')
+max_frames = int(_frames_env) if _frames_env else (600 if BACKEND == 'headless' else None)
+gltf_path = os.environ.get('VPY_GLTF') or None
+
+
+def is_headless():
+    return BACKEND == 'headless'
+
+
+def _selected_canvas():
+    return canvas.selected if is_headless() else canvas.get_selected()
+
+
+def frames(fps=60):
+    """Animation loop: paces with rate(fps) and yields the frame number.
+
+    With VPY_GLTF=file.glb every frame is sampled and the run is exported to
+    glTF when the loop ends (see gltf_export.py). Frame boundaries and the
+    flush are timed by the profiler (see profiler.py).
+    """
+    exporter = None
+    if gltf_path:
+        from gltf_export import SceneExporter
+        exporter = SceneExporter(gltf_path, _selected_canvas())
+    n = 0
+    try:
+        while max_frames is None or n < max_frames:
+            with profiler.section('flush'):
+                tracker.flush()
+            profiler.end_frame()
+            if exporter is not None:
+                exporter.sample(n / fps)
+            rate(fps)
+            profiler.begin_frame()
+            yield n
+            n += 1
+    finally:
+        profiler.close()
+        if exporter is not None:
+            exporter.save()
+
+
+__all__ = API + ['sin', 'cos', 'tan', 'sqrt', 'pi', 'frames', 'is_headless']
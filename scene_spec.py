@@ -0,0 +1,530 @@
+# scene_spec.py
+# Declarative scene descriptions. A scene is a tree of dataclasses (chamber,
+# ring array, coil stack, particle cloud, ...) that can be written in Python
+# or loaded from JSON / TOML, and SceneBuilder turns it into scene objects.
+#
+# Components are built on first access and disabled ones never are. The
+# scenes draw every component, so they call build() to create them all up
+# front; building on access is for callers that need part of a scene, e.g.
+# sweep.py asks for the particles alone and gets their physics without the
+# chamber, rings, fields or labels being drawn. Static parts go through
+# baking.StaticBatch, which draws each material group as one compound.
+#
+#   spec = scene_from_env(SceneSpec(name='demo', chamber=Chamber(), rings=RingArray()))
+#   built = SceneBuilder(spec)
+#   built.rings.objects        # builds the canvas and the rings, nothing else
+#
+# VPY_SCENE=variant.toml merges a file over a script's default spec, so a
+# variant only lists what it changes (see scenes/).
+import functools
+import json
+import os
+import typing
+from dataclasses import dataclass, field, fields, is_dataclass, replace
+
+import numpy as np
+
+from scene_api import canvas, vector, cylinder, ring, sphere, box, label
+from baking import StaticBatch
+from collisions import Collider, CylinderWall, RingSet
+from culling import Disc
+from particles import ParticleCloud
+from cavity import CavityArray
+from lod import LodManager
+from magnetics import solve_grid, loops_from_rings, field_slice, field_lines, UniformField
+from boris import BorisPusher
+
+Vec = typing.Tuple[float, float, float]
+
+
+def _v(t):
+    return vector(*t)
+
+
+# === Components ===
+@dataclass
+class Chamber:
+    """Cylindrical chamber along x: live glass body plus baked caps, window, base and plates."""
+    radius: float = 3.0
+    length: float = 8.0
+    center_y: float = 0.0
+    body_color: Vec = (0.2, 0.9, 1.0)
+    body_opacity: float = 0.25
+    cap_thickness: float = 0.2
+    cap_color: Vec = (0.6, 0.6, 0.6)
+    window_radius: float = 1.0
+    window_length: float = 0.3
+    window_color: Vec = (0.0, 1.0, 1.0)
+    window_opacity: float = 0.4
+    base: bool = True
+    base_color: Vec = (0.1, 0.7, 0.3)
+    plates: bool = True
+    plate_thickness: float = 0.1
+    plate_color: Vec = (0.8, 0.85, 0.9)
+    plate_opacity: float = 0.9
+    enabled: bool = True
+
+    def build(self, builder):
+        r, length, y = self.radius, self.length, self.center_y
+        body = cylinder(pos=vector(-length/2, y, 0), axis=vector(length, 0, 0), radius=r,
+                        color=_v(self.body_color), opacity=self.body_opacity)
+
+        # static parts are compounded, one render object per material
+        statics = StaticBatch('chamber')
+        ct = self.cap_thickness
+        for x in (-length/2 - ct/2, length/2 + ct/2):
+            statics.cylinder(pos=vector(x, y, 0), axis=vector(ct, 0, 0), radius=r,
+                             color=_v(self.cap_color))
+        statics.cylinder(pos=vector(length/2 + ct, y, 0), axis=vector(self.window_length, 0, 0),
+                         radius=self.window_radius, color=_v(self.window_color),
+                         opacity=self.window_opacity)
+        if self.base:
+            statics.box(pos=vector(0, -r - 0.7, 0), size=vector(length * 1.3, 0.5, r * 1.6),
+                        color=_v(self.base_color), shininess=0.8)
+        if self.plates:
+            for x in (-length/2 + 0.15, length/2 - 0.15):
+                statics.box(pos=vector(x, -r/2 - 0.7, 0),
+                            size=vector(self.plate_thickness, r * 0.9, r * 1.1),
+                            color=_v(self.plate_color), shininess=1.0, opacity=self.plate_opacity)
+        statics.build()
+        return Parts(body=body, statics=statics)
+
+    def wall(self):
+        return CylinderWall(self.radius, self.length)
+
+    def occluders(self):
+        """The opaque end caps as discs, for update culling."""
+        x = self.length / 2 + self.cap_thickness
+        return [Disc((sx * x, self.center_y, 0), (1, 0, 0), self.radius) for sx in (-1, 1)]
+
+
+@dataclass
+class Glow:
+    """Small emissive sphere at the centre of every ring."""
+    radius: float = 0.05
+    color: Vec = (0.0, 1.0, 1.0)
+    opacity: float = 0.5
+
+
+@functools.lru_cache(maxsize=None)
+def grid_centers(cols, rows, spacing, y=0.0):
+    """Ring centres of a cols (x) by rows (z) grid centred on the y axis."""
+    x = (np.arange(cols) - (cols - 1) / 2) * spacing
+    z = (np.arange(rows) - (rows - 1) / 2) * spacing
+    xx, zz = np.meshgrid(x, z, indexing='ij')
+    centers = np.stack([xx.ravel(), np.full(xx.size, float(y)), zz.ravel()], axis=1)
+    centers.flags.writeable = False
+    return centers
+
+
+@dataclass
+class RingArray:
+    """Grid of tori (the MEMS array); x runs over cols, z over rows."""
+    cols: int = 3
+    rows: int = 3
+    spacing: float = 1.2
+    radius: float = 0.4
+    thickness: float = 0.1
+    y: float = 0.0
+    axis: Vec = (1.0, 0.0, 0.0)
+    color: Vec = (1.0, 0.0, 0.0)
+    emissive: bool = False
+    glow: typing.Optional[Glow] = None
+    enabled: bool = True
+
+    def centers(self):
+        return grid_centers(self.cols, self.rows, self.spacing, self.y)
+
+    def build(self, builder):
+        axis = _v(self.axis)
+        rings = [ring(pos=vector(*p), axis=axis, radius=self.radius, thickness=self.thickness,
+                      color=_v(self.color), emissive=self.emissive)
+                 for p in self.centers().tolist()]
+        glows = []
+        if self.glow is not None:
+            g = self.glow
+            glows = [sphere(pos=r.pos, radius=g.radius, color=_v(g.color), emissive=True,
+                            opacity=g.opacity)
+                     for r in rings]
+        return Parts(objects=rings, glows=glows, centers=self.centers())
+
+    def obstacles(self):
+        return RingSet(self.centers(), axis=self.axis, radius=self.radius, thickness=self.thickness)
+
+
+@dataclass
+class FieldRing:
+    """A single glowing containment-field ring.
+
+    With `past_cap` set the ring sits that far beyond the chamber's +x end cap
+    on the axis instead of at `pos`, so it follows the chamber's length.
+    """
+    name: str = 'field'
+    pos: Vec = (0.0, 0.0, 0.0)
+    past_cap: typing.Optional[float] = None
+    radius: float = 2.8
+    thickness: float = 0.25
+    color: Vec = (0.3, 0.9, 1.0)
+    opacity: float = 0.25
+    axis: Vec = (1.0, 0.0, 0.0)
+    emissive: bool = True
+    enabled: bool = True
+
+    def build(self, builder):
+        pos = self.pos
+        if self.past_cap is not None:
+            pos = (builder.spec.chamber.length / 2 + self.past_cap, 0.0, 0.0)
+        return ring(pos=_v(pos), axis=_v(self.axis), radius=self.radius,
+                    thickness=self.thickness, color=_v(self.color), opacity=self.opacity,
+                    emissive=self.emissive)
+
+
+@dataclass
+class CoilStack:
+    """Evenly spaced coil turns (thin rings) along x from start_x to end_x."""
+    turns: int = 18
+    radius: float = 3.75
+    start_x: float = -3.7
+    end_x: float = 3.7
+    y: float = 0.0
+    thickness: float = 0.03
+    color: Vec = (0.6, 0.6, 0.65)
+    opacity: float = 0.9
+    enabled: bool = True
+
+    def positions(self):
+        return np.linspace(self.start_x, self.end_x, self.turns)
+
+    def build(self, builder):
+        return [ring(pos=vector(x, self.y, 0), axis=vector(1, 0, 0), radius=self.radius,
+                     thickness=self.thickness, color=_v(self.color), opacity=self.opacity)
+                for x in self.positions().tolist()]
+
+
+@dataclass
+class CoilField:
+    """B field of the coil turns (magnetics.py), solved inside the chamber; drawn as slices and lines."""
+    current: float = 1.0                          # A per turn
+    grid: typing.List[int] = field(default_factory=lambda: [48, 24, 24])
+    segments: int = 64                            # straight segments per turn
+    slices: typing.List[str] = field(default_factory=lambda: ['z'])   # plane normals: x, y or z
+    slice_opacity: float = 0.35
+    lines: int = 12                               # field lines, seeded on a circle at one end
+    line_color: Vec = (1.0, 0.85, 0.3)
+    enabled: bool = True
+
+    def build(self, builder):
+        coils = builder.coils
+        chamber = builder.spec.chamber
+        r, length, y = chamber.radius, chamber.length, chamber.center_y
+        lo, hi = (-length / 2, y - r, -r), (length / 2, y + r, r)
+        grid = solve_grid(loops_from_rings(coils), lo, hi, self.grid, self.current, self.segments)
+        slices = [field_slice(grid, 'xyz'.index(axis), at=y if axis == 'y' else 0.0,
+                              clip_radius=r, clip_center=(y, 0.0), opacity=self.slice_opacity)
+                  for axis in self.slices]
+        phi = np.linspace(0, 2 * np.pi, self.lines, endpoint=False)
+        seeds = np.stack([np.full_like(phi, lo[0]), y + 0.6 * r * np.cos(phi), 0.6 * r * np.sin(phi)], axis=1)
+        lines = field_lines(grid, seeds, color=_v(self.line_color)) if self.lines else []
+        return Parts(grid=grid, slices=slices, lines=lines)
+
+
+@dataclass
+class Cavities:
+    """Wafer-scale cavity array (see cavity.py): ring compounds with a dot LOD, pulsing glows."""
+    cols: int = 6
+    rows: int = 6
+    pitch: float = 0.8
+    pitch_z: typing.Optional[float] = None       # row pitch, if not square
+    radius: float = 0.3
+    thickness: float = 0.08
+    y: float = 0.0
+    wafer_radius: typing.Optional[float] = None  # dies beyond it are left out
+    missing: typing.List[typing.List[int]] = field(default_factory=list)   # [col, row] pairs
+    color: Vec = (0.2, 0.7, 1.0)
+    emissive: bool = True
+    draw: str = 'auto'                            # 'rings', 'points' or 'auto' (dots from afar)
+    glow_radius: float = 0.05
+    glow_color: Vec = (0.1, 0.8, 1.0)
+    glow_dim: Vec = (0.1, 0.0, 0.0)
+    glow_opacity: float = 0.5
+    enabled: bool = True
+
+    def build(self, builder):
+        return CavityArray(self.cols, self.rows, self.pitch, self.pitch_z, radius=self.radius,
+                           thickness=self.thickness, y=self.y, wafer_radius=self.wafer_radius,
+                           missing=self.missing, color=self.color, emissive=self.emissive,
+                           draw=self.draw, lod=builder.lod, glow_radius=self.glow_radius,
+                           glow_color=self.glow_color, glow_dim=self.glow_dim,
+                           glow_opacity=self.glow_opacity, background=builder.spec.background)
+
+
+@dataclass
+class Particles:
+    """Particle cloud inside the chamber, colliding with its wall and the ring array."""
+    count: int = 40
+    speed: float = 0.02
+    radius: float = 0.08
+    seed: typing.Optional[int] = None
+    contacts: bool = True
+    charge: typing.Optional[float] = None        # set to push them as charges (boris.py)
+    mass: float = 1.0
+    e_field: typing.Optional[Vec] = None         # uniform E, added to the coil field's B
+    enabled: bool = True
+
+    def build(self, builder):
+        spec = builder.spec
+        obstacles, ring_obstacles = [], None
+        if spec.chamber is not None and spec.chamber.enabled:
+            obstacles.append(spec.chamber.wall())
+            r, length = spec.chamber.radius, spec.chamber.length
+        else:
+            r, length = 3.0, 8.0
+        if spec.rings is not None and spec.rings.enabled:
+            # collisions only need the ring layout, not the ring objects
+            ring_obstacles = spec.rings.obstacles()
+            obstacles.append(ring_obstacles)
+        collider = Collider(radius=self.radius, obstacles=obstacles, particle_contacts=self.contacts)
+        pusher = None
+        if self.charge is not None:
+            # charges move in the coil field when the scene has one
+            has_field = spec.coil_field is not None and spec.coil_field.enabled
+            b_field = builder.coil_field.grid if has_field else UniformField((0, 0, 0))
+            pusher = BorisPusher(b_field, self.charge, self.mass, e_field=self.e_field)
+        cloud = ParticleCloud(self.count, half_extent=(length/2.5, r*0.7, r*0.7), speed=self.speed,
+                              radius=self.radius, seed=self.seed, collider=collider, pusher=pusher)
+        return Parts(cloud=cloud, collider=collider, ring_obstacles=ring_obstacles)
+
+
+@dataclass
+class Shape:
+    """Any other single primitive (wafer, dome, ...); baked=True compounds it with the other statics."""
+    kind: str = 'box'
+    pos: Vec = (0.0, 0.0, 0.0)
+    size: typing.Optional[Vec] = None
+    radius: typing.Optional[float] = None
+    axis: typing.Optional[Vec] = None
+    color: Vec = (1.0, 1.0, 1.0)
+    opacity: float = 1.0
+    emissive: bool = False
+    baked: bool = False
+    enabled: bool = True
+
+    def attrs(self):
+        attrs = {'pos': _v(self.pos), 'color': _v(self.color), 'opacity': self.opacity,
+                 'emissive': self.emissive}
+        for name in ('size', 'axis'):
+            if getattr(self, name) is not None:
+                attrs[name] = _v(getattr(self, name))
+        if self.radius is not None:
+            attrs['radius'] = self.radius
+        return attrs
+
+    def build(self, builder):
+        return {'box': box, 'sphere': sphere, 'cylinder': cylinder, 'ring': ring}[self.kind](**self.attrs())
+
+
+@dataclass
+class Label:
+    pos: Vec = (0.0, 0.0, 0.0)
+    text: str = ''
+    height: int = 12
+    color: Vec = (1.0, 1.0, 1.0)
+    enabled: bool = True
+
+    def build(self, builder):
+        return label(pos=_v(self.pos), text=self.text, height=self.height, color=_v(self.color),
+                     box=False)
+
+
+@dataclass
+class SceneSpec:
+    name: str = 'scene'
+    title: str = ''
+    width: int = 1000
+    height: int = 700
+    background: Vec = (0.0, 0.0, 0.0)
+    camera_pos: typing.Optional[Vec] = None
+    camera_axis: typing.Optional[Vec] = None
+    chamber: typing.Optional[Chamber] = None
+    rings: typing.Optional[RingArray] = None
+    cavities: typing.Optional[Cavities] = None
+    fields: typing.List[FieldRing] = field(default_factory=list)
+    coils: typing.Optional[CoilStack] = None
+    coil_field: typing.Optional[CoilField] = None
+    particles: typing.Optional[Particles] = None
+    shapes: typing.List[Shape] = field(default_factory=list)
+    labels: typing.List[Label] = field(default_factory=list)
+
+
+class Parts:
+    """What a component built: plain named attributes."""
+
+    def __init__(self, **parts):
+        self.__dict__.update(parts)
+
+
+# === Loading ===
+def _convert(tp, value):
+    origin = typing.get_origin(tp)
+    if origin is typing.Union:
+        inner = [a for a in typing.get_args(tp) if a is not type(None)][0]
+        return None if value is None else _convert(inner, value)
+    if origin is list:
+        return [_convert(typing.get_args(tp)[0], v) for v in value]
+    if origin is tuple:
+        return tuple(float(v) for v in value)
+    if is_dataclass(tp):
+        return value if is_dataclass(value) else from_dict(tp, value)
+    return value
+
+
+def from_dict(cls, data, base=None):
+    """Build dataclass cls from plain data; with base, only the given keys change."""
+    hints = typing.get_type_hints(cls)
+    names = {f.name for f in fields(cls)}
+    unknown = set(data) - names
+    if unknown:
+        raise ValueError('unknown {} field(s): {}'.format(cls.__name__, ', '.join(sorted(unknown))))
+    changes = {}
+    for name, value in data.items():
+        current = getattr(base, name, None) if base is not None else None
+        tp = hints[name]
+        inner = [a for a in typing.get_args(tp) if is_dataclass(a)]
+        if isinstance(value, dict) and current is not None and inner:
+            changes[name] = from_dict(inner[0], value, base=current)   # merge nested tables
+        else:
+            changes[name] = _convert(tp, value)
+    return replace(base, **changes) if base is not None else cls(**changes)
+
+
+def _read(path):
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:                  # Python < 3.11
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+    return data
+
+
+def load_scene(path, base=None):
+    """Read a SceneSpec from .json or .toml; with base, the file only overrides it."""
+    return from_dict(SceneSpec, _read(path), base=base)
+
+
+def scene_from_env(default):
+    path = os.environ.get('VPY_SCENE')
+    return load_scene(path, base=default) if path else default
+
+
+def scene_params(**defaults):
+    """Flat parameters for scenes without a SceneSpec, overridable through VPY_SCENE."""
+    path = os.environ.get('VPY_SCENE')
+    data = _read(path) if path else {}
+    unknown = set(data) - set(defaults)
+    if unknown:
+        raise ValueError('unknown scene parameter(s): {}'.format(', '.join(sorted(unknown))))
+    return dict(defaults, **data)
+
+
+# === Builder ===
+class SceneBuilder:
+    """Builds the components of a SceneSpec on first access."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._built = {}
+
+    def _get(self, key, make):
+        if key not in self._built:
+            self._built[key] = make()
+        return self._built[key]
+
+    def _component(self, name):
+        comp = getattr(self.spec, name)
+        if comp is None or not comp.enabled:
+            return None
+        self.canvas
+        return self._get(name, lambda: comp.build(self))
+
+    @property
+    def canvas(self):
+        return self._get('canvas', self._make_canvas)
+
+    def _make_canvas(self):
+        s = self.spec
+        scene = canvas(title=s.title, width=s.width, height=s.height, background=_v(s.background))
+        if s.camera_pos is not None:
+            scene.camera.pos = _v(s.camera_pos)
+        if s.camera_axis is not None:
+            scene.camera.axis = _v(s.camera_axis)
+        return scene
+
+    @property
+    def lod(self):
+        """LodManager for the components that switch level of detail (update it every frame)."""
+        return self._get('lod', lambda: LodManager(self.canvas))
+
+    @property
+    def chamber(self):
+        return self._component('chamber')
+
+    @property
+    def rings(self):
+        return self._component('rings')
+
+    @property
+    def cavities(self):
+        return self._component('cavities')
+
+    @property
+    def coils(self):
+        return self._component('coils')
+
+    @property
+    def coil_field(self):
+        return self._component('coil_field')
+
+    @property
+    def particles(self):
+        return self._component('particles')
+
+    @property
+    def fields(self):
+        return self._get('fields', lambda: self._list('fields', key=lambda f: f.name))
+
+    @property
+    def shapes(self):
+        return self._get('shapes', self._shapes)
+
+    @property
+    def labels(self):
+        return self._get('labels', lambda: self._list('labels'))
+
+    def _list(self, name, key=None):
+        self.canvas
+        comps = [c for c in getattr(self.spec, name) if c.enabled]
+        built = [c.build(self) for c in comps]
+        return {key(c): b for c, b in zip(comps, built)} if key else built
+
+    def _shapes(self):
+        self.canvas
+        live = [s for s in self.spec.shapes if s.enabled and not s.baked]
+        baked = [s for s in self.spec.shapes if s.enabled and s.baked]
+        if baked:
+            statics = StaticBatch(self.spec.name + '-shapes')
+            for s in baked:
+                statics.add(s.kind, **s.attrs())
+            statics.build()
+        return [s.build(self) for s in live]
+
+    def build(self):
+        """Build every enabled component now (instead of on first access)."""
+        for name in ('canvas', 'chamber', 'shapes', 'rings', 'cavities', 'fields', 'coils', 'coil_field',
+                     'particles', 'labels'):
+            getattr(self, name)
+        return self
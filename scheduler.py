@@ -0,0 +1,171 @@
+# scheduler.py
+# Multi-rate update scheduler with a per-frame time budget. Each update in a
+# scene's loop registers as a task with a target frequency (None = every
+# frame) and a priority; once per frame run(t) calls the tasks that are due:
+#
+#   schedule = Scheduler.from_env()
+#   schedule.add('particles', lambda t: particles.push(clock.alpha), required=True)
+#   schedule.add('coils', lambda t: animation.update(t), hz=10, priority=1)
+#   schedule.add('snow', lambda t, part: snow.push(clock.alpha, part), group=200, slices=4)
+#   for frame in clock.frames(60):
+#       schedule.run(clock.render_time)
+#
+# Release times are multiples of 1 / hz in scene time, so without a budget
+# the schedule depends only on t and runs are reproducible. With a budget
+# (VPY_BUDGET_MS=8) due tasks run in priority order and each one's cost is
+# estimated from its recent runs; once the frame's budget is spent:
+#   - required tasks still run,
+#   - group tasks (called with a slice of their group) run one slice of
+#     the group if it fits, so a large group is spread over several frames,
+#   - everything else is deferred to the next frame.
+# A release that isn't done by the next one (for every-frame tasks: by the
+# end of its frame) is a deadline miss. A task that missed runs (one slice,
+# for groups) at its next chance whatever the budget, so nothing starves.
+# Per-task runs, deferrals and misses are printed next to the profiler
+# summary with VPY_PROFILE=1.
+import math
+import os
+import time
+
+from profiler import profiler
+
+
+class Task:
+    """One update: fn(t), or fn(t, part) with a slice of its group."""
+
+    def __init__(self, name, fn, hz=None, priority=0, required=False, group=None, slices=4):
+        self.name = name
+        self.fn = fn
+        self.hz = hz
+        self.priority = priority
+        self.required = required
+        self.group = group
+        self.slices = max(1, min(slices, group)) if group else 1
+        self.release = 0             # index of the pending release (every-frame tasks: frame count)
+        self.pending = False         # a release is waiting to be served
+        self.late = False            # the last deadline was missed
+        self.remaining = 0           # slices of the pending release still to run
+        self.cursor = 0              # next slice of the group
+        self.cost_ms = None          # smoothed cost of a full run
+        self.runs = 0
+        self.slice_runs = 0
+        self.deferred = 0
+        self.misses = 0
+        self.ms = 0.0
+
+    def part(self, k):
+        n, s = self.group, self.slices
+        return slice(k * n // s, (k + 1) * n // s)
+
+    def due(self, t):
+        """Start a new release if one has come up; a pending one overtaken by it is a miss."""
+        if self.hz is None:
+            self._miss()
+            self.pending, self.remaining = True, self.slices
+            return True
+        release = math.floor(t * self.hz + 1e-9)
+        if release >= self.release:
+            self._miss()
+            self.release = release + 1
+            self.pending, self.remaining = True, self.slices
+        return self.pending
+
+    def _miss(self):
+        if self.pending:
+            self.misses += 1
+            self.late = True
+
+    def call(self, t, part=None):
+        self.late = False
+        start = time.perf_counter()
+        with profiler.section(self.name):
+            if self.group is None:
+                self.fn(t)
+            else:
+                self.fn(t, part if part is not None else slice(0, self.group))
+        ms = 1000 * (time.perf_counter() - start)
+        self.ms += ms
+        full = ms if part is None else ms * self.slices
+        self.cost_ms = full if self.cost_ms is None else 0.8 * self.cost_ms + 0.2 * full
+        return ms
+
+
+class Scheduler:
+    """Runs due tasks each frame, within `budget_ms` when one is set."""
+
+    def __init__(self, budget_ms=None):
+        self.budget_ms = budget_ms
+        self.tasks = []
+        self.frames = 0
+        self.over_budget = 0
+
+    @classmethod
+    def from_env(cls):
+        budget = os.environ.get('VPY_BUDGET_MS')
+        return cls(float(budget) if budget else None)
+
+    def add(self, name, fn, hz=None, priority=0, required=False, group=None, slices=4):
+        task = Task(name, fn, hz, priority, required, group, slices)
+        self.tasks.append(task)
+        return task
+
+    def run(self, t):
+        """Call this frame's due tasks at scene time t; returns the ms spent."""
+        due = [task for task in self.tasks if task.due(t)]
+        # required first, then by priority; ties keep registration order
+        due.sort(key=lambda task: (not task.required, -task.priority))
+        spent = 0.0
+        for task in due:
+            left = None if self.budget_ms is None else self.budget_ms - spent
+            if task.required or left is None or task.cost_ms is None or task.cost_ms <= left:
+                if task.remaining == task.slices:
+                    spent += task.call(t)
+                    task.runs += 1
+                    task.pending, task.remaining = False, 0
+                    continue
+            fits_slice = left is None or task.late or task.cost_ms / task.slices <= left
+            if task.group is not None and fits_slice:
+                # over budget (or finishing a spread release): one slice of the group
+                spent += task.call(t, task.part(task.cursor))
+                task.cursor = (task.cursor + 1) % task.slices
+                task.slice_runs += 1
+                task.remaining -= 1
+                if task.remaining == 0:
+                    task.runs += 1
+                    task.pending = False
+                continue
+            if task.late:
+                # missed its last deadline: run now rather than starve
+                spent += task.call(t)
+                task.runs += 1
+                task.pending, task.remaining = False, 0
+                continue
+            task.deferred += 1
+        if self.budget_ms is not None and spent > self.budget_ms:
+            self.over_budget += 1
+        self.frames += 1
+        return spent
+
+    # === Results ===
+    def stats(self):
+        return {task.name: {'hz': task.hz, 'priority': task.priority, 'runs': task.runs,
+                            'slices': task.slice_runs, 'deferred': task.deferred,
+                            'misses': task.misses,
+                            'mean_ms': task.ms / max(task.runs + task.slice_runs, 1)}
+                for task in self.tasks}
+
+    def report(self):
+        lines = ['{:<14} {:>6} {:>4} {:>6} {:>7} {:>8} {:>7} {:>8}'.format(
+            'task', 'hz', 'pri', 'runs', 'slices', 'deferred', 'misses', 'mean ms')]
+        for name, s in self.stats().items():
+            lines.append('{:<14} {:>6} {:>4} {:>6} {:>7} {:>8} {:>7} {:>8.3f}'.format(
+                name, 'frame' if s['hz'] is None else '{:g}'.format(s['hz']), s['priority'],
+                s['runs'], s['slices'], s['deferred'], s['misses'], s['mean_ms']))
+        if self.budget_ms is not None:
+            lines.append('budget {:g} ms: over in {} of {} frames'.format(
+                self.budget_ms, self.over_budget, self.frames))
+        return '\n'.join(lines)
+
+    def close(self):
+        if profiler.enabled and self.frames:
+            print(self.report())
@@ -0,0 +1,239 @@
+# sweep.py
+# Parameter sweeps over the vacuum chamber simulation.
+#
+# Every point of a parameter grid is run headlessly (physics only: particles,
+# chamber wall and the turning ring array, no rendering) in a process pool
+# across all cores. Each run gets a deterministic seed derived from its
+# parameters, so a configuration always gives the same numbers. Rows are
+# appended to a CSV as runs finish; re-running the same command skips the
+# runs already in the file, so an interrupted sweep resumes where it stopped.
+#
+#   python sweep.py --param num_particles=40,400,4000 --param spacing=1.0,1.2 \
+#                   --param speed=0.01,0.02,0.04 --out sweep.csv
+#   python sweep.py --grid grid.json --scene scenes/chamber_dense.toml --out dense.csv
+#
+# Parameters are dotted SceneSpec fields (particles.count, rings.spacing,
+# chamber.radius, ...) or the short names in ALIASES. --grid reads a JSON
+# object of parameter -> list of values. --parquet also writes the table as
+# Parquet at the end (needs pyarrow).
+#
+# Metrics per run: wall / ring / particle-contact hits per particle-second,
+# mean number density, the spread of the time-averaged density along the
+# chamber axis (coefficient of variation over `density_bins` slabs) and the
+# fraction of particles in the outer half (by area) of the cross-section.
+import os
+
+os.environ['VPY_BACKEND'] = 'headless'       # before scene_api is imported, here and in workers
+
+import argparse
+import concurrent.futures
+import csv
+import hashlib
+import itertools
+import json
+import sys
+import time
+
+import numpy as np
+
+ALIASES = {'num_particles': 'particles.count',
+           'speed': 'particles.speed',
+           'particle_radius': 'particles.radius',
+           'spacing': 'rings.spacing',
+           'ring_radius': 'rings.radius',
+           'chamber_radius': 'chamber.radius',
+           'chamber_length': 'chamber.length'}
+
+METRICS = ['wall_hit_rate', 'ring_hit_rate', 'contact_rate', 'density_mean', 'density_cv',
+           'outer_fraction', 'runtime_s']
+
+
+# === Grid ===
+def _value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_param(text):
+    """'name=v1,v2,...' -> (dotted name, [values])."""
+    name, _, values = text.partition('=')
+    if not values:
+        raise ValueError('expected name=v1,v2,... got {!r}'.format(text))
+    return ALIASES.get(name.strip(), name.strip()), [_value(v) for v in values.split(',')]
+
+
+def expand(grid, replicates=1):
+    """Every combination of the grid values, times `replicates`."""
+    names = sorted(grid)
+    for values in itertools.product(*(grid[n] for n in names)):
+        for rep in range(replicates):
+            yield dict(zip(names, values)), rep
+
+
+def nested(params):
+    # {'particles.count': 40} -> {'particles': {'count': 40}}, for SceneSpec overrides
+    out = {}
+    for dotted, value in params.items():
+        *path, leaf = dotted.split('.')
+        node = out
+        for key in path:
+            node = node.setdefault(key, {})
+        node[leaf] = value
+    return out
+
+
+def run_id(params, rep, steps, base_seed):
+    key = json.dumps({'params': params, 'rep': rep, 'steps': steps, 'seed': base_seed}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def run_seed(rid):
+    # deterministic per configuration and replicate, independent of run order
+    return int(rid, 16) % 2**32
+
+
+# === One run (in a worker process) ===
+def base_spec(scene_path=None):
+    from scene_spec import SceneSpec, Chamber, RingArray, Particles, load_scene
+    spec = SceneSpec(name='sweep', chamber=Chamber(), rings=RingArray(), particles=Particles())
+    return load_scene(scene_path, base=spec) if scene_path else spec
+
+
+def run_config(params, seed, steps, scene_path=None, dt=1/60, omega=1.2,
+               sample_every=10, density_bins=8):
+    from dataclasses import replace
+    from scene_spec import SceneBuilder, from_dict, SceneSpec
+    from kinematics import PivotRotation
+    from collisions import CylinderWall
+
+    spec = from_dict(SceneSpec, nested(params), base=base_spec(scene_path))
+    spec = replace(spec, particles=replace(spec.particles, seed=seed))
+    built = SceneBuilder(spec).particles
+    cloud, collider, rings = built.cloud, built.collider, built.ring_obstacles
+    wall = next(o for o in collider.obstacles if isinstance(o, CylinderWall))
+    motion = PivotRotation(rings.centers, omega=omega, axis=(0, -1, 0)) if rings is not None else None
+
+    r, length = spec.chamber.radius, spec.chamber.length
+    edges = np.linspace(-length / 2, length / 2, density_bins + 1)
+    axial = np.zeros(density_bins)
+    outer, samples = 0, 0
+
+    start = time.perf_counter()
+    for k in range(steps):
+        t = k * dt
+        if motion is not None:
+            rings.centers = motion.at(t)
+        cloud.step(omega * t)
+        if k % sample_every == 0:
+            axial += np.histogram(cloud.pos[:, 0], bins=edges)[0]
+            outer += int(np.count_nonzero(np.hypot(cloud.pos[:, 1], cloud.pos[:, 2]) > r / np.sqrt(2)))
+            samples += 1
+    runtime = time.perf_counter() - start
+
+    n = len(cloud)
+    particle_s = n * steps * dt
+    mean_counts = axial / samples
+    return {'wall_hit_rate': wall.hits / particle_s,
+            'ring_hit_rate': (rings.hits if rings is not None else 0) / particle_s,
+            'contact_rate': collider.contacts / particle_s,
+            'density_mean': n / (np.pi * r * r * length),
+            'density_cv': float(mean_counts.std() / mean_counts.mean()) if mean_counts.mean() else 0.0,
+            'outer_fraction': outer / (samples * n),
+            'runtime_s': runtime}
+
+
+def _work(job):
+    rid, params, rep, seed, steps, scene_path = job
+    metrics = run_config(params, seed, steps, scene_path)
+    return dict(run_id=rid, replicate=rep, seed=seed, steps=steps, **params, **metrics)
+
+
+# === Results table ===
+def completed_runs(path):
+    """run_ids already in the CSV; a row cut off by an interruption is dropped."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+    with open(path, newline='') as f:
+        return {row['run_id'] for row in csv.DictReader(f)}
+
+
+def header_of(path):
+    with open(path, newline='') as f:
+        return next(csv.reader(f), None)
+
+
+def write_parquet(csv_path, parquet_path):
+    try:
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit('--parquet needs pyarrow (pip install pyarrow); the CSV is complete')
+    pyarrow.parquet.write_table(pyarrow.csv.read_csv(csv_path), parquet_path)
+
+
+# === Main ===
+def main():
+    parser = argparse.ArgumentParser(description='Parallel parameter sweeps over the chamber simulation.')
+    parser.add_argument('--param', action='append', default=[], help='name=v1,v2,... (repeatable)')
+    parser.add_argument('--grid', help='JSON file: {parameter: [values]}')
+    parser.add_argument('--scene', help='JSON/TOML scene the grid is applied over')
+    parser.add_argument('--steps', type=int, default=3600, help='physics steps per run (60 per s)')
+    parser.add_argument('--replicates', type=int, default=1, help='runs per configuration, distinct seeds')
+    parser.add_argument('--seed', type=int, default=0, help='base seed mixed into every run seed')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default='sweep.csv')
+    parser.add_argument('--parquet', help='also write the results as Parquet')
+    args = parser.parse_args()
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update({ALIASES.get(k, k): v for k, v in json.load(f).items()})
+    grid.update(parse_param(p) for p in args.param)
+    if not grid:
+        parser.error('give at least one --param or a --grid')
+
+    done = completed_runs(args.out)
+    jobs = []
+    for params, rep in expand(grid, args.replicates):
+        rid = run_id(params, rep, args.steps, args.seed)
+        if rid not in done:
+            jobs.append((rid, params, rep, run_seed(rid), args.steps, args.scene))
+    total = len(jobs) + len(done)
+    print('{} runs, {} already done, {} workers'.format(total, total - len(jobs), args.workers))
+
+    columns = ['run_id', 'replicate', 'seed', 'steps'] + sorted(grid) + METRICS
+    # a file with a header but no finished run still has its header
+    has_header = os.path.exists(args.out) and os.path.getsize(args.out) > 0
+    existing = header_of(args.out) if has_header else None
+    if existing is not None and existing != columns:
+        raise SystemExit('{} has different columns; write to a new --out'.format(args.out))
+
+    with open(args.out, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        if existing is None:
+            writer.writeheader()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(_work, job) for job in jobs]
+            for k, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                row = future.result()
+                writer.writerow(row)
+                f.flush()                    # each finished run survives an interruption
+                print('[{}/{}] {} wall {:.3f}/s density cv {:.3f}'.format(
+                    k + total - len(jobs), total,
+                    ' '.join('{}={}'.format(n, row[n]) for n in sorted(grid)),
+                    row['wall_hit_rate'], row['density_cv']))
+
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
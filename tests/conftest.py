@@ -0,0 +1,21 @@
+# conftest.py
+# The tests run on the headless backend, with a throwaway geometry cache, and
+# import the modules from the repository root:
+#
+#   python -m pytest -q
+import os
+import sys
+import tempfile
+
+os.environ['VPY_BACKEND'] = 'headless'
+os.environ.setdefault('VPY_GEOMETRY_CACHE', tempfile.mkdtemp(prefix='vpy-geometry-'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def scene():
+    """A fresh headless canvas, selected for the objects a test creates."""
+    from scene_api import canvas
+    return canvas()
@@ -0,0 +1,103 @@
+# test_boris.py
+# Physics checks for the Boris pusher (boris.py): energy in a pure B field,
+# the gyroradius, and drift and energy in crossed E and B. Throughput is
+# measured by benchmarks/bench_boris.py.
+import numpy as np
+import pytest
+
+from boris import BorisPusher
+from magnetics import Loop, UniformField, solve_grid
+
+QM = 2e4                     # charge / mass used by the chamber scene
+B = 2e-6                     # along x: QM * B = 0.04 rad per step
+
+
+def chamber_particles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform([-3, -2, -2], [3, 2, 2], (n, 3)), rng.uniform(-0.02, 0.02, (n, 3))
+
+
+def turns(k, omega=QM * B):
+    """Steps for k full gyrations; Boris turns v by 2 atan(omega / 2) per step."""
+    return int(round(k * 2 * np.pi / (2 * np.arctan(omega / 2))))
+
+
+def test_uniform_b_conserves_kinetic_energy():
+    pos, vel = chamber_particles(1000)
+    pusher = BorisPusher(UniformField((B, 0, 0)), QM)
+    e0 = pusher.kinetic_energy(vel)
+    for _ in range(1000):
+        pusher.step(pos, vel)
+    assert np.max(np.abs(pusher.kinetic_energy(vel) - e0) / e0) < 1e-12
+
+
+def test_uniform_b_gyroradius():
+    pos, vel = chamber_particles(1000)
+    pusher = BorisPusher(UniformField((B, 0, 0)), QM)
+    orbit = []
+    for _ in range(turns(2)):
+        pusher.step(pos, vel)
+        orbit.append(pos[:, 1:].copy())
+    # positions lie on a circle of radius v_perp / (2 sin(atan(omega / 2))) ~ v_perp / omega
+    orbit = np.array(orbit)
+    measured = 0.5 * (orbit.max(axis=0) - orbit.min(axis=0)).mean(axis=1)
+    expected = np.hypot(vel[:, 1], vel[:, 2]) / (2 * np.sin(np.arctan(QM * B / 2)))
+    assert np.median(np.abs(measured - expected) / expected) < 0.01
+
+
+def test_coil_field_conserves_kinetic_energy():
+    loops = [Loop((x, 0, 0), (1, 0, 0), 3.75) for x in np.linspace(-3.7, 3.7, 6)]
+    grid = solve_grid(loops, (-4, -3, -3), (4, 3, 3), (16, 8, 8), current=1.0)
+    pos, vel = chamber_particles(200)
+    pusher = BorisPusher(grid, QM)
+    e0 = pusher.kinetic_energy(vel)
+    for _ in range(300):
+        pusher.step(pos, vel)
+    assert np.max(np.abs(pusher.kinetic_energy(vel) - e0) / e0) < 1e-12
+
+
+def test_e_cross_b_drift():
+    e_field = np.array([0.0, 0.0, 5e-9])
+    pos, vel = chamber_particles(200)
+    v_parallel = vel[:, 0].copy()
+    pusher = BorisPusher(UniformField((B, 0, 0)), QM, e_field=e_field)
+    start, steps = pos.copy(), turns(10)
+    for _ in range(steps):
+        pusher.step(pos, vel)
+    # over whole gyrations the guiding centre moves at E x B / B^2 across B
+    drift = np.cross(e_field, (B, 0, 0)) / B ** 2
+    mean_vel = (pos - start) / steps
+    assert drift[1] == pytest.approx(0.0025)
+    assert np.abs(mean_vel[:, 1:] - drift[1:]).max() < 1e-6
+    assert np.abs(mean_vel[:, 0] - v_parallel).max() < 1e-12
+
+
+def test_e_cross_b_total_energy_stays_bounded():
+    e_field = np.array([0.0, 0.0, 5e-9])
+    pos, vel = chamber_particles(1000)
+    pusher = BorisPusher(UniformField((B, 0, 0)), QM, e_field=e_field)
+    scale = pusher.kinetic_energy(vel).mean()
+    # velocities sit half a step off the positions, so energy at x(n) uses
+    # the mean of v(n - 1/2) and v(n + 1/2)
+    e0, deviation = None, []
+    for _ in range(1000):
+        x, v = pos.copy(), vel.copy()
+        pusher.step(pos, vel)
+        e = pusher.kinetic_energy(0.5 * (v + vel)) - QM * x @ e_field
+        e0 = e if e0 is None else e0
+        deviation.append(np.max(np.abs(e - e0)) / scale)
+    first, second = max(deviation[:500]), max(deviation[500:])
+    assert second < 1e-2
+    assert second < 1.5 * first
+
+
+def test_uncharged_particles_fly_straight():
+    pos, vel = chamber_particles(10)
+    charge = np.zeros(10)
+    charge[::2] = 2e4
+    pusher = BorisPusher(UniformField((B, 0, 0)), charge, np.ones(10))
+    start, v0 = pos.copy(), vel.copy()
+    for _ in range(50):
+        pusher.step(pos, vel)
+    assert np.allclose(pos[1::2], start[1::2] + 50 * v0[1::2])
+    assert not np.allclose(pos[::2], start[::2] + 50 * v0[::2])
@@ -0,0 +1,64 @@
+# test_collisions.py
+# Spatial-hash candidates, elastic contacts and the chamber obstacles (collisions.py).
+import numpy as np
+
+from collisions import Collider, CylinderWall, RingSet, SpatialHash
+
+
+def test_spatial_hash_finds_every_close_pair_once():
+    rng = np.random.default_rng(1)
+    pos = rng.uniform(-2, 2, (400, 3))
+    i, j = SpatialHash(0.3).pairs(pos)
+    found = {(min(a, b), max(a, b)) for a, b in zip(i.tolist(), j.tolist())}
+    assert len(found) == len(i)
+    d = np.linalg.norm(pos[:, None] - pos[None], axis=-1)
+    close = {(a, b) for a, b in zip(*np.nonzero(np.triu(d < 0.3, 1)))}
+    assert close <= found
+
+
+def test_head_on_contact_swaps_velocities():
+    pos = np.array([[-0.07, 0.0, 0.0], [0.07, 0.0, 0.0]])
+    vel = np.array([[0.02, 0.0, 0.0], [-0.01, 0.0, 0.0]])
+    Collider(0.08).resolve(pos, vel)
+    assert np.allclose(vel, [[-0.01, 0.0, 0.0], [0.02, 0.0, 0.0]])
+
+
+def test_contacts_conserve_momentum_and_energy():
+    rng = np.random.default_rng(2)
+    pos = rng.uniform(-0.5, 0.5, (200, 3))
+    vel = rng.uniform(-0.02, 0.02, (200, 3))
+    p0, e0 = vel.sum(axis=0), np.sum(vel * vel)
+    collider = Collider(0.05)
+    collider.resolve(pos, vel)
+    assert collider.contacts > 0
+    assert np.allclose(vel.sum(axis=0), p0)
+    assert np.sum(vel * vel) <= e0 + 1e-15
+
+
+def test_separating_particles_are_left_alone():
+    pos = np.array([[-0.07, 0.0, 0.0], [0.07, 0.0, 0.0]])
+    vel = np.array([[-0.02, 0.0, 0.0], [0.01, 0.0, 0.0]])
+    Collider(0.08).resolve(pos, vel)
+    assert np.allclose(vel, [[-0.02, 0.0, 0.0], [0.01, 0.0, 0.0]])
+
+
+def test_cylinder_wall_reflects_and_contains():
+    wall = CylinderWall(radius=3.0, length=8.0)
+    pos = np.array([[0.0, 3.2, 0.0], [4.5, 0.0, 0.0]])
+    vel = np.array([[0.0, 0.02, 0.01], [0.03, 0.0, 0.0]])
+    wall.resolve(pos, vel, 0.1)
+    assert np.allclose(vel, [[0.0, -0.02, 0.01], [-0.03, 0.0, 0.0]])
+    assert np.hypot(pos[0, 1], pos[0, 2]) <= 2.9 + 1e-12
+    assert pos[1, 0] <= 3.9
+    assert wall.hits == 2
+
+
+def test_ring_bounces_a_particle_off_its_tube():
+    rings = RingSet([(0.0, 0.0, 0.0)], axis=(1, 0, 0), radius=0.3, thickness=0.05)
+    # moving along x into the top of the tube, inside its reach
+    pos = np.array([[-0.1, 0.3, 0.0]])
+    vel = np.array([[0.02, 0.0, 0.0]])
+    rings.resolve(pos, vel, 0.08)
+    assert vel[0, 0] < 0
+    assert np.linalg.norm(pos[0] - [0.0, 0.3, 0.0]) >= 0.13 - 1e-12
+    assert rings.hits == 1
@@ -0,0 +1,95 @@
+# test_gltf_export.py
+# The glTF writer (gltf_export.py): a valid GLB, reduced keys, animated points.
+import json
+import struct
+
+import numpy as np
+
+from gltf_export import SceneExporter, matrix_to_quat, reduce_keys
+
+COMPONENTS = {'SCALAR': 1, 'VEC3': 3, 'VEC4': 4}
+
+
+def read_glb(path):
+    """The JSON document and an accessor reader of a .glb file."""
+    data = open(path, 'rb').read()
+    magic, version, total = struct.unpack('<4sII', data[:12])
+    assert (magic, version, total) == (b'glTF', 2, len(data))
+    json_len, json_type = struct.unpack('<I4s', data[12:20])
+    assert json_type == b'JSON'
+    doc = json.loads(data[20:20 + json_len])
+    bin_len, bin_type = struct.unpack('<I4s', data[20 + json_len:28 + json_len])
+    assert bin_type == b'BIN\0' and doc['buffers'][0]['byteLength'] == bin_len
+    blob = data[28 + json_len:28 + json_len + bin_len]
+
+    def read(index):
+        acc = doc['accessors'][index]
+        assert acc['componentType'] == 5126
+        view = doc['bufferViews'][acc['bufferView']]
+        n = COMPONENTS[acc['type']]
+        arr = np.frombuffer(blob, np.float32, acc['count'] * n, view['byteOffset'] + acc.get('byteOffset', 0))
+        return arr.reshape(acc['count'], n)
+    return doc, read
+
+
+def channels(doc, node):
+    anim = doc.get('animations', [{'channels': []}])[0]
+    return {c['target']['path']: anim['samplers'][c['sampler']]
+            for c in anim['channels'] if c['target'].get('node') == node}
+
+
+def test_reduce_keys_keeps_only_the_corners():
+    t = np.arange(11.0)
+    v = np.minimum(t, 5.0)[:, None]
+    assert reduce_keys(t, v, 1e-6).tolist() == [0, 5, 10]
+
+
+def test_matrix_to_quat_identity_and_half_turn():
+    assert np.allclose(matrix_to_quat(np.eye(3)), [0, 0, 0, 1])
+    q = matrix_to_quat(np.diag([1.0, -1.0, -1.0]))
+    assert np.allclose(np.abs(q), [1, 0, 0, 0])
+
+
+def test_export_animates_objects_and_points(scene, tmp_path):
+    from scene_api import box, points, sphere, vector, tracker
+    path = str(tmp_path / 'run.glb')
+    box(pos=vector(0, -1, 0), size=vector(4, 0.2, 4))
+    ball = sphere(pos=vector(0, 0, 0), radius=0.5, color=vector(1, 0, 0))
+    dots = points(radius=0.05, size_units='world')
+    exporter = SceneExporter(path, scene, chunk_frames=8)
+    for f in range(20):
+        ball.pos = vector(0.1 * f, 0, 0)
+        dots.clear()
+        dots.append([{'pos': vector(i, 0.2 * f, 0), 'color': vector(0, 0, 1)} for i in range(2 + f // 10)])
+        tracker.flush()
+        exporter.sample(f / 60)
+    exporter.save()
+
+    doc, read = read_glb(path)
+    names = [n['name'] for n in doc['nodes']]
+    assert names[:2] == ['box_0', 'sphere_1']
+    assert [n for n in names if n.startswith('point_')] == ['point_2', 'point_3', 'point_4']
+    assert channels(doc, 0) == {}                              # the box never moves
+    ball = channels(doc, 1)
+    assert set(ball) == {'translation'}
+    moves = ball['translation']
+    assert len(read(moves['input'])) == 2                      # linear motion: two keys
+    assert np.allclose(read(moves['output'])[-1], [1.9, 0, 0], atol=1e-6)
+
+    # every point follows its slot; the third only exists from frame 10
+    first = channels(doc, 2)['translation']
+    assert np.allclose(read(first['output'])[[0, -1]], [[0, 0, 0], [0, 3.8, 0]], atol=1e-5)
+    third = channels(doc, 4)
+    times, scale = read(third['scale']['input'])[:, 0], read(third['scale']['output'])
+    assert np.allclose(scale[times < 9 / 60], 0.0)
+    assert np.allclose(scale[-1], 0.05)
+
+
+def test_export_without_frames_is_a_still(scene, tmp_path):
+    from scene_api import sphere, vector
+    path = str(tmp_path / 'still.glb')
+    sphere(pos=vector(1, 2, 3))
+    SceneExporter(path, scene).save()
+    doc, _ = read_glb(path)
+    assert doc['nodes'][0]['translation'] == [1.0, 2.0, 3.0]
+    assert 'animations' not in doc
@@ -0,0 +1,61 @@
+# test_magnetics.py
+# Biot-Savart against the analytic loop field, grid sampling, the solve cache
+# and slice clipping (magnetics.py).
+import os
+
+import numpy as np
+import pytest
+
+from magnetics import MU0, FieldGrid, Loop, biot_savart, discretize, field_slice, solve_grid
+
+
+def on_axis(z, radius, current=1.0):
+    return MU0 * current * radius ** 2 / (2 * (radius ** 2 + z ** 2) ** 1.5)
+
+
+def test_loop_field_on_axis_matches_analytic():
+    mids, dls = discretize([Loop((0, 0, 0), (1, 0, 0), 2.0)], segments=256)
+    x = np.array([0.0, 0.5, 1.5, 4.0])
+    points = np.stack([x, np.zeros(4), np.zeros(4)], axis=1)
+    b = biot_savart(points, mids, dls, current=3.0)
+    assert np.allclose(b[:, 0], on_axis(x, 2.0, 3.0), rtol=1e-3)
+    assert np.allclose(b[:, 1:], 0.0, atol=1e-12)
+
+
+def test_field_follows_the_right_hand_rule():
+    mids, dls = discretize([Loop((0, 0, 0), (0, 0, -1), 1.0)])
+    assert biot_savart([(0, 0, 0)], mids, dls)[0, 2] < 0
+
+
+def test_grid_sample_interpolates_linearly():
+    lo, hi, shape = (-1, -2, 0), (1, 2, 3), (5, 9, 4)
+    pts = FieldGrid.points(lo, hi, shape)
+    b = np.stack([pts[..., 0] + 2 * pts[..., 1], pts[..., 2], -pts[..., 0]], axis=-1)
+    grid = FieldGrid(lo, hi, b)
+    rng = np.random.default_rng(3)
+    q = rng.uniform(lo, hi, (50, 3))
+    expected = np.stack([q[:, 0] + 2 * q[:, 1], q[:, 2], -q[:, 0]], axis=1)
+    assert np.allclose(grid.sample(q), expected)
+    # outside the grid: the nearest boundary value
+    assert np.allclose(grid.sample([(5, 0, 0)]), grid.sample([(1, 0, 0)]))
+
+
+def test_solve_grid_is_cached(tmp_path):
+    loops = [Loop((0, 0, 0), (1, 0, 0), 1.0)]
+    first = solve_grid(loops, (-1, -1, -1), (1, 1, 1), (5, 5, 5), cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+    again = solve_grid(loops, (-1, -1, -1), (1, 1, 1), (5, 5, 5), cache_dir=str(tmp_path))
+    assert np.array_equal(first.b, again.b)
+    # 64 straight segments: within a few tenths of a percent of the circle
+    assert first.sample([(0, 0, 0)])[0, 0] == pytest.approx(MU0 / 2, rel=5e-3)
+
+
+def test_field_slice_clips_about_the_axis(scene):
+    loops = [Loop((0, 1.0, 0), (1, 0, 0), 1.0)]
+    grid = solve_grid(loops, (-1, -0.5, -1.5), (1, 2.5, 1.5), (6, 6, 6))
+    mesh = field_slice(grid, normal_axis=2, at=0.0, resolution=(12, 16), clip_radius=1.0,
+                       clip_center=(1.0, 0.0))
+    used = mesh.vertices[np.unique(mesh.faces)]
+    rho = np.hypot(used[:, 1] - 1.0, used[:, 2])
+    assert len(used) and rho.max() <= 1.0
+    assert used[:, 1].min() < 0.5 and used[:, 1].max() > 1.5
@@ -0,0 +1,96 @@
+# test_recorder.py
+# The chunked trajectory format and scene capture / replay (recorder.py).
+import numpy as np
+import pytest
+
+from recorder import MAGIC, SceneRecording, Trajectory, TrajectoryWriter
+
+COLUMNS = [('a.pos', 'f4', (3, 3)), ('b.alive', 'u1', (4,))]
+
+
+def frame(i):
+    return {'a.pos': np.full((3, 3), i, dtype=float), 'b.alive': np.arange(4) < i % 5}
+
+
+def test_round_trip_across_chunks(tmp_path):
+    path = str(tmp_path / 'run.rec')
+    with TrajectoryWriter(path, COLUMNS, fps=30, chunk_frames=4, meta={'scene': 'test'}) as w:
+        for i in range(10):
+            w.append(frame(i))
+    with open(path, 'rb') as f:
+        assert f.read(len(MAGIC)) == MAGIC
+    traj = Trajectory(path)
+    assert len(traj) == 10 and traj.fps == 30 and traj.meta == {'scene': 'test'}
+    for i in (0, 3, 4, 9):
+        got = traj.frame(i)
+        assert np.array_equal(got['a.pos'], frame(i)['a.pos'])
+        assert np.array_equal(got['b.alive'].astype(bool), frame(i)['b.alive'])
+    with pytest.raises(IndexError):
+        traj.frame(10)
+
+
+def test_every_complete_chunk_is_readable_before_close(tmp_path):
+    path = str(tmp_path / 'run.rec')
+    w = TrajectoryWriter(path, COLUMNS, chunk_frames=4)
+    for i in range(6):
+        w.append(frame(i))
+    assert len(Trajectory(path)) == 4
+    w.close()
+    assert len(Trajectory(path)) == 6
+
+
+def test_empty_recording(tmp_path):
+    path = str(tmp_path / 'empty.rec')
+    TrajectoryWriter(path, COLUMNS).close()
+    traj = Trajectory(path)
+    assert len(traj) == 0
+    assert traj.columns['a.pos'].shape[0] == 0
+    rec = SceneRecording('test', replay_path=path)
+    rec.show(1.0)                # nothing to show, and no error
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        Trajectory(str(path))
+
+
+class Cloud:
+    def __init__(self, visual, n):
+        self.visual = visual
+        self.pos = np.zeros((n, 3))
+        self.color = np.zeros((n, 3))
+        self.alive = np.ones(n, dtype=bool)
+
+
+def test_scene_capture_and_replay(scene, tmp_path):
+    from scene_api import sphere, points, vector, tracker
+    path = str(tmp_path / 'scene.rec')
+    balls = [sphere(pos=vector(i, 0, 0)) for i in range(2)]
+    cloud = Cloud(points(), 3)
+    rec = SceneRecording('test', record_path=path)
+    rec.track('balls', balls, ('pos', 'visible'))
+    rec.track_points('cloud', cloud)
+    for f in range(5):
+        balls[0].pos = vector(0, f, 0)
+        balls[1].visible = f % 2 == 0
+        cloud.pos[:] = f
+        cloud.alive[:] = np.arange(3) < f
+        tracker.flush()
+        rec.capture()
+    rec.close()
+
+    play = SceneRecording('test', replay_path=path)
+    play.track('balls', balls, ('pos', 'visible'))
+    play.track_points('cloud', cloud)
+    play.seek(3)
+    tracker.flush()
+    assert balls[0].pos.y == 3
+    assert balls[1].visible is False
+    assert cloud.visual.npoints == 3
+    play.seek(2)
+    tracker.flush()
+    assert balls[1].visible is True
+    assert cloud.visual.npoints == 2
+    assert cloud.visual.point(0)['pos'].x == 2
@@ -0,0 +1,51 @@
+# test_rng.py
+# Seeded, named random streams (rng.py).
+import numpy as np
+
+from rng import RandomStreams, stream_for
+
+
+def test_same_seed_same_values():
+    a = RandomStreams(42).stream('snow').uniform(0, 1, size=100)
+    b = RandomStreams(42).stream('snow').uniform(0, 1, size=100)
+    assert np.array_equal(a, b)
+    assert not np.array_equal(a, RandomStreams(43).stream('snow').uniform(0, 1, size=100))
+
+
+def test_streams_do_not_depend_on_each_other():
+    first = RandomStreams(7)
+    first.stream('particles').random(1000)
+    twinkle = first.stream('twinkle').random(10)
+    assert np.array_equal(twinkle, RandomStreams(7).stream('twinkle').random(10))
+    assert not np.array_equal(twinkle, RandomStreams(7).stream('particles').random(10))
+
+
+def test_block_size_does_not_change_the_values():
+    small = RandomStreams(5).stream('x', block=3)
+    large = RandomStreams(5).stream('x', block=1000)
+    a = np.concatenate([small.random(2), small.random(7), [small.random()]])
+    b = np.concatenate([large.random(2), large.random(7), [large.random()]])
+    assert np.array_equal(a, b)
+    assert small.refills > large.refills
+
+
+def test_draw_ranges():
+    s = RandomStreams(3).stream('draws')
+    u = s.uniform(-2.0, 5.0, size=(200, 3))
+    assert u.shape == (200, 3) and u.min() >= -2.0 and u.max() < 5.0
+    k = s.integers(4, 9, size=500)
+    assert k.min() == 4 and k.max() == 8
+    assert 0 <= s.integers(10) < 10
+    assert s.choice(['a', 'b', 'c']) in ('a', 'b', 'c')
+
+
+def test_sample_is_distinct():
+    picks = RandomStreams(11).stream('pick').sample(20, 20)
+    assert sorted(picks) == list(range(20))
+    few = RandomStreams(11).stream('pick').sample(1000, 8)
+    assert len(set(few)) == 8 and all(0 <= p < 1000 for p in few)
+
+
+def test_stream_for_with_a_seed_is_its_own_root():
+    a = stream_for('particles', seed=9).random(5)
+    assert np.array_equal(a, RandomStreams(9).stream('particles').random(5))
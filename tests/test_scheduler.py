@@ -0,0 +1,61 @@
+# test_scheduler.py
+# Release times, priorities and budget handling of the update scheduler (scheduler.py).
+from scheduler import Scheduler
+
+
+def run_frames(schedule, n, fps=60):
+    for f in range(n):
+        schedule.run(f / fps)
+
+
+def test_rates_follow_scene_time():
+    schedule = Scheduler()
+    calls = {'frame': [], 'slow': []}
+    schedule.add('frame', lambda t: calls['frame'].append(t))
+    schedule.add('slow', lambda t: calls['slow'].append(t), hz=10)
+    run_frames(schedule, 60)
+    assert len(calls['frame']) == 60
+    assert len(calls['slow']) == 10
+    assert calls['slow'][:3] == [0.0, 6 / 60, 12 / 60]
+
+
+def test_priority_order_with_required_first():
+    schedule = Scheduler()
+    order = []
+    schedule.add('low', lambda t: order.append('low'))
+    schedule.add('high', lambda t: order.append('high'), priority=2)
+    schedule.add('must', lambda t: order.append('must'), required=True)
+    schedule.run(0.0)
+    assert order == ['must', 'high', 'low']
+
+
+def test_over_budget_task_is_deferred_then_runs_late():
+    schedule = Scheduler(budget_ms=1.0)
+    calls = []
+    task = schedule.add('heavy', lambda t: calls.append(t))
+    schedule.run(0.0)                # first run: cost unknown, so it runs
+    task.cost_ms = 50.0
+    run_frames(schedule, 10)
+    # deferred one frame, then it missed its deadline and runs regardless
+    assert len(calls) == 1 + 5
+    assert task.deferred == 5 and task.misses == 5
+
+
+def test_required_task_ignores_the_budget():
+    schedule = Scheduler(budget_ms=1.0)
+    calls = []
+    task = schedule.add('physics', lambda t: calls.append(t), required=True)
+    task.cost_ms = 50.0
+    run_frames(schedule, 10)
+    assert len(calls) == 10
+    assert task.deferred == 0
+
+
+def test_group_is_spread_over_slices():
+    schedule = Scheduler(budget_ms=3.0)
+    parts = []
+    task = schedule.add('snow', lambda t, part: parts.append(part), hz=1, group=100, slices=4)
+    task.cost_ms = 10.0              # a full run doesn't fit, a quarter does
+    run_frames(schedule, 6)
+    assert parts == [slice(0, 25), slice(25, 50), slice(50, 75), slice(75, 100)]
+    assert task.runs == 1 and task.slice_runs == 4 and task.misses == 0
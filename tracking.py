@@ -0,0 +1,126 @@
+# tracking.py
+# Dirty-attribute tracking for scene objects. Writes go through a proxy that
+# compares the new value against the object's current (last sent) state and
+# queues only real changes; flush() applies everything queued in a frame in
+# one pass, so repeated or no-op writes never reach the renderer.
+#
+# `points` objects are rebuilt in bulk (clear + append, see
+# particles.push_points) rather than through attribute writes; those pushes
+# are counted separately, with the number of points each one sends.
+
+_MISSING = object()
+
+
+def same_value(a, b, epsilon):
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) <= epsilon
+    if hasattr(a, 'x') and hasattr(b, 'x'):
+        return (abs(a.x - b.x) <= epsilon and
+                abs(a.y - b.y) <= epsilon and
+                abs(a.z - b.z) <= epsilon)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class ChangeTracker:
+    """Queues attribute changes per object and sends them in one flush."""
+
+    def __init__(self, epsilon=1e-6):
+        self.epsilon = epsilon
+        self.sent = 0
+        self.suppressed = 0
+        self.flushes = 0
+        self.points_pushes = 0
+        self.points_sent = 0
+        self._pending = {}   # id(obj) -> (obj, {name: value})
+
+    def track(self, obj):
+        return Tracked(obj, self)
+
+    def set(self, obj, name, value):
+        entry = self._pending.get(id(obj))
+        current = getattr(obj, name, _MISSING)
+        if current is not _MISSING and same_value(value, current, self.epsilon):
+            # matches what the renderer already has; drop any queued change
+            if entry is not None:
+                entry[1].pop(name, None)
+            self.suppressed += 1
+            return
+        if entry is None:
+            entry = self._pending[id(obj)] = (obj, {})
+        elif name in entry[1]:
+            # overwritten within the frame: the earlier write never goes out
+            self.suppressed += 1
+        entry[1][name] = value
+
+    def pending(self, obj):
+        entry = self._pending.get(id(obj))
+        return entry[1] if entry is not None else None
+
+    def flush_object(self, obj):
+        entry = self._pending.pop(id(obj), None)
+        if entry is not None:
+            for name, value in entry[1].items():
+                setattr(obj, name, value)
+                self.sent += 1
+
+    def flush(self):
+        pending, self._pending = self._pending, {}
+        for obj, changes in pending.values():
+            for name, value in changes.items():
+                setattr(obj, name, value)
+            self.sent += len(changes)
+        self.flushes += 1
+
+    def count_points(self, n):
+        """Record one bulk rebuild of a points object with n points."""
+        self.points_pushes += 1
+        self.points_sent += n
+
+    def stats(self):
+        total = self.sent + self.suppressed
+        return {'sent': self.sent,
+                'suppressed': self.suppressed,
+                'flushes': self.flushes,
+                'points_pushes': self.points_pushes,
+                'points_sent': self.points_sent,
+                'suppressed_fraction': self.suppressed / total if total else 0.0}
+
+
+class Tracked:
+    """Proxy around a scene object that routes attribute writes to a tracker."""
+
+    __slots__ = ('_obj', '_tracker')
+
+    def __init__(self, obj, tracker):
+        object.__setattr__(self, '_obj', obj)
+        object.__setattr__(self, '_tracker', tracker)
+
+    def __getattr__(self, name):
+        obj, tracker = self._obj, self._tracker
+        pending = tracker.pending(obj)
+        if pending is not None and name in pending:
+            return pending[name]
+        value = getattr(obj, name)
+        if callable(value) and pending:
+            # methods such as rotate() must see the queued state
+            tracker.flush_object(obj)
+        return value
+
+    def __setattr__(self, name, value):
+        self._tracker.set(self._obj, name, unwrap(value))
+
+    def __repr__(self):
+        return 'Tracked({!r})'.format(self._obj)
+
+
+def unwrap(value):
+    if isinstance(value, Tracked):
+        return value._obj
+    if isinstance(value, list):
+        return [unwrap(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(unwrap(v) for v in value)
+    return value
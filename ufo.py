@@ -1,4 +1,10 @@
-from vpython import *
+from scene_api import *
+from rigid import RigidGroup
+from kinematics import Orbit, Bounce, Spin
+from clock import SimClock
+from animation import Animator, Sine
+from scheduler import Scheduler
+import numpy as np
 import math
 
 scene = canvas(title='UFO inside Box', width=800, height=600)
@@ -26,50 +32,39 @@ for i in range(num_lights):
     light = sphere(pos=ufo_center + offset, radius=0.08, color=color.red)
     lights.append((light, offset))
 
-# Group all UFO parts
-ufo_parts = [saucer, dome] + [l for l, _ in lights]
+# Group all UFO parts: one transform per frame moves the whole saucer
+ufo = RigidGroup(origin=ufo_center)
+ufo.add(saucer)
+ufo.add(dome, dome_offset)
+for light, offset in lights:
+    ufo.add(light, offset)
 
 # === ANIMATION ===
-angle = 0
-t = 0
+# Orbit + bounce inside box, spin around Y-axis (rates per second at 60 Hz)
+path = Orbit(radius=1.2, omega=1.8) + Bounce(amplitude=0.8, omega=3.0)
+spin = Spin(axis=(0, 1, 0), omega=2.7)
 
-while True:
-    rate(60)
-    angle += 0.03
-    t += 0.05
+# Light color pulse: hue (sin(2 phase + i) + 1) / 2 runs red -> green, color (1 - hue, hue, 0)
+animation = Animator()
+animation.add([light for light, _ in lights], 'color',
+              Sine((0.5, 0.5, 0), (-0.5, 0.5, 0), 2, phase=np.arange(num_lights)[:, None]),
+              name='rim lights')
 
-    # Orbit + bounce inside box
-    x = 1.2 * math.sin(angle)
-    z = 1.2 * math.cos(angle)
-    y = 0.8 * math.sin(t)
-    ufo_pos = vector(x, y, z)
 
-    # Rotation around Y-axis (UFO spins in place)
-    rotation_angle = angle * 1.5
-    cos_r = math.cos(rotation_angle)
-    sin_r = math.sin(rotation_angle)
+def move_ufo(t):
+    # Move saucer, dome and rim lights with one group transform
+    ufo.set_transform(path.at(t), spin.quat_at(t))
+    ufo.push()
 
-    # Update saucer position (center)
-    saucer.pos = ufo_pos
 
-    # Update dome (fixed offset rotated around center)
-    rotated_dome_offset = vector(
-        cos_r * dome_offset.x + sin_r * dome_offset.z,
-        dome_offset.y,
-        -sin_r * dome_offset.x + cos_r * dome_offset.z
-    )
-    dome.pos = ufo_pos + rotated_dome_offset
+# The saucer moves every frame; the color pulse (phase 3 t, 0.05 per frame) runs at 30 Hz
+schedule = Scheduler.from_env()
+schedule.add('ufo', move_ufo, required=True)
+schedule.add('rim lights', lambda t: animation.update(3.0 * t), hz=30, priority=1)
 
-    # Update lights around rim (rotating with the saucer)
-    for light, offset in lights:
-        rotated_offset = vector(
-            cos_r * offset.x + sin_r * offset.z,
-            offset.y,
-            -sin_r * offset.x + cos_r * offset.z
-        )
-        light.pos = ufo_pos + rotated_offset
+clock = SimClock(dt=1/60)
+for frame in clock.frames(60):
+    clock.catch_up()          # all motion is closed-form; nothing to integrate
+    schedule.run(clock.render_time)     # absolute scene time (s)
 
-    # Light color pulse effect
-    for i, (light, _) in enumerate(lights):
-        hue = (math.sin(t * 2 + i) + 1) / 2
-        light.color = vector(1 - hue, hue, 0)
+schedule.close()
@@ -1,161 +1,90 @@
-from vpython import *
-import random
+from scene_api import *
+from scene_spec import SceneSpec, SceneBuilder, Chamber, RingArray, FieldRing, Particles, scene_from_env
+from lighting import key_fill_glow, sine
+from kinematics import PivotRotation
+from clock import SimClock
+from recorder import SceneRecording
+from culling import UpdateCuller
 
 # === METALLIC SUPPORT PLATES ADDED ====
 
-# === Scene setup ===
-scene = canvas(title='Vacuum Chamber Visualization',
-               width=1000, height=700, background=color.black)
-
-# === CHAMBER BODY ===
-chamber_radius = 3
-chamber_length = 8
-
-chamber_body = cylinder(pos=vector(-chamber_length/2, 0, 0),
-                        axis=vector(chamber_length, 0, 0),
-                        radius=chamber_radius,
-                        color=vector(0.2, 0.9, 1),
-                        opacity=0.25)
-
-cap_thickness = 0.2
-cap_left = cylinder(pos=vector(-chamber_length/2 - cap_thickness/2, 0, 0),
-                    axis=vector(cap_thickness, 0, 0),
-                    radius=chamber_radius,
-                    color=color.gray(0.6))
-cap_right = cylinder(pos=vector(chamber_length/2 + cap_thickness/2, 0, 0),
-                     axis=vector(cap_thickness, 0, 0),
-                     radius=chamber_radius,
-                     color=color.gray(0.6))
-
-window = cylinder(pos=vector(chamber_length/2 + cap_thickness, 0, 0),
-                  axis=vector(0.3, 0, 0),
-                  radius=1,
-                  color=color.cyan,
-                  opacity=0.4)
-
-# === BASE ===
-base = box(pos=vector(0, -chamber_radius - 0.7, 0),
-           size=vector(chamber_length * 1.3, 0.5, chamber_radius * 1.6),
-           color=vector(0.1, 0.7, 0.3),
-           shininess=0.8)
-
-# === SUPPORT PLATES (metallic finish) ===
-plate_thickness = 0.1
-plate_height = chamber_radius * 0.9
-plate_width = chamber_radius * 1.1
-plate_y_pos = -chamber_radius / 2 - 0.7
-
-# metallic color — slightly bluish silver
-metal_color = vector(0.8, 0.85, 0.9)
-
-plate_left = box(pos=vector(-chamber_length/2 + 0.15, plate_y_pos, 0),
-                 size=vector(plate_thickness, plate_height, plate_width),
-                 color=metal_color,
-                 shininess=1.0,
-                 emissive=False,
-                 opacity=0.9)
-
-plate_right = box(pos=vector(chamber_length/2 - 0.15, plate_y_pos, 0),
-                  size=vector(plate_thickness, plate_height, plate_width),
-                  color=metal_color,
-                  shininess=1.0,
-                  emissive=False,
-                  opacity=0.9)
-
-# === MEMS ARRAY ===
-rings = []
-rows, cols = 3, 3
-ring_radius = 0.4
-spacing = 1.2
-x_offset = -(cols - 1) * spacing / 2
-z_offset = -(rows - 1) * spacing / 2
-
-for i in range(cols):
-    for j in range(rows):
-        x = x_offset + i * spacing
-        z = z_offset + j * spacing
-        torus = ring(pos=vector(x, 0, z),
-                     axis=vector(1, 0, 0),
-                     radius=ring_radius,
-                     thickness=0.1,
-                     color=color.red)
-        rings.append(torus)
-
-# === CONTAINMENT FIELD RING ===
-containment_field = ring(
-    pos=vector(chamber_length/2 + 0.7, 0, 0),
-    axis=vector(1, 0, 0),
-    radius=2.8,
-    thickness=0.25,
-    color=vector(0.3, 0.9, 1),
-    opacity=0.25,
-    emissive=True
-)
-
-# === PARTICLES ===
-num_particles = 40
-particles = []
-
-for i in range(num_particles):
-    x = random.uniform(-chamber_length/2.5, chamber_length/2.5)
-    y = random.uniform(-chamber_radius*0.7, chamber_radius*0.7)
-    z = random.uniform(-chamber_radius*0.7, chamber_radius*0.7)
-    p = sphere(pos=vector(x, y, z),
-               radius=0.08,
-               color=vector(0.5, 0.8, 1),
-               emissive=True,
-               opacity=0.8)
-    p.v = vector(random.uniform(-0.02, 0.02),
-                 random.uniform(-0.02, 0.02),
-                 random.uniform(-0.02, 0.02))
-    particles.append(p)
-
-# === CAMERA & LIGHTING ===
-scene.camera.pos = vector(8, 2, 6)
-scene.camera.axis = vector(-8, -2, -6)
-
-# key lighting for metal reflection
-distant_light(direction=vector(-1, -1, -1), color=vector(1, 1, 1))
-distant_light(direction=vector(1, 0.5, 1), color=vector(0.7, 0.8, 1))
+# === Scene description (VPY_SCENE=file.toml overrides any of it) ===
+spec = scene_from_env(SceneSpec(
+    name='vacuum_chamber7',
+    title='Vacuum Chamber Visualization',
+    camera_pos=(8, 2, 6),
+    camera_axis=(-8, -2, -6),
+    # glass body, caps, window, base and metallic support plates (slightly bluish silver)
+    chamber=Chamber(radius=3, length=8, plate_thickness=0.1,
+                    plate_color=(0.8, 0.85, 0.9), plate_opacity=0.9),
+    # MEMS array
+    rings=RingArray(cols=3, rows=3, spacing=1.2, radius=0.4, thickness=0.1,
+                    axis=(1, 0, 0), color=(1, 0, 0)),
+    # containment field ring
+    fields=[FieldRing(name='containment', past_cap=0.7, radius=2.8, thickness=0.25,
+                      color=(0.3, 0.9, 1), opacity=0.25)],
+    # NumPy particle engine: contacts (spatial hash), chamber wall and MEMS rings
+    particles=Particles(count=40, speed=0.02, radius=0.08),
+))
+
+built = SceneBuilder(spec).build()
+scene = built.canvas
+chamber_body = built.chamber.body
+rings = built.rings.objects
+particles = built.particles.cloud
+ring_obstacles = built.particles.ring_obstacles
+
+# key/fill lighting for metal reflection + pulsing glow, created once
+glow_intensity = sine(0.8, 0.6, 1.5)
+lights = key_fill_glow(scene, glow_color=lambda t: vector(0.2, 0.6 + glow_intensity(t), 1))
 
 # === ANIMATION ===
-theta = 0
-while True:
-    rate(60)
-    theta += 0.02
-
-    # Rotate MEMS rings
-    for torus in rings:
-        x, y, z = torus.pos.x, torus.pos.y, torus.pos.z
-        torus.pos = vector(
-            x * cos(0.02) - z * sin(0.02),
-            y,
-            x * sin(0.02) + z * cos(0.02)
-        )
-
-    # Pulsating lighting
-    glow_intensity = 0.8 + 0.6 * sin(theta * 1.5)
-    scene.lights = []
-    local_light(pos=vector(0, 0, 0),
-                color=vector(0.2, 0.6 + glow_intensity, 1))
-    local_light(pos=vector(5, 3, 5),
-                color=vector(1, 1, 0.8) * 0.6)
-    local_light(pos=vector(-5, -3, -5),
-                color=vector(0.3, 0.6, 1) * 0.7)
+# MEMS rings turn about the vertical axis at 0.02 rad per 60 Hz frame
+ring_motion = PivotRotation(built.rings.centers, omega=1.2, axis=(0, -1, 0))
+
+# === Update culling: particles out of view or behind the end caps aren't pushed ===
+culler = UpdateCuller.from_env(scene)
+particles.cull = culler.points(radius=spec.particles.radius, occluders=spec.chamber.occluders(),
+                               name='particles')
+
+# === Recording (VPY_RECORD=file) / replay (VPY_REPLAY=file) ===
+recording = SceneRecording.from_env('vacuum_chamber7')
+recording.track('rings', rings, ('pos',))
+recording.track('chamber', [chamber_body], ('opacity', 'color'))
+recording.track('lights', lights.lights.values(), ('color',))
+recording.track_points('particles', particles)
+
+clock = SimClock(dt=1/60)
+for frame in clock.frames(60):
+    if recording.replaying:
+        # replay pushes stored frames; no physics or animation runs
+        clock.catch_up()
+        recording.show(clock.render_time)
+        continue
+
+    # Physics at a fixed dt: particles collide with the rings where they are at t
+    for t in clock.steps():
+        ring_obstacles.centers = ring_motion.at(t)
+        particles.step(1.2 * t)
+
+    t = clock.render_time     # absolute scene time (s), between the last two steps
+    theta = 1.2 * t
+
+    # Rotate MEMS rings (closed form in t, so no accumulated drift)
+    for torus, p in zip(rings, ring_motion.at(t).tolist()):
+        torus.pos = vector(*p)
+
+    # Pulsating lighting (glow color driven in place)
+    lights.update(theta)
 
     # Chamber glow
     chamber_body.opacity = 0.25 + 0.05 * abs(sin(theta))
     chamber_body.color = vector(0.2, 0.9, 1)
 
-    # Particle motion
-    for p in particles:
-        p.pos += p.v
-        if abs(p.pos.x) > chamber_length/2.5:
-            p.v.x *= -1
-        if abs(p.pos.y) > chamber_radius*0.7:
-            p.v.y *= -1
-        if abs(p.pos.z) > chamber_radius*0.7:
-            p.v.z *= -1
-        p.color = vector(0.4 + 0.4 * sin(theta + p.pos.x),
-                         0.7 + 0.3 * sin(theta * 1.5 + p.pos.z),
-                         1)
+    # Particle motion (interpolated between physics states)
+    particles.push(clock.alpha)
+
+    recording.capture()
+
+recording.close()
+culler.close()
@@ -1,192 +1,136 @@
 # vacuum_chamber_improved.py
-from vpython import *
-import random, math
-
-# === Scene setup ===
-scene = canvas(title='Vacuum Chamber — improved',
-               width=1000, height=700, background=color.black)
-
-# === CHAMBER GEOMETRY ===
+from scene_api import *
+from scene_spec import (SceneSpec, SceneBuilder, Chamber, RingArray, FieldRing, CoilStack, CoilField,
+                        Particles, Label, scene_from_env)
+from animation import Animator, Sine
+from kinematics import PivotRotation
+from clock import SimClock
+from recorder import SceneRecording
+from culling import UpdateCuller
+from scheduler import Scheduler
+from profiler import profiler
+import numpy as np
+import math
+
+# === Scene description (VPY_SCENE=file.toml overrides any of it) ===
 chamber_radius = 3
 chamber_length = 8
-chamber_center_y = 0        # keep chamber centered at y=0
-
-chamber_body = cylinder(pos=vector(-chamber_length/2, chamber_center_y, 0),
-                        axis=vector(chamber_length, 0, 0),
-                        radius=chamber_radius,
-                        color=vector(0.2, 0.9, 1),
-                        opacity=0.25)
-
-cap_thickness = 0.2
-cap_left = cylinder(pos=vector(-chamber_length/2 - cap_thickness/2, chamber_center_y, 0),
-                    axis=vector(cap_thickness, 0, 0),
-                    radius=chamber_radius,
-                    color=color.gray(0.6))
-cap_right = cylinder(pos=vector(chamber_length/2 + cap_thickness/2, chamber_center_y, 0),
-                     axis=vector(cap_thickness, 0, 0),
-                     radius=chamber_radius,
-                     color=color.gray(0.6))
-
-window = cylinder(pos=vector(chamber_length/2 + cap_thickness, chamber_center_y, 0),
-                  axis=vector(0.3, 0, 0),
-                  radius=1,
-                  color=color.cyan,
-                  opacity=0.4)
-
-# === BASE & SUPPORT PLATES (metallic) ===
-base = box(pos=vector(0, -chamber_radius - 0.7, 0),
-           size=vector(chamber_length * 1.3, 0.5, chamber_radius * 1.6),
-           color=vector(0.1, 0.7, 0.3),
-           shininess=0.8)
-
-plate_thickness = 0.08
-plate_height = chamber_radius * 0.9
-plate_width = chamber_radius * 1.1
-plate_y_pos = -chamber_radius / 2 - 0.7
-
-metal_color = vector(0.82, 0.84, 0.87)   # bluish-silver
-
-plate_left = box(pos=vector(-chamber_length/2 + 0.15, plate_y_pos, 0),
-                 size=vector(plate_thickness, plate_height, plate_width),
-                 color=metal_color,
-                 shininess=1.0,
-                 opacity=0.95)
-
-plate_right = box(pos=vector(chamber_length/2 - 0.15, plate_y_pos, 0),
-                  size=vector(plate_thickness, plate_height, plate_width),
-                  color=metal_color,
-                  shininess=1.0,
-                  opacity=0.95)
-
-# === MEMS ARRAY (unchanged) ===
-rings = []
-rows, cols = 3, 3
-ring_radius = 0.4
-spacing = 1.2
-x_offset = -(cols - 1) * spacing / 2
-z_offset = -(rows - 1) * spacing / 2
-
-for i in range(cols):
-    for j in range(rows):
-        x = x_offset + i * spacing
-        z = z_offset + j * spacing
-        torus = ring(pos=vector(x, chamber_center_y, z),
-                     axis=vector(1, 0, 0),
-                     radius=ring_radius,
-                     thickness=0.1,
-                     color=color.red)
-        rings.append(torus)
-
-# label the array
-label(pos=vector(0, chamber_center_y + 0.9, 0),
-      text='MEMS Array', xoffset=0, yoffset=0, height=14, color=color.white, box=False)
-
-# === OUTER CONTAINMENT RING (outside chamber, static) ===
-outer_field = ring(pos=vector(chamber_length/2 + 0.7, chamber_center_y, 0),
-                   axis=vector(1, 0, 0),
-                   radius=2.8,
-                   thickness=0.25,
-                   color=vector(0.22, 0.9, 1),
-                   opacity=0.25,
-                   emissive=True)
-
-label(pos=vector(chamber_length/2 + 1.4, chamber_center_y + 0.9, 0),
-      text='Outer Field', height=12, box=False, color=color.white)
-
-# === INNER CONTAINMENT RING (inside chamber, pulses out-of-phase) ===
-inner_field = ring(pos=vector(0, chamber_center_y, 0),
-                   axis=vector(1, 0, 0),
-                   radius=chamber_radius - 0.5,   # smaller so it sits inside
-                   thickness=0.18,
-                   color=vector(1, 0.4, 0.9),     # slightly magenta tint
-                   opacity=0.22,
-                   emissive=True)
-
-label(pos=vector(0, chamber_center_y + 1.1, -2.2),
-      text='Inner Field', height=12, box=False, color=color.white)
-
-# === SIMULATED SOLENOID COILS (rings as turns) ===
-coil_turns = []
-n_turns = 18
 coil_radius = chamber_radius * 1.25
-start_x = -chamber_length/2 + 0.3
-end_x = chamber_length/2 - 0.3
-for t in range(n_turns):
-    tx = start_x + (end_x - start_x) * t / (n_turns - 1)
-    turn = ring(pos=vector(tx, chamber_center_y, 0),
-                axis=vector(1, 0, 0),
-                radius=coil_radius,
-                thickness=0.03,
-                color=vector(0.6, 0.6, 0.65),
-                opacity=0.9)
-    coil_turns.append(turn)
-
-label(pos=vector(0, chamber_center_y - (coil_radius + 0.6), 0),
-      text='Drive coils (simulated turns)', height=10, box=False, color=color.white)
-
-# === VACUUM PARTICLES (unchanged) ===
-num_particles = 40
-particles = []
-for i in range(num_particles):
-    x = random.uniform(-chamber_length/2.5, chamber_length/2.5)
-    y = random.uniform(-chamber_radius*0.7, chamber_radius*0.7)
-    z = random.uniform(-chamber_radius*0.7, chamber_radius*0.7)
-    p = sphere(pos=vector(x, y, z),
-               radius=0.08,
-               color=vector(0.5, 0.8, 1),
-               emissive=True,
-               opacity=0.8)
-    p.v = vector(random.uniform(-0.02, 0.02),
-                 random.uniform(-0.02, 0.02),
-                 random.uniform(-0.02, 0.02))
-    particles.append(p)
-
-# === CAMERA & STATIC LIGHTS ===
-scene.camera.pos = vector(8, 2, 6)
-scene.camera.axis = vector(-8, -2, -6)
-distant_light(direction=vector(-1, -1, -1), color=vector(1,1,1))
-distant_light(direction=vector(1, 0.5, 1), color=vector(0.7,0.8,1))
+
+spec = scene_from_env(SceneSpec(
+    name='vacuum_chamber_improved',
+    title='Vacuum Chamber — improved',
+    camera_pos=(8, 2, 6),
+    camera_axis=(-8, -2, -6),
+    # chamber centered at y=0; thinner bluish-silver support plates
+    chamber=Chamber(radius=chamber_radius, length=chamber_length, plate_thickness=0.08,
+                    plate_color=(0.82, 0.84, 0.87), plate_opacity=0.95),
+    # MEMS array (unchanged)
+    rings=RingArray(cols=3, rows=3, spacing=1.2, radius=0.4, thickness=0.1,
+                    axis=(1, 0, 0), color=(1, 0, 0)),
+    fields=[
+        # outer containment ring (outside chamber)
+        FieldRing(name='outer', past_cap=0.7, radius=2.8, thickness=0.25,
+                  color=(0.22, 0.9, 1), opacity=0.25),
+        # inner containment ring (inside chamber, pulses out-of-phase), slightly magenta tint
+        FieldRing(name='inner', pos=(0, 0, 0), radius=chamber_radius - 0.5, thickness=0.18,
+                  color=(1, 0.4, 0.9), opacity=0.22),
+    ],
+    # simulated solenoid coils (rings as turns)
+    coils=CoilStack(turns=18, radius=coil_radius,
+                    start_x=-chamber_length/2 + 0.3, end_x=chamber_length/2 - 0.3),
+    # their magnetic field (Biot-Savart, cached): |B| on the vertical mid-plane plus field lines
+    coil_field=CoilField(current=1.0, grid=[48, 24, 24], slices=['z'], lines=12),
+    # vacuum particles: contacts (spatial hash), chamber wall and MEMS rings; straight-line
+    # motion unless given a charge (scenes/chamber_charged.toml)
+    particles=Particles(count=40, speed=0.02, radius=0.08),
+    labels=[
+        Label(pos=(0, 0.9, 0), text='MEMS Array', height=14),
+        Label(pos=(chamber_length/2 + 1.4, 0.9, 0), text='Outer Field'),
+        Label(pos=(0, 1.1, -2.2), text='Inner Field'),
+        Label(pos=(0, -(coil_radius + 0.6), 0), text='Drive coils (simulated turns)', height=10),
+    ],
+))
+
+built = SceneBuilder(spec).build()
+scene = built.canvas
+rings = built.rings.objects
+outer_field = built.fields['outer']
+inner_field = built.fields['inner']
+coil_turns = built.coils
+particles = built.particles.cloud
+ring_obstacles = built.particles.ring_obstacles
+
+# === STATIC LIGHTS (added to the canvas defaults, never changed) ===
+distant_light(direction=vector(-1, -1, -1), color=vector(1, 1, 1))
+distant_light(direction=vector(1, 0.5, 1), color=vector(0.7, 0.8, 1))
+
+
+# === Animation channels (functions of theta = 1.2 t, evaluated as arrays once per frame) ===
+animation = Animator()
+# field pulses: outer and inner out of phase (pi offset), each with its own color drift
+field_rings = [outer_field, inner_field]
+animation.add(field_rings, 'opacity', Sine((0.25 + 0.12, 0.22 + 0.12), 0.12, 2, phase=(0, math.pi)),
+              name='field opacity')
+animation.add(field_rings, 'color', Sine(base=[(0.22, 0.9, 1), (0.7, 0.4, 0.9)],
+                                         amplitude=[(0, 0.15, 0), (0.2, 0, 0)],
+                                         freq=[[1.3], [1.7]], phase=[[0], [math.pi / 4]]),
+              name='field color')
+# coils: very subtle phasing glow along coils to suggest current
+animation.add(coil_turns, 'opacity', Sine(0.6, 0.15, 2, phase=0.3 * np.arange(len(coil_turns))),
+              name='coil ripple')
+
 
 # === ANIMATION LOOP: MEMS rotate, fields pulse (outer & inner out of phase), particles move ===
-theta = 0
-while True:
-    rate(60)
-    theta += 0.02
-
-    # rotate MEMS rings
-    for torus in rings:
-        x, y, z = torus.pos.x, torus.pos.y, torus.pos.z
-        torus.pos = vector(
-            x * cos(0.02) - z * sin(0.02),
-            y,
-            x * sin(0.02) + z * cos(0.02)
-        )
-
-    # particle motion and shimmer
-    for p in particles:
-        p.pos += p.v
-        if abs(p.pos.x) > chamber_length/2.5:
-            p.v.x *= -1
-        if abs(p.pos.y) > chamber_radius*0.7:
-            p.v.y *= -1
-        if abs(p.pos.z) > chamber_radius*0.7:
-            p.v.z *= -1
-        p.color = vector(0.4 + 0.4 * sin(theta + p.pos.x),
-                         0.7 + 0.3 * sin(theta * 1.5 + p.pos.z),
-                         1)
-
-    # outer field pulse (synchronized)
-    outer_intensity = 0.25 + 0.12 * (1 + sin(theta * 2))
-    outer_color_shift = 0.9 + 0.15 * sin(theta * 1.3)
-    outer_field.opacity = outer_intensity
-    outer_field.color = vector(0.22, outer_color_shift, 1)
-
-    # inner field pulses out of phase with outer (pi offset)
-    inner_intensity = 0.22 + 0.12 * (1 + sin(theta * 2 + math.pi))
-    inner_color_shift = 0.7 + 0.2 * sin(theta * 1.7 + math.pi/4)
-    inner_field.opacity = inner_intensity
-    inner_field.color = vector(inner_color_shift, 0.4, 0.9)
-
-    # coils: very subtle phasing glow along coils to suggest current
-    for i, turn in enumerate(coil_turns):
-        turn.opacity = 0.6 + 0.15 * math.sin(theta * 2 + i * 0.3)
+# MEMS rings turn about the vertical axis at 0.02 rad per 60 Hz frame
+ring_motion = PivotRotation(built.rings.centers, omega=1.2, axis=(0, -1, 0))
+
+# === Update culling: particles out of view or behind the end caps aren't pushed ===
+culler = UpdateCuller.from_env(scene)
+particles.cull = culler.points(radius=spec.particles.radius, occluders=spec.chamber.occluders(),
+                               name='particles')
+
+# === Recording (VPY_RECORD=file) / replay (VPY_REPLAY=file) ===
+recording = SceneRecording.from_env('vacuum_chamber_improved')
+recording.track('rings', rings, ('pos',))
+recording.track('fields', [outer_field, inner_field], ('opacity', 'color'))
+recording.track('coil', coil_turns, ('opacity',))
+recording.track_points('particles', particles)
+
+# === Update schedule (VPY_BUDGET_MS=n sets a frame budget; cosmetic channels run at 10 Hz) ===
+def move_rings(t):
+    # rotate MEMS rings (closed form in t, so no accumulated drift)
+    for torus, p in zip(rings, ring_motion.at(t).tolist()):
+        torus.pos = vector(*p)
+
+
+clock = SimClock(dt=1/60)
+schedule = Scheduler.from_env()
+# particle motion and shimmer (interpolated between physics states)
+schedule.add('particles', lambda t: particles.push(clock.alpha), required=True)
+schedule.add('rings', move_rings, priority=3)
+# field pulses and coil ripple: every channel in one batch, only changed values sent
+schedule.add('animation', lambda t: animation.update(1.2 * t), hz=10, priority=1)
+
+for frame in clock.frames(60):
+    if recording.replaying:
+        # replay pushes stored frames; no physics or animation runs
+        clock.catch_up()
+        recording.show(clock.render_time)
+        continue
+
+    # physics at a fixed dt: particles collide with the rings where they are at t
+    with profiler.section('physics'):
+        for t in clock.steps():
+            ring_obstacles.centers = ring_motion.at(t)
+            particles.step(1.2 * t)
+
+    # everything drawn: at absolute scene time (s), between the last two steps
+    schedule.run(clock.render_time)
+
+    with profiler.section('recording'):
+        recording.capture()
+
+recording.close()
+culler.close()
+schedule.close()
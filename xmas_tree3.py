@@ -1,25 +1,48 @@
-from vpython import canvas, cone, cylinder, sphere, box, vector, color, rate, local_light, triangle, vertex
-import random, math
+from scene_api import canvas, sphere, simple_sphere, cone, pyramid, local_light, vector, color
+from kinematics import Spin
+from mesh import IndexedMesh, star_outline, bipyramid
+from emitter import ParticleEmitter, SpawnBox
+from baking import StaticBatch
+from clock import SimClock
+from recorder import SceneRecording
+from scene_spec import scene_params
+from lod import LodManager, LodSet, ObjectLevel, LazyLevel, PointLevel, HIDDEN
+from culling import UpdateCuller
+from rng import RandomStreams, streams
+from animation import Animator, Channel, Sine, Noise
+from scheduler import Scheduler
+import math
 
 # ---------------- Scene Setup ----------------
 scene = canvas(title="Christmas Night Scene 🎄🌙✨",
                width=900, height=650, background=vector(0.02, 0.02, 0.05))
 
+# ---------------- Parameters (VPY_SCENE=file.toml overrides them) ----------------
+params = scene_params(num_ornaments=180, num_sky_stars=200, num_snowflakes=200)
+
 # ---------------- Tree Setup ----------------
 tree_height = 12
 tree_levels = 5
 base_radius = 4
+trunk_height = tree_height / 6
+num_ornaments = params['num_ornaments']
+
+# Everything that never moves is recorded into a static batch and drawn as
+# one compound per material (see baking.py).
+scene_seed = 2024
+layout = RandomStreams(scene_seed).stream('xmas_tree3.layout')   # fixed design, whatever VPY_SEED is
+statics = StaticBatch('xmas_tree3')
 
 # Infinite snowy ground
-ground = box(pos=vector(0, -tree_height/2 - 0.5, 0),
-             size=vector(200, 0.1, 200),
-             color=vector(0.9, 0.9, 1),
-             shininess=0.8,
-             emissive=False)
+statics.box(pos=vector(0, -tree_height/2 - 0.5, 0),
+            size=vector(200, 0.1, 200),
+            color=vector(0.9, 0.9, 1),
+            shininess=0.8,
+            emissive=False)
 
 # Tree trunk
-trunk = cylinder(pos=vector(0, -tree_height/2, 0),
-                 axis=vector(0, tree_height/6, 0),
+statics.cylinder(pos=vector(0, -tree_height/2, 0),
+                 axis=vector(0, trunk_height, 0),
                  radius=0.5,
                  color=vector(0.55, 0.27, 0.07))
 
@@ -27,59 +50,37 @@ trunk = cylinder(pos=vector(0, -tree_height/2, 0),
 for i in range(tree_levels):
     level_height = tree_height / (tree_levels + 1)
     level_radius = base_radius - (i * 0.7)
-    level_y = -tree_height / 2 + trunk.axis.y + (i * (level_height * 0.8))
-    cone(pos=vector(0, level_y, 0),
-         axis=vector(0, level_height, 0),
-         radius=level_radius,
-         color=vector(0, 0.5 + i * 0.1, 0))
+    level_y = -tree_height / 2 + trunk_height + (i * (level_height * 0.8))
+    statics.cone(pos=vector(0, level_y, 0),
+                 axis=vector(0, level_height, 0),
+                 radius=level_radius,
+                 color=vector(0, 0.5 + i * 0.1, 0))
 
 # ---------------- Ornaments ----------------
+# (native spheres, created when the camera first needs them; see the LOD below)
 ornament_colors = [color.red, color.blue, color.cyan, color.magenta, color.orange, color.yellow, color.green]
 ornaments = []
 
-num_ornaments = 180
 for i in range(num_ornaments):
-    level = random.randint(0, tree_levels - 1)
+    level = layout.integers(tree_levels)
     level_height = tree_height / (tree_levels + 1)
-    y = -tree_height / 2 + trunk.axis.y + (level * (level_height * 0.8)) + random.uniform(-0.3, 0.3)
+    y = -tree_height / 2 + trunk_height + (level * (level_height * 0.8)) + layout.uniform(-0.3, 0.3)
     if y > tree_height / 4:  # avoid star zone
         continue
-    r = (base_radius - (level * 0.7)) * random.uniform(0.7, 0.95)
-    theta = random.uniform(0, 2 * math.pi)
+    r = (base_radius - (level * 0.7)) * layout.uniform(0.7, 0.95)
+    theta = layout.uniform(0, 2 * math.pi)
     x = r * math.cos(theta)
     z = r * math.sin(theta)
-    ornaments.append(
-        sphere(pos=vector(x, y, z),
-               radius=random.uniform(0.12, 0.18),
-               color=random.choice(ornament_colors),
-               emissive=True)
-    )
+    ornaments.append({'pos': vector(x, y, z),
+                      'radius': layout.uniform(0.12, 0.18),
+                      'color': layout.choice(ornament_colors)})
+
 
 # ---------------- 3D Five-Point Star ----------------
 def create_3d_star(pos, size=1.0, col=color.yellow):
-    points = []
-    for i in range(10):
-        angle = math.pi / 2 + i * math.pi / 5
-        radius = size if i % 2 == 0 else size * 0.4
-        points.append(vector(radius * math.cos(angle), radius * math.sin(angle), 0))
-
-    faces = []
-    for i in range(10):
-        p1 = points[i]
-        p2 = points[(i + 1) % 10]
-        tip_front = vector(0, 0, size / 2)
-        tip_back = vector(0, 0, -size / 2)
-        faces.append(triangle(vs=[
-            vertex(pos=p1 + pos, color=col),
-            vertex(pos=p2 + pos, color=col),
-            vertex(pos=tip_front + pos, color=col)
-        ]))
-        faces.append(triangle(vs=[
-            vertex(pos=p1 + pos, color=col),
-            vertex(pos=p2 + pos, color=col),
-            vertex(pos=tip_back + pos, color=col)
-        ]))
-    return faces
+    # 12 shared vertices, 20 faces, one transform and one material color
+    vertices, faces = bipyramid(star_outline(size, points=5, inner_ratio=0.4), depth=size)
+    return IndexedMesh(vertices, faces, pos=pos, color=col)
 
 # Add the star
 star_pos = vector(0, tree_height / 2.8 + 0.8, 0)
@@ -87,96 +88,187 @@ star = create_3d_star(star_pos, size=0.8, col=color.yellow)
 
 # ---------------- Presents ----------------
 def create_present(pos, size=vector(1, 0.6, 1), body_color=color.red):
-    gift = box(pos=pos, size=size, color=body_color)
+    gift = statics.box(pos=pos, size=size, color=body_color)
     ribbon_thickness = 0.08
     ribbon_color = vector(1, 0.84, 0)
-    box(pos=pos, size=vector(ribbon_thickness, size.y + 0.01, size.z + 0.01), color=ribbon_color)
-    box(pos=pos, size=vector(size.x + 0.01, size.y + 0.01, ribbon_thickness), color=ribbon_color)
+    statics.box(pos=pos, size=vector(ribbon_thickness, size.y + 0.01, size.z + 0.01), color=ribbon_color)
+    statics.box(pos=pos, size=vector(size.x + 0.01, size.y + 0.01, ribbon_thickness), color=ribbon_color)
     return gift
 
 present_colors = [color.red, color.green]
 for _ in range(6):
-    angle = random.uniform(0, 2 * math.pi)
-    radius = random.uniform(1.5, 3.5)
+    angle = layout.uniform(0, 2 * math.pi)
+    radius = layout.uniform(1.5, 3.5)
     x = radius * math.cos(angle)
     z = radius * math.sin(angle)
     pos = vector(x, -tree_height/2 + 0.3, z)
-    present_color = random.choice(present_colors)
-    size = vector(random.uniform(0.7, 1.2), random.uniform(0.5, 0.8), random.uniform(0.7, 1.2))
+    present_color = layout.choice(present_colors)
+    size = vector(layout.uniform(0.7, 1.2), layout.uniform(0.5, 0.8), layout.uniform(0.7, 1.2))
     create_present(pos, size, present_color)
 
 # ---------------- Mountains ----------------
+# (live, so each can drop to a pyramid or disappear with distance)
+mountains = []
 for i in range(-3, 4):
-    height = random.uniform(6, 12)
-    radius = random.uniform(10, 16)
-    x_pos = i * 15 + random.uniform(-3, 3)
-    z_pos = -40 + random.uniform(-5, 5)
-    cone(pos=vector(x_pos, -tree_height/2 - 0.5, z_pos),
-         axis=vector(0, height, 0),
-         radius=radius,
-         color=vector(0.6, 0.65, 0.7),
-         opacity=0.9)
+    height = layout.uniform(6, 12)
+    radius = layout.uniform(10, 16)
+    x_pos = i * 15 + layout.uniform(-3, 3)
+    z_pos = -40 + layout.uniform(-5, 5)
+    mountains.append({'pos': vector(x_pos, -tree_height/2 - 0.5, z_pos),
+                      'height': height,
+                      'radius': radius})
+mountain_color = vector(0.6, 0.65, 0.7)
 
 # ---------------- Moon ----------------
-moon = sphere(pos=vector(15, 15, -60),
-              radius=3,
-              color=vector(1, 1, 0.9),
-              emissive=True)
+moon = statics.sphere(pos=vector(15, 15, -60),
+                      radius=3,
+                      color=vector(1, 1, 0.9),
+                      emissive=True)
+
+# Compound ground, tree, presents and moon
+statics.build()
 
 # ---------------- Stars in the sky ----------------
+# (left live: the twinkle animates their radius, through the LOD below)
 sky_stars = []
-for _ in range(200):
-    x = random.uniform(-100, 100)
-    y = random.uniform(5, 40)
-    z = random.uniform(-120, -40)
+for _ in range(params['num_sky_stars']):
+    x = layout.uniform(-100, 100)
+    y = layout.uniform(5, 40)
+    z = layout.uniform(-120, -40)
     sky_stars.append(sphere(pos=vector(x, y, z),
-                            radius=random.uniform(0.05, 0.15),
+                            radius=layout.uniform(0.05, 0.15),
                             color=color.white,
                             emissive=True))
 
+# ---------------- Level of detail ----------------
+# projected size in pixels decides the representation; checked once per frame
+lod = LodManager(scene)
+
+# sky stars: sphere -> low-poly sphere -> dot -> hidden
+star_centers = [[s.pos.x, s.pos.y, s.pos.z] for s in sky_stars]
+sky_lod = LodSet(star_centers, [s.radius for s in sky_stars],
+                 thresholds=(6, 2.5, 0.3),
+                 levels=[ObjectLevel(sky_stars),
+                         LazyLevel(lambda i: simple_sphere(pos=sky_stars[i].pos, radius=sky_stars[i].radius,
+                                                           color=color.white, emissive=True),
+                                   len(sky_stars)),
+                         PointLevel(star_centers, [[1, 1, 1]] * len(sky_stars)),
+                         HIDDEN],
+                 name='sky stars')
+lod.add(sky_lod)
+
+# ornaments: sphere -> low-poly sphere -> dot -> hidden
+lod.add(LodSet([[o['pos'].x, o['pos'].y, o['pos'].z] for o in ornaments],
+               [o['radius'] for o in ornaments],
+               thresholds=(8, 3, 0.5),
+               levels=[LazyLevel(lambda i: sphere(emissive=True, **ornaments[i]), len(ornaments)),
+                       LazyLevel(lambda i: simple_sphere(emissive=True, **ornaments[i]), len(ornaments)),
+                       PointLevel([[o['pos'].x, o['pos'].y, o['pos'].z] for o in ornaments],
+                                  [[o['color'].x, o['color'].y, o['color'].z] for o in ornaments]),
+                       HIDDEN],
+               shown=None, name='ornaments'))
+
+# mountains: cone -> four-sided pyramid -> hidden
+lod.add(LodSet([[m['pos'].x, m['pos'].y + m['height'] / 2, m['pos'].z] for m in mountains],
+               [m['radius'] for m in mountains],
+               thresholds=(40, 4),
+               levels=[LazyLevel(lambda i: cone(pos=mountains[i]['pos'], axis=vector(0, mountains[i]['height'], 0),
+                                                radius=mountains[i]['radius'], color=mountain_color,
+                                                opacity=0.9),
+                                 len(mountains)),
+                       LazyLevel(lambda i: pyramid(pos=mountains[i]['pos'], axis=vector(0, 1, 0),
+                                                   size=vector(mountains[i]['height'], 2 * mountains[i]['radius'],
+                                                               2 * mountains[i]['radius']),
+                                                   color=mountain_color, opacity=0.9),
+                                 len(mountains)),
+                       HIDDEN],
+               shown=None, name='mountains'))
+lod.update()
+# each sky star as one object whose attribute writes reach its current representation
+sky = sky_lod.handles()
+
 # ---------------- Snowfall ----------------
-snowflakes = [sphere(pos=vector(random.uniform(-10, 10),
-                                random.uniform(0, 8),
-                                random.uniform(-10, 10)),
-                     radius=0.05,
-                     color=color.white)
-              for _ in range(200)]
+# one emitter, one points primitive; respawn above the tree once landed
+num_snowflakes = params['num_snowflakes']
+snow = ParticleEmitter(num_snowflakes,
+                       spawn=SpawnBox((-10, 5, -10), (10, 10, 10)),
+                       initial=SpawnBox((-10, 0, -10), (10, 8, 10)),
+                       ground_y=-tree_height/2,
+                       fall_speed=3.0,          # 0.05 per 60 Hz frame
+                       gust=0.4,
+                       radius=0.05,
+                       color=color.white,
+                       rng=streams.stream('xmas_tree3.snow'))
 
 # ---------------- Lighting ----------------
+# static, created once next to the canvas defaults
 local_light(pos=vector(0, 5, 5), color=color.white)
 local_light(pos=vector(0, 10, -10), color=vector(1, 1, 0.8))  # moonlight tone
 
+# ---------------- Update culling ----------------
+# flakes out of view aren't pushed; twinkles of stars out of view are held back
+culler = UpdateCuller.from_env(scene)
+snow.cull = culler.points(radius=0.05, name='snow')
+sky_updates = culler.objects(sky, name='sky stars')
+
 # ---------------- Animation ----------------
-angle = 0
-while True:
-    rate(60)
-    angle += 0.02
-
-    # Rotate star
-    for f in star:
-        for v in f.vs:
-            v.pos = vector(
-                (v.pos.x - star_pos.x) * math.cos(0.02) - (v.pos.z - star_pos.z) * math.sin(0.02) + star_pos.x,
-                v.pos.y,
-                (v.pos.x - star_pos.x) * math.sin(0.02) + (v.pos.z - star_pos.z) * math.cos(0.02) + star_pos.z
-            )
-
-    # Twinkle effect
-    twinkle = 0.7 + 0.3 * math.sin(angle * 6)
-    warm_shift = 0.1 * math.sin(angle * 3)
-    star_color = vector(1, twinkle, 0.2 + warm_shift)
-    for f in star:
-        for v in f.vs:
-            v.color = star_color
-
-    # Gentle twinkling of random sky stars
-    for s in random.sample(sky_stars, 8):
-        s.radius = 0.05 + 0.05 * abs(math.sin(angle * random.uniform(3, 6)))
-
-    # Snowfall
-    for s in snowflakes:
-        s.pos.y -= 0.05
-        if s.pos.y < -tree_height/2:
-            s.pos.y = random.uniform(5, 10)
-            s.pos.x = random.uniform(-10, 10)
-            s.pos.z = random.uniform(-10, 10)
+# channels are functions of angle = 1.2 t, each evaluated as one array
+animation = Animator()
+# star twinkle: green and blue drift at their own rates (yellow-white to warm)
+animation.add([star], 'color', Sine((1, 0.7, 0.2), (0, 0.3, 0.1), (0, 6, 3)), name='star')
+# gentle twinkling of sky stars: each takes a new random radius in [0.05, 0.1] about
+# twice a second at its own random offset; writes go through the culler, then the LOD
+twinkle_rng = streams.stream('xmas_tree3.twinkle')
+sky_twinkle = Channel(sky, 'radius',
+                      Noise(len(sky_stars), 0.075, 0.025, freq=2.0, rng=twinkle_rng, smooth=False),
+                      sink=sky_updates, name='sky twinkle')
+
+# Star spins about its vertical axis at 0.02 rad per 60 Hz frame
+star_spin = Spin(axis=(0, -1, 0), omega=1.2)
+
+# === Recording (VPY_RECORD=file) / replay (VPY_REPLAY=file) ===
+recording = SceneRecording.from_env('xmas_tree3')
+recording.track('star', [star.obj], ('axis', 'up', 'color'))
+recording.track('sky', sky, ('radius',))
+recording.track_points('snow', snow)
+
+
+def twinkle_sky(t, part):
+    sky_updates.refresh()
+    sky_twinkle.update(1.2 * t, part)
+
+
+# ---------------- Update schedule ----------------
+# VPY_BUDGET_MS=n sets a frame budget: over it, the snow and the sky twinkle are
+# spread over four frames a quarter at a time and low-priority tasks wait
+clock = SimClock(dt=1/60)
+schedule = Scheduler.from_env()
+# Rotate star: one model-transform update (closed form in t, no drift)
+schedule.add('star', lambda t: star.set_orientation(star_spin.matrix_at(t)), required=True)
+# Snowfall (interpolated between physics states)
+schedule.add('snow', lambda t, part: snow.push(clock.alpha, part), priority=3,
+             group=num_snowflakes, slices=4)
+# Level of detail (only does work when the camera moved)
+schedule.add('lod', lambda t: lod.update(), priority=2)
+schedule.add('star color', lambda t: animation.update(1.2 * t), hz=30, priority=1)
+schedule.add('sky twinkle', twinkle_sky, hz=10, group=len(sky_stars), slices=4)
+
+for frame in clock.frames(60):
+    if recording.replaying:
+        # replay pushes stored frames; no physics or animation runs
+        clock.catch_up()
+        recording.show(clock.render_time)
+        continue
+
+    # Snowfall physics at a fixed dt
+    for step_t in clock.steps():
+        snow.step(clock.dt, step_t)
+
+    # everything drawn: at absolute scene time (s), between the last two steps
+    schedule.run(clock.render_time)
+
+    recording.capture()
+
+recording.close()
+culler.close()
+schedule.close()